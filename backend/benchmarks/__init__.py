@@ -0,0 +1,5 @@
+"""
+Benchmarks package.
+Standalone scripts for measuring API and database performance.
+Run from the backend directory, e.g. ``python -m benchmarks.async_db``.
+"""
@@ -0,0 +1,80 @@
+"""
+Benchmark: grading one Ledger Simulator submission by sort-and-compare vs
+by answer-key fingerprint.
+
+For each entry count, a random answer key and two submissions in shuffled
+line order are generated: one correct, one with a single wrong amount.
+Both are graded from already-normalized lines, as the validate endpoint does:
+
+- sort_compare: sort the submission and compare it with the pre-sorted key
+  (answer keys before stored fingerprints)
+- fingerprint: core.answer_keys.multiset_fingerprint of the submission,
+  compared with the key's stored fingerprint, with the per-line hashes
+  memoized from earlier gradings (the common case: submissions repeat the
+  key's lines)
+- fingerprint_cold: the same with the line-hash memo cleared first
+- fingerprint_diff: the same, plus diff_lines on a mismatch to report the
+  missing / extra / wrong-amount lines
+
+No database is needed.
+
+Usage:
+    python -m benchmarks.answer_fingerprint --sizes 10 100 1000 10000 --iterations 200
+"""
+import argparse
+import random
+
+from benchmarks.common import print_table, time_sync
+from core.answer_keys import _line_hash, diff_lines, multiset_fingerprint, normalize_line
+
+ACCOUNTS = ("cash", "accounts receivable", "inventory", "revenue", "cost of goods sold", "accounts payable")
+
+
+def make_lines(n: int, rng: random.Random):
+    lines = []
+    for i in range(n):
+        amount = rng.randint(1, 1_000_000) / 100
+        account = f"{rng.choice(ACCOUNTS)} {i % 50}"
+        lines.append(normalize_line(account, amount, 0) if i % 2 else normalize_line(account, 0, amount))
+    return lines
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    results = {}
+    for n in args.sizes:
+        expected = make_lines(n, rng)
+        key_sorted = tuple(sorted(expected))
+        key_fingerprint = multiset_fingerprint(expected)
+        correct = rng.sample(expected, n)
+        wrong = list(correct)
+        account, debit, credit = wrong[0]
+        wrong[0] = (account, round(debit + 1, 2), credit)
+
+        def fingerprint_diff(lines):
+            if multiset_fingerprint(lines) != key_fingerprint:
+                diff_lines(expected, lines)
+
+        for label, submission in (("correct", correct), ("wrong", wrong)):
+            for method, call in (
+                ("sort_compare", lambda: tuple(sorted(submission)) == key_sorted),
+                ("fingerprint", lambda: multiset_fingerprint(submission) == key_fingerprint),
+                ("fingerprint_cold", lambda: _line_hash.cache_clear() or multiset_fingerprint(submission) == key_fingerprint),
+                ("fingerprint_diff", lambda: fingerprint_diff(submission)),
+            ):
+                summary = time_sync(call, args.iterations)
+                results[f"{n}_{label}_{method}"] = {
+                    "lines": n,
+                    "p50_us": round(summary["p50_ms"] * 1000, 1),
+                    "p99_us": round(summary["p99_ms"] * 1000, 1),
+                    "gradings_per_s": summary["throughput_rps"],
+                }
+    print_table(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000], help="Lines per answer key")
+    parser.add_argument("--iterations", type=int, default=200, help="Gradings timed per case")
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
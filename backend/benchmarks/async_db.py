@@ -0,0 +1,81 @@
+"""
+Benchmark: concurrent-request throughput with blocking vs async sessions.
+
+Mounts two copies of the topic search query on a throwaway app, one using
+the blocking ``get_db`` Session (the pre-asyncpg handler style) and one using
+``get_async_db``, and drives both with the same concurrency in-process.
+Use ``--sleep-ms`` to add a server-side ``pg_sleep`` that stands in for a
+slow query; with the blocking session it serializes every request.
+
+Keep ``--concurrency`` at or below DB_POOL_SIZE + DB_MAX_OVERFLOW: past that
+the blocking route waits for a pool checkout on the event loop that only
+that loop can release, stalling until the pool timeout.
+
+Requires a configured PostgreSQL database (see .env.example) and httpx.
+
+Usage:
+    python -m benchmarks.async_db --requests 500 --concurrency 10 --sleep-ms 20
+"""
+import argparse
+import asyncio
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from benchmarks.common import print_table, run_concurrent
+from config import settings
+from database import get_async_db, get_async_engine, get_db
+from models.topic import Topic
+
+
+def build_app(sleep_s: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking(q: str, db: Session = Depends(get_db)):
+        if sleep_s:
+            db.execute(text("SELECT pg_sleep(:s)"), {"s": sleep_s})
+        return [t.id for t in db.query(Topic).filter(Topic.name.ilike(f"%{q}%")).all()]
+
+    @app.get("/async")
+    async def non_blocking(q: str, db: AsyncSession = Depends(get_async_db)):
+        if sleep_s:
+            await db.execute(text("SELECT pg_sleep(:s)"), {"s": sleep_s})
+        result = await db.execute(select(Topic).where(Topic.name.ilike(f"%{q}%")))
+        return [t.id for t in result.scalars().all()]
+
+    return app
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Measure the routes, not admission control (one client, one address, more requests in flight than pool slots)
+    settings.ADMISSION_ENABLED = False
+    app = build_app(args.sleep_ms / 1000.0)
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/blocking", "/async"):
+            # Warm up the pool so connection setup is not measured
+            await client.get(path, params={"q": args.query})
+
+            async def call(path=path):
+                resp = await client.get(path, params={"q": args.query})
+                resp.raise_for_status()
+
+            results[path.lstrip("/")] = await run_concurrent(call, args.requests, args.concurrency)
+    print_table(results)
+    async_engine = get_async_engine()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--sleep-ms", type=float, default=0.0, help="Simulated per-query server time")
+    parser.add_argument("--query", default="Revenue")
+    asyncio.run(main(parser.parse_args()))
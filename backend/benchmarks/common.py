@@ -0,0 +1,79 @@
+"""
+Shared helpers for benchmark scripts: timing, percentiles and
+concurrent request drivers.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) of samples using nearest rank."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Summarize per-call latencies (seconds) and wall time into a result dict."""
+    count = len(latencies)
+    return {
+        "requests": count,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run_concurrent(
+    call: Callable[[], Awaitable[object]],
+    total: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    """
+    Invoke call() total times with at most concurrency calls in flight.
+    
+    Returns:
+        Summary dict with throughput and latency percentiles
+    """
+    latencies: List[float] = []
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            t0 = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def time_sync(call: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """Invoke a synchronous call iterations times and summarize latencies."""
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def print_table(results: Dict[str, Dict[str, float]]) -> None:
+    """Print named result dicts as an aligned table."""
+    if not results:
+        return
+    columns = list(next(iter(results.values())).keys())
+    width = max(len(name) for name in results) + 2
+    col_widths = [max(16, len(c) + 2) for c in columns]
+    print("".ljust(width) + "".join(c.rjust(w) for c, w in zip(columns, col_widths)))
+    for name, row in results.items():
+        print(name.ljust(width) + "".join(str(row.get(c, "")).rjust(w) for c, w in zip(columns, col_widths)))
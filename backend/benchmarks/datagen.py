@@ -0,0 +1,195 @@
+"""
+Synthetic data generator for load tests and benchmarks.
+
+Fills topics, practice_templates and progress_logs with realistic-looking
+data at a configurable scale, then rebuilds user_topic_state from the
+generated logs, along with the analytics rollups and the templates'
+answer-key fingerprints. Rows are produced server-side with ``generate_series`` in
+batches, so tens of millions of progress_logs load without streaming them
+through Python. Each batch reseeds PostgreSQL's random() from ``--seed``,
+so the same arguments against an empty database produce the same data.
+
+Generated users are named ``synth-user-<n>``; activity is skewed so a few
+users (and topics) are much busier than the rest, as in production.
+
+Requires a configured PostgreSQL database (see .env.example) with the schema
+from infrastructure/schema.sql applied. Use a throwaway database: ``--truncate``
+empties these tables and the ones derived from them first.
+
+Usage:
+    python -m benchmarks.datagen --topics 10000 --templates 100000 --progress-logs 50000000 --users 200000
+    python -m benchmarks.datagen --topics 500 --templates 5000 --progress-logs 200000 --truncate
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from core.answer_keys import backfill_answer_fingerprints
+from core.progress_rollups import backfill_progress_rollups
+from core.progress_state import backfill_user_topic_state
+from database import get_async_engine, get_async_session_local
+
+USER_PREFIX = "synth-user-"
+
+ADJECTIVES = [
+    "Deferred", "Accrued", "Contingent", "Unearned", "Prepaid", "Consolidated", "Diluted", "Impaired",
+    "Amortized", "Capitalized", "Variable", "Fixed", "Current", "Noncurrent", "Restricted", "Comprehensive",
+]
+NOUNS = [
+    "Revenue Recognition", "Lease Accounting", "Income Taxes", "Fair Value Measurement", "Inventory",
+    "Goodwill", "Business Combinations", "Stock Compensation", "Pension Obligations", "Derivatives",
+    "Foreign Currency", "Segment Reporting", "Earnings Per Share", "Cash Flows", "Intangible Assets",
+    "Receivables", "Debt Modifications", "Equity Method Investments", "Contingencies", "Consolidation",
+]
+ACCOUNTS = [
+    "Cash", "Accounts Receivable", "Inventory", "Prepaid Expenses", "Equipment", "Accounts Payable",
+    "Unearned Revenue", "Notes Payable", "Common Stock", "Retained Earnings", "Revenue", "Cost of Goods Sold",
+    "Salaries Expense", "Rent Expense", "Interest Expense", "Depreciation Expense",
+]
+
+_TRUNCATE_SQL = text(
+    "TRUNCATE user_topic_milestones, progress_rollups_hourly, progress_rollups_daily, user_topic_state, "
+    "progress_log_daily_summaries, progress_log_compactions, "
+    "progress_logs, practice_templates, topics RESTART IDENTITY CASCADE"
+)
+
+_TOPICS_SQL = text("""
+    INSERT INTO topics (name, asc_reference, oer_link)
+    SELECT s.adj || ' ' || s.noun || ' ' || s.g,
+           'ASC ' || (100 + s.g % 900),
+           'https://example.org/oer/topic-' || s.g
+    FROM (
+        SELECT g,
+               (CAST(:adjectives AS text[]))[1 + floor(random() * cardinality(CAST(:adjectives AS text[])))::int] AS adj,
+               (CAST(:nouns AS text[]))[1 + floor(random() * cardinality(CAST(:nouns AS text[])))::int] AS noun
+        FROM generate_series(CAST(:start AS bigint), CAST(:stop AS bigint)) AS g
+    ) s
+""")
+
+# Each template gets one balanced two-line answer key
+_TEMPLATES_SQL = text("""
+    INSERT INTO practice_templates (topic_id, template_text, expected_entries)
+    SELECT t.ids[1 + floor(random() * cardinality(t.ids))::int],
+           'Record a ' || s.debit_account || ' / ' || s.credit_account || ' transaction of $' || s.amount || '.',
+           jsonb_build_array(
+               jsonb_build_object('account', s.debit_account, 'debit', s.amount, 'credit', 0),
+               jsonb_build_object('account', s.credit_account, 'debit', 0, 'credit', s.amount)
+           )
+    FROM (
+        SELECT g,
+               (1 + floor(random() * 10000))::int AS amount,
+               (CAST(:accounts AS text[]))[1 + floor(random() * 8)::int] AS debit_account,
+               (CAST(:accounts AS text[]))[9 + floor(random() * 8)::int] AS credit_account
+        FROM generate_series(CAST(:start AS bigint), CAST(:stop AS bigint)) AS g
+    ) s,
+    (SELECT array_agg(id ORDER BY id) AS ids FROM topics) t
+""")
+
+# Monthly progress_logs partitions for the whole --days window (core.progress_partitions)
+_PARTITIONS_SQL = text("""
+    SELECT create_progress_log_partitions(
+        LOCALTIMESTAMP - make_interval(days => CAST(:days AS int)), LOCALTIMESTAMP + INTERVAL '3 months'
+    )
+""")
+
+# power(random(), k) skews activity towards low-numbered users and topics
+_PROGRESS_SQL = text("""
+    INSERT INTO progress_logs (user_id, topic_id, timestamp, status, notes)
+    SELECT CAST(:user_prefix AS text) || floor(CAST(:users AS int) * power(s.u, 2))::int,
+           t.ids[1 + floor(cardinality(t.ids) * power(s.v, 1.5))::int],
+           now() - s.age * make_interval(days => CAST(:days AS int)),
+           CASE WHEN s.r < 0.6 THEN 'viewed' WHEN s.r < 0.9 THEN 'in_progress' ELSE 'mastered' END,
+           CASE WHEN s.r < 0.02 THEN 'Synthetic note ' || s.g END
+    FROM (
+        SELECT g, random() AS u, random() AS v, random() AS r, random() AS age
+        FROM generate_series(CAST(:start AS bigint), CAST(:stop AS bigint)) AS g
+    ) s,
+    (SELECT array_agg(id ORDER BY id) AS ids FROM topics) t
+""")
+
+
+def _batch_seed(seed: int, table: str, batch: int) -> float:
+    """Deterministic setseed() argument in [-1, 1] for one batch."""
+    mixed = (seed * 1_000_003 + sum(map(ord, table)) * 7_919 + batch) % 2_000_001
+    return mixed / 1_000_000 - 1
+
+
+async def insert_batches(engine, table: str, stmt, total: int, batch_size: int, seed: int, **params) -> None:
+    """Run stmt over [1, total] in batch_size slices, one transaction per slice."""
+    done = 0
+    start = time.perf_counter()
+    for batch, lo in enumerate(range(1, total + 1, batch_size)):
+        hi = min(lo + batch_size - 1, total)
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT setseed(:s)"), {"s": _batch_seed(seed, table, batch)})
+            await conn.execute(stmt, {"start": lo, "stop": hi, **params})
+        done = hi
+        elapsed = time.perf_counter() - start
+        print(f"  {table}: {done:,}/{total:,} rows ({done / elapsed:,.0f} rows/s)", flush=True)
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = get_async_engine()
+    if engine is None:
+        raise SystemExit("Database not configured. See .env.example.")
+
+    if args.truncate:
+        async with engine.begin() as conn:
+            await conn.execute(_TRUNCATE_SQL)
+        print("Truncated topics, practice_templates, progress_logs and derived tables")
+
+    if args.topics:
+        await insert_batches(engine, "topics", _TOPICS_SQL, args.topics, args.batch_size, args.seed,
+                             adjectives=ADJECTIVES, nouns=NOUNS)
+    async with engine.connect() as conn:
+        if not (await conn.execute(text("SELECT count(*) FROM topics"))).scalar():
+            raise SystemExit("No topics to attach templates and progress to; pass --topics.")
+    if args.templates:
+        await insert_batches(engine, "practice_templates", _TEMPLATES_SQL, args.templates, args.batch_size,
+                             args.seed, accounts=ACCOUNTS)
+        print("Fingerprinting answer keys ...", flush=True)
+        async with get_async_session_local()() as db:
+            rows = await backfill_answer_fingerprints(db)
+            await db.commit()
+        print(f"  practice_templates: {rows:,} fingerprints")
+    if args.progress_logs:
+        async with engine.begin() as conn:
+            created = (await conn.execute(_PARTITIONS_SQL, {"days": args.days})).scalar()
+        print(f"  progress_logs: {created} partition(s) created")
+        await insert_batches(engine, "progress_logs", _PROGRESS_SQL, args.progress_logs, args.batch_size,
+                             args.seed, user_prefix=USER_PREFIX, users=args.users, days=args.days)
+        print("Rebuilding user_topic_state ...", flush=True)
+        async with get_async_session_local()() as db:
+            rows = await backfill_user_topic_state(db)
+            await db.commit()
+        print(f"  user_topic_state: {rows:,} rows")
+        print("Rebuilding analytics rollups ...", flush=True)
+        async with get_async_session_local()() as db:
+            counts = await backfill_progress_rollups(db)
+            await db.commit()
+        for table, rows in counts.items():
+            print(f"  {table}: {rows:,} rows")
+
+    # Fresh planner statistics so benchmark plans match a settled database
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(
+            "ANALYZE topics, practice_templates, progress_logs, user_topic_state, "
+            "user_topic_milestones, progress_rollups_hourly, progress_rollups_daily"
+        ))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=10000)
+    parser.add_argument("--templates", type=int, default=100000)
+    parser.add_argument("--progress-logs", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=50000, help="Distinct synth-user-<n> ids for progress_logs")
+    parser.add_argument("--days", type=int, default=365, help="Spread progress timestamps over this many days")
+    parser.add_argument("--batch-size", type=int, default=500000, help="Rows per INSERT ... SELECT transaction")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="Empty the tables first (destructive)")
+    asyncio.run(main(parser.parse_args()))
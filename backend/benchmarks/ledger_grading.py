@@ -0,0 +1,82 @@
+"""
+Benchmark: grading N Ledger Simulator submissions one request at a time
+vs one ``POST /api/practice/ledger/validate/batch`` request.
+
+Submissions are generated from the practice templates' own answer keys
+(half correct, a quarter with a wrong amount, a quarter unbalanced), spread
+across every template that has expected_entries.
+
+Requires a configured PostgreSQL database (see .env.example) with seeded
+practice templates, and httpx.
+
+Usage:
+    python -m benchmarks.ledger_grading --submissions 10000 --concurrency 10
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.common import print_table, run_concurrent
+from config import settings
+from core.app import create_app
+from database import get_async_engine, get_async_session_local
+from models.practice_template import PracticeTemplate
+
+
+def make_submissions(templates, n: int):
+    submissions = []
+    for i in range(n):
+        template_id, expected = templates[i % len(templates)]
+        entries = [dict(e) for e in expected]
+        if i % 4 == 2:
+            entries[0]["debit"] = float(entries[0].get("debit") or 0) + 1
+            entries[0]["credit"] = float(entries[0].get("credit") or 0) + 1
+        elif i % 4 == 3:
+            entries[0]["debit"] = float(entries[0].get("debit") or 0) + 1
+        submissions.append({"template_id": template_id, "entries": entries})
+    return submissions
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with get_async_session_local()() as db:
+        rows = await db.execute(
+            select(PracticeTemplate.id, PracticeTemplate.expected_entries).where(PracticeTemplate.expected_entries.isnot(None))
+        )
+        templates = [(r.id, r.expected_entries) for r in rows if r.expected_entries]
+    if not templates:
+        raise SystemExit("No practice templates with expected_entries; load infrastructure/seed_data.sql first.")
+    submissions = make_submissions(templates, args.submissions)
+
+    # Measure the routes, not admission control (one client, one address, more requests in flight than pool slots)
+    settings.ADMISSION_ENABLED = False
+    app = create_app()
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        pending = iter(submissions)
+
+        async def single():
+            s = next(pending)
+            resp = await client.post("/api/practice/ledger/validate", params={"template_id": s["template_id"]}, json={"entries": s["entries"]})
+            resp.raise_for_status()
+
+        summary = await run_concurrent(single, len(submissions), args.concurrency)
+        results["single_requests"] = {"submissions": len(submissions), "elapsed_s": summary["elapsed_s"], "submissions_per_s": summary["throughput_rps"]}
+
+        start = time.perf_counter()
+        resp = await client.post("/api/practice/ledger/validate/batch", json={"submissions": submissions})
+        resp.raise_for_status()
+        elapsed = time.perf_counter() - start
+        results["batch_request"] = {"submissions": len(resp.json()["results"]), "elapsed_s": round(elapsed, 4), "submissions_per_s": round(len(submissions) / elapsed, 2)}
+
+    print_table(results)
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=10, help="In-flight single requests")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,127 @@
+"""
+Benchmark: rows/sec for list endpoints, ORM + response_model vs column
+projection + core.fast_json.
+
+Serialization only (synthetic progress rows, no database):
+
+- orm_response_model: ProgressLog instances validated and dumped through
+  List[ProgressLogOut], as FastAPI does for a response_model
+- rows_stdlib / rows_orjson: row tuples to JSON bytes with core.fast_json,
+  using stdlib json / orjson (when installed)
+
+With ``--user-id``, also fetch + serialize one GET /api/progress page from
+the database both ways: ``select(ProgressLog)`` entities vs the selected
+columns (requires a configured PostgreSQL database, see .env.example).
+
+Usage:
+    python -m benchmarks.list_serialization --rows 500 --iterations 200
+    python -m benchmarks.list_serialization --rows 500 --user-id synth-user-0
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import desc, select
+
+from benchmarks.common import print_table, summarize, time_sync
+from core import fast_json
+from models.progress_log import ProgressLog
+from schemas.progress import ProgressLogOut
+
+FIELDS = ("id", "user_id", "topic_id", "timestamp", "status", "notes")
+STATUSES = ("viewed", "in_progress", "mastered")
+
+adapter = TypeAdapter(List[ProgressLogOut])
+
+
+def make_rows(n: int) -> list:
+    start = datetime(2025, 1, 1)
+    return [
+        (i, f"user-{i % 97}", i % 500, start + timedelta(seconds=37 * i, microseconds=i), STATUSES[i % 3],
+         None if i % 4 else f"note {i} — review")
+        for i in range(n)
+    ]
+
+
+def response_model_bytes(objects) -> bytes:
+    return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+
+def rows_bytes(rows, dumps) -> bytes:
+    return dumps([dict(zip(FIELDS, row)) for row in rows])
+
+
+def result_row(rows: int, summary: dict) -> dict:
+    return {
+        "rows": rows,
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+        "rows_per_s": round(rows * summary["throughput_rps"]),
+    }
+
+
+def serialization_results(n: int, iterations: int) -> dict:
+    rows = make_rows(n)
+    objects = [ProgressLog(**dict(zip(FIELDS, row))) for row in rows]
+    if response_model_bytes(objects) != rows_bytes(rows, fast_json._dumps_stdlib):
+        raise SystemExit("fast_json output differs from the response_model output")
+    cases = {
+        "orm_response_model": lambda: response_model_bytes(objects),
+        "rows_stdlib": lambda: rows_bytes(rows, fast_json._dumps_stdlib),
+    }
+    if fast_json.orjson is not None:
+        cases["rows_orjson"] = lambda: rows_bytes(rows, fast_json.orjson.dumps)
+    return {name: result_row(n, time_sync(call, iterations)) for name, call in cases.items()}
+
+
+async def database_results(user_id: str, n: int, iterations: int) -> dict:
+    from database import get_async_engine, get_async_session_local
+
+    order = (desc(ProgressLog.timestamp), desc(ProgressLog.id))
+    entity_stmt = select(ProgressLog).where(ProgressLog.user_id == user_id).order_by(*order).limit(n)
+    column_stmt = (
+        select(*(getattr(ProgressLog, f) for f in FIELDS))
+        .where(ProgressLog.user_id == user_id).order_by(*order).limit(n)
+    )
+
+    async def orm_page(db):
+        return response_model_bytes((await db.execute(entity_stmt)).scalars().all())
+
+    async def projected_page(db):
+        return fast_json.dumps([dict(zip(FIELDS, row)) for row in (await db.execute(column_stmt)).all()])
+
+    results = {}
+    async with get_async_session_local()() as db:
+        fetched = len((await db.execute(column_stmt)).all())
+        if not fetched:
+            raise SystemExit(f"No progress_logs for user {user_id!r}")
+        for name, page in (("db_orm_response_model", orm_page), ("db_projected_fast_json", projected_page)):
+            latencies = []
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(iterations):
+                t0 = loop.time()
+                await page(db)
+                # Identity map would otherwise serve later ORM iterations
+                db.expunge_all()
+                latencies.append(loop.time() - t0)
+            results[name] = result_row(fetched, summarize(latencies, loop.time() - start))
+    await get_async_engine().dispose()
+    return results
+
+
+def main(args: argparse.Namespace) -> None:
+    results = serialization_results(args.rows, args.iterations)
+    if args.user_id:
+        results.update(asyncio.run(database_results(args.user_id, args.rows, args.iterations)))
+    print_table(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="Rows per response (GET /api/progress allows 500)")
+    parser.add_argument("--iterations", type=int, default=200, help="Responses timed per case")
+    parser.add_argument("--user-id", help="Also benchmark fetching this user's progress page from the database")
+    main(parser.parse_args())
@@ -0,0 +1,319 @@
+"""
+Load test: drive every API route under concurrency and record throughput
+and p50/p95/p99 latency per endpoint.
+
+By default the app from ``core.app.create_app`` runs in-process (startup
+events included) against the database configured in .env; ``--base-url``
+targets a running server instead, e.g. ``uvicorn main:app --workers 4``
+(leave ADMISSION_ENABLED off unless measuring load shedding).
+Ids, topic names and answer keys are sampled through the API itself, so
+load ``benchmarks.datagen`` data first for realistic scale. Write endpoints
+add rows for throwaway ``loadtest-*`` users; use ``--read-only`` to skip them.
+
+Results can be saved as JSON and compared with an earlier run; with
+``--compare`` the exit status is 1 if any endpoint's p95 latency rose, or
+throughput fell, by more than ``--tolerance``.
+
+Requires a configured PostgreSQL database (see .env.example) and httpx.
+
+Usage:
+    python -m benchmarks.load_test --requests 500 --concurrency 10 --output baseline.json
+    python -m benchmarks.load_test --output current.json --compare baseline.json --tolerance 0.15
+    python -m benchmarks.load_test --only search_fuzzy,progress_dashboard
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from benchmarks.common import print_table, run_concurrent
+from benchmarks.datagen import USER_PREFIX
+from config import settings
+
+
+class Sample(NamedTuple):
+    """Data sampled from the API that request builders draw from."""
+    topics: List[dict]
+    templates: List[dict]
+    words: List[str]
+    users: int
+    rng: random.Random
+
+    def user(self) -> str:
+        # Square the draw to favour the busiest synthetic users, as datagen does
+        return f"{USER_PREFIX}{int(self.users * self.rng.random() ** 2)}"
+
+    def template(self) -> dict:
+        return self.rng.choice(self.templates)
+
+    def word(self) -> str:
+        return self.rng.choice(self.words)
+
+    def days_ago(self, days: int) -> str:
+        """Midnight `days` ago, so analytics windows hit the daily rollups."""
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+        return start.isoformat()
+
+    def progress_record(self) -> dict:
+        return {
+            "user_id": f"loadtest-user-{self.rng.randrange(1000)}",
+            "topic_id": self.rng.choice(self.topics)["id"],
+            "status": self.rng.choice(("viewed", "in_progress", "mastered")),
+            "notes": None,
+        }
+
+
+class Endpoint(NamedTuple):
+    """
+    One route scenario.
+
+    Attributes:
+        name: Result key
+        method: HTTP method
+        build: Returns client.request() keyword arguments (url, params, json)
+        write: True if the route writes to the database or clears caches
+        weight: Fraction of --requests to send (for expensive admin routes)
+    """
+    name: str
+    method: str
+    build: Callable[[Sample], dict]
+    write: bool = False
+    weight: float = 1.0
+
+
+def _submission(s: Sample) -> dict:
+    template = s.template()
+    return {"template_id": template["id"], "entries": template["expected_entries"]}
+
+
+def _validate_request(submission: dict) -> dict:
+    return {
+        "url": "/api/practice/ledger/validate",
+        "params": {"template_id": submission["template_id"]},
+        "json": {"entries": submission["entries"]},
+    }
+
+
+ENDPOINTS: List[Endpoint] = [
+    Endpoint("health", "GET", lambda s: {"url": "/health"}),
+    Endpoint("metrics", "GET", lambda s: {"url": "/metrics"}, weight=0.2),
+    Endpoint("search_contains", "GET", lambda s: {"url": "/api/search", "params": {"q": s.word()}}),
+    Endpoint("search_fuzzy", "GET", lambda s: {"url": "/api/search", "params": {"q": s.word(), "mode": "fuzzy"}}),
+    Endpoint("search_suggest", "GET", lambda s: {"url": "/api/search/suggest", "params": {"q": s.word()[:3]}}),
+    Endpoint("search_suggest_refresh", "POST", lambda s: {"url": "/api/search/suggest/refresh"}, write=True, weight=0.02),
+    Endpoint("practice_list", "GET", lambda s: {"url": "/api/practice", "params": {"topic_id": s.template()["topic_id"]}}),
+    Endpoint("practice_list_page", "GET", lambda s: {"url": "/api/practice", "params": {"limit": 100}}),
+    Endpoint("practice_topics", "GET", lambda s: {"url": "/api/practice/topics"}, weight=0.2),
+    Endpoint("practice_get", "GET", lambda s: {"url": f"/api/practice/{s.template()['id']}"}),
+    Endpoint("ledger_validate", "POST", lambda s: _validate_request(_submission(s))),
+    Endpoint("ledger_validate_batch", "POST", lambda s: {
+        "url": "/api/practice/ledger/validate/batch",
+        "json": {"submissions": [_submission(s) for _ in range(100)]},
+    }, weight=0.2),
+    Endpoint("answer_key_cache_stats", "GET", lambda s: {"url": "/api/practice/ledger/answer-key-cache"}),
+    Endpoint("answer_key_cache_clear", "DELETE", lambda s: {
+        "url": "/api/practice/ledger/answer-key-cache", "params": {"template_id": s.template()["id"]},
+    }, write=True, weight=0.1),
+    Endpoint("progress_log", "POST", lambda s: {"url": "/api/progress", "json": s.progress_record()}, write=True),
+    Endpoint("progress_bulk", "POST", lambda s: {
+        "url": "/api/progress/bulk", "json": [s.progress_record() for _ in range(100)],
+    }, write=True, weight=0.2),
+    Endpoint("progress_list", "GET", lambda s: {"url": "/api/progress", "params": {"user_id": s.user(), "limit": 100}}),
+    Endpoint("progress_dashboard", "GET", lambda s: {"url": "/api/progress/dashboard", "params": {"user_id": s.user()}}),
+    Endpoint("progress_export", "GET", lambda s: {
+        "url": "/api/progress/export", "params": {"user_id": s.user(), "include_topic_name": "true"},
+    }),
+    Endpoint("analytics_timeline", "GET", lambda s: {
+        "url": f"/api/analytics/topics/{s.rng.choice(s.topics)['id']}/timeline",
+    }),
+    Endpoint("analytics_topics", "GET", lambda s: {
+        "url": "/api/analytics/topics", "params": {"status": "mastered", "since": s.days_ago(7)},
+    }),
+    Endpoint("analytics_funnel", "GET", lambda s: {
+        "url": "/api/analytics/funnel", "params": {"topic_id": s.rng.choice(s.topics)["id"], "since": s.days_ago(30)},
+    }),
+]
+
+
+async def sample_data(client: httpx.AsyncClient, users: int, seed: int, templates_sampled: int = 100) -> Sample:
+    """Sample topics, templates (with answer keys) and search words via the API."""
+    resp = await client.get("/api/practice/topics")
+    resp.raise_for_status()
+    topics = resp.json()
+    resp = await client.get("/api/practice", params={"limit": 500})
+    resp.raise_for_status()
+    # The list view omits answer keys; fetch a spread of templates in full
+    rng = random.Random(seed)
+    listed = resp.json()
+    templates = []
+    for t in rng.sample(listed, min(templates_sampled, len(listed))):
+        resp = await client.get(f"/api/practice/{t['id']}")
+        resp.raise_for_status()
+        if resp.json().get("expected_entries"):
+            templates.append(resp.json())
+    if not topics or not templates:
+        raise SystemExit("No practice templates with answer keys; run benchmarks.datagen first.")
+    words = sorted({w for t in topics for w in t["name"].split() if len(w) >= 4 and not w.isdigit()})
+    return Sample(topics, templates, words, users, rng)
+
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, sample: Sample,
+                       total: int, concurrency: int, warmup: int) -> Dict[str, float]:
+    """Warm up, then drive one endpoint; non-2xx responses are counted as errors."""
+    errors = 0
+
+    async def call():
+        nonlocal errors
+        resp = await client.request(endpoint.method, **endpoint.build(sample))
+        if resp.status_code >= 400:
+            errors += 1
+
+    for _ in range(warmup):
+        await call()
+    errors = 0
+    result = await run_concurrent(call, total, concurrency)
+    result["errors"] = errors
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Print per-endpoint p95/throughput changes against a baseline run.
+
+    Returns:
+        Names of endpoints that regressed beyond tolerance
+    """
+    rows = {}
+    regressed = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        p95_change = now["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        rps_change = now["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0.0
+        bad = p95_change > tolerance or rps_change < -tolerance
+        if bad:
+            regressed.append(name)
+        rows[name] = {
+            "p95_ms_before": before["p95_ms"],
+            "p95_ms_after": now["p95_ms"],
+            "p95_change": f"{p95_change:+.1%}",
+            "rps_before": before["throughput_rps"],
+            "rps_after": now["throughput_rps"],
+            "rps_change": f"{rps_change:+.1%}",
+            "status": "REGRESSED" if bad else "ok",
+        }
+    print_table(rows)
+    return regressed
+
+
+@asynccontextmanager
+async def open_client(args: argparse.Namespace):
+    """HTTP client for --base-url, or an in-process app with startup events run."""
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+            yield client
+        return
+
+    from core.app import create_app
+    from database import get_async_engine
+    # Measure the routes, not the per-user limits (every request comes from one client)
+    settings.ADMISSION_ENABLED = False
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        # Unhandled app errors become 500s and count as errors, as over HTTP
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            yield client
+    engine = get_async_engine()
+    if engine is not None:
+        await engine.dispose()
+
+
+async def main(args: argparse.Namespace) -> int:
+    endpoints = [e for e in ENDPOINTS if not (args.read_only and e.write)]
+    if args.only:
+        wanted = set(args.only.split(","))
+        unknown = wanted - {e.name for e in ENDPOINTS}
+        if unknown:
+            raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        endpoints = [e for e in endpoints if e.name in wanted]
+
+    results: Dict[str, dict] = {}
+    async with open_client(args) as client:
+        sample = await sample_data(client, args.users, args.seed)
+        print(f"Sampled {len(sample.topics)} topics, {len(sample.templates)} templates; "
+              f"{args.requests} requests/endpoint at concurrency {args.concurrency}", flush=True)
+        for endpoint in endpoints:
+            total = max(1, int(args.requests * endpoint.weight))
+            results[endpoint.name] = await run_endpoint(
+                client, endpoint, sample, total, args.concurrency, args.warmup
+            )
+            print(f"  {endpoint.name}: {results[endpoint.name]['throughput_rps']} rps", flush=True)
+
+    print()
+    print_table(results)
+
+    if args.output:
+        report = {
+            "meta": {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "git_commit": git_commit(),
+                "target": args.base_url or "in-process",
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "seed": args.seed,
+                "db_pool_size": settings.DB_POOL_SIZE,
+                "python": platform.python_version(),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print(f"\nCompared with {args.compare} (tolerance {args.tolerance:.0%}):")
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            print(f"\nRegressions: {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint (scaled by its weight)")
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="Requests in flight; in-process, keep it within DB_POOL_SIZE + DB_MAX_OVERFLOW")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per endpoint")
+    parser.add_argument("--base-url", default=None, help="Target a running server instead of an in-process app")
+    parser.add_argument("--users", type=int, default=50000, help="Number of synth-user-<n> ids to read (as in datagen)")
+    parser.add_argument("--only", default=None, help="Comma-separated endpoint names to run")
+    parser.add_argument("--read-only", action="store_true", help="Skip endpoints that write")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed fractional p95/throughput change")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,70 @@
+"""
+Check: pool checkout timeouts reach /metrics and the readiness probe.
+
+Runs with a one-connection pool (no overflow, short checkout timeout).
+It holds the only connection, forces a checkout to time out, releases the
+connection and then asks core.readiness for a report. The pool is idle by
+then, so the only thing that can make readiness fail is the timeout
+counted since the previous check. Exits 1 unless db_pool_timeouts_total
+went up and readiness reported not_ready. A second report, with no new
+timeouts, should be ok again.
+
+Requires a configured PostgreSQL database (see .env.example).
+
+Usage:
+    python -m benchmarks.pool_saturation --timeout-ms 200
+"""
+import argparse
+import asyncio
+import sys
+
+from config import settings
+
+# Before the engine is created
+settings.DB_POOL_SIZE = 1
+settings.DB_MAX_OVERFLOW = 0
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError  # noqa: E402
+
+from core.metrics import metrics  # noqa: E402
+from core.readiness import NOT_READY, OK, ReadinessProbe  # noqa: E402
+from database import get_async_engine  # noqa: E402
+
+
+async def main(args: argparse.Namespace) -> int:
+    engine = get_async_engine()
+    if engine is None:
+        raise SystemExit("Database not configured; see .env.example.")
+    engine.sync_engine.pool._timeout = args.timeout_ms / 1000.0
+    probe = ReadinessProbe(cache_seconds=0)
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    await probe.check()  # baseline: counters since this point
+
+    timeouts_before = metrics.pool_timeouts
+    async with engine.connect() as held:
+        await held.execute(text("SELECT 1"))
+        try:
+            async with engine.connect():
+                pass
+            raise SystemExit("Checkout did not time out; is the pool larger than one connection?")
+        except PoolTimeoutError:
+            pass
+    after_timeout = await probe.check()
+    recovered = await probe.check()
+    await engine.dispose()
+
+    timeouts = metrics.pool_timeouts - timeouts_before
+    print(f"db_pool_timeouts_total +{timeouts}")
+    print(f"readiness after the timeout: {after_timeout['status']} (pool: {after_timeout['checks']['pool']})")
+    print(f"readiness on the next check: {recovered['status']}")
+    ok = timeouts == 1 and after_timeout["checks"]["pool"]["status"] == NOT_READY and recovered["checks"]["pool"]["status"] == OK
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timeout-ms", type=float, default=200, help="Pool checkout timeout to force")
+    sys.exit(asyncio.run(main(parser.parse_args())))
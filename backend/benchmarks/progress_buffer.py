@@ -0,0 +1,114 @@
+"""
+Benchmark: POST /api/progress with and without the write-behind buffer.
+
+Sends the same concurrent stream of single progress events twice, in-process
+against the app from ``core.app.create_app``: once with ``durable=true``
+(one transaction per request, as without the buffer) and once buffered
+(queued, flushed in multi-row inserts by core.progress_buffer). For each
+mode it reports request latency, accepted events/sec, events/sec until
+every event is in progress_logs, and connection pool usage: checked-out
+connections sampled every millisecond, plus checkout waits recorded by
+core.metrics. Rows are written for throwaway ``bench-*`` users.
+
+Requires a configured PostgreSQL database (see .env.example) with at least
+one topic, and httpx.
+
+Usage:
+    python -m benchmarks.progress_buffer --events 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.common import print_table, run_concurrent
+from benchmarks.progress_ingest import make_records
+from config import settings
+from core.metrics import metrics
+from core.progress_buffer import progress_buffer
+from database import get_async_engine, get_async_session_local
+from models.topic import Topic
+
+
+async def sample_pool(pool, samples: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        samples.append(pool.checkedout())
+        await asyncio.sleep(0.001)
+
+
+async def run_mode(client: httpx.AsyncClient, pool, records: list, durable: bool, concurrency: int) -> dict:
+    pending = iter(records)
+    expected_status = 200 if durable else 202
+    params = {"durable": "true"} if durable else None
+
+    async def call():
+        resp = await client.post("/api/progress", json=next(pending), params=params)
+        if resp.status_code != expected_status:
+            raise RuntimeError(f"POST /api/progress returned {resp.status_code}: {resp.text}")
+
+    samples: list = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_pool(pool, samples, stop))
+    waits_before, wait_seconds_before = metrics.pool_wait.count, metrics.pool_wait.sum
+    flushes_before = progress_buffer.flushes
+
+    start = time.perf_counter()
+    summary = await run_concurrent(call, len(records), concurrency)
+    await progress_buffer.flush()
+    drained = time.perf_counter() - start
+
+    stop.set()
+    await sampler
+    checkouts = metrics.pool_wait.count - waits_before
+    return {
+        "events": len(records),
+        "accepted_per_s": summary["throughput_rps"],
+        "written_per_s": round(len(records) / drained, 1),
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+        "checkouts": checkouts,
+        "pool_out_max": max(samples, default=0),
+        "pool_out_mean": round(sum(samples) / len(samples), 2) if samples else 0.0,
+        "pool_wait_ms": round((metrics.pool_wait.sum - wait_seconds_before) / max(checkouts, 1) * 1000, 3),
+        "flushes": progress_buffer.flushes - flushes_before,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with get_async_session_local()() as db:
+        topic_ids = list((await db.execute(select(Topic.id))).scalars())
+    if not topic_ids:
+        raise SystemExit("No topics found; load infrastructure/seed_data.sql first.")
+
+    # The buffer starts with the app, so enable it before create_app runs startup
+    settings.PROGRESS_BUFFER_ENABLED = True
+    # Measure the routes, not admission control (one client, one address, more requests in flight than pool slots)
+    settings.ADMISSION_ENABLED = False
+    from core.app import create_app
+    app = create_app()
+    pool = get_async_engine().sync_engine.pool
+    run_id = uuid.uuid4().hex[:8]
+    results = {}
+    async with app.router.lifespan_context(app):
+        limits = httpx.Limits(max_connections=args.concurrency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, timeout=None) as client:
+            for name, durable in (("durable", True), ("buffered", False)):
+                records = list(make_records(args.events, topic_ids, run_id + name[0]))
+                results[name] = await run_mode(client, pool, records, durable, args.concurrency)
+
+    print_table(results)
+    stats = progress_buffer.stats()
+    if stats["rejected"] or stats["dropped"]:
+        print(f"buffer rejected {stats['rejected']} and dropped {stats['dropped']} event(s)")
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000, help="Events sent per mode")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight")
+    asyncio.run(main(parser.parse_args()))
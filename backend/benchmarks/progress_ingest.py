@@ -0,0 +1,85 @@
+"""
+Benchmark: progress ingestion throughput in rows/sec.
+
+Compares one ``POST /api/progress`` per record against ``POST
+/api/progress/bulk`` with a JSON array and with a streamed NDJSON body,
+all in-process against the app from ``core.app.create_app``. Rows are
+written for throwaway ``bench-*`` users.
+
+Requires a configured PostgreSQL database (see .env.example) with at least
+one topic, and httpx.
+
+Usage:
+    python -m benchmarks.progress_ingest --rows 20000 --single-rows 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.common import print_table
+from config import settings
+from core.app import create_app
+from database import get_async_engine, get_async_session_local
+from models.topic import Topic
+
+STATUSES = ("viewed", "in_progress", "mastered")
+
+
+def make_records(n: int, topic_ids, run_id: str):
+    for i in range(n):
+        yield {
+            "user_id": f"bench-{run_id}-{i % 500}",
+            "topic_id": topic_ids[i % len(topic_ids)],
+            "status": STATUSES[i % len(STATUSES)],
+            "notes": None,
+        }
+
+
+def result_row(rows: int, elapsed: float):
+    return {"rows": rows, "elapsed_s": round(elapsed, 3), "rows_per_s": round(rows / elapsed, 1) if elapsed else 0.0}
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with get_async_session_local()() as db:
+        topic_ids = list((await db.execute(select(Topic.id))).scalars())
+    if not topic_ids:
+        raise SystemExit("No topics found; load infrastructure/seed_data.sql first.")
+
+    run_id = uuid.uuid4().hex[:8]
+    # Measure the routes, not admission control (one client, one address, more requests in flight than pool slots)
+    settings.ADMISSION_ENABLED = False
+    app = create_app()
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        records = list(make_records(args.single_rows, topic_ids, run_id + "s"))
+        start = time.perf_counter()
+        for record in records:
+            (await client.post("/api/progress", json=record)).raise_for_status()
+        results["single_post"] = result_row(len(records), time.perf_counter() - start)
+
+        records = list(make_records(args.rows, topic_ids, run_id + "j"))
+        start = time.perf_counter()
+        resp = await client.post("/api/progress/bulk", json=records)
+        resp.raise_for_status()
+        results["bulk_json"] = result_row(resp.json()["inserted"], time.perf_counter() - start)
+
+        body = "\n".join(json.dumps(r) for r in make_records(args.rows, topic_ids, run_id + "n")).encode()
+        start = time.perf_counter()
+        resp = await client.post("/api/progress/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+        resp.raise_for_status()
+        results["bulk_ndjson"] = result_row(resp.json()["inserted"], time.perf_counter() - start)
+
+    print_table(results)
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Rows per bulk request")
+    parser.add_argument("--single-rows", type=int, default=1000, help="Rows sent one POST at a time")
+    asyncio.run(main(parser.parse_args()))
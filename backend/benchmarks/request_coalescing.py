@@ -0,0 +1,95 @@
+"""
+Benchmark: bursts of identical catalog GETs with and without request
+coalescing (core.request_coalescing).
+
+Simulates a class opening the hub at once: each burst sends --concurrency
+identical requests at the same moment, for each of GET /api/practice/topics,
+/api/search?q=... and /api/practice/{id}, in-process against the app from
+``core.app.create_app``. The conditional-GET response cache is turned off
+so every burst reaches the handlers, as after a catalog change. Reports
+request latency, SQL statements executed (core.metrics) and requests
+answered from a shared execution.
+
+Requires a configured PostgreSQL database (see .env.example) with at least
+one practice template, and httpx.
+
+Usage:
+    python -m benchmarks.request_coalescing --bursts 50 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.common import print_table, summarize
+from config import settings
+from core.metrics import metrics
+from core.request_coalescing import request_coalescer
+from database import get_async_engine, get_async_session_local
+from models.practice_template import PracticeTemplate
+from models.topic import Topic
+
+
+async def run_mode(paths: list, coalesce: bool, bursts: int, concurrency: int) -> dict:
+    settings.COALESCE_ENABLED = coalesce
+    from core.app import create_app
+    app = create_app()
+    latencies = []
+    coalesced_before = request_coalescer.coalesced
+    queries_before = metrics.queries_total
+    async with app.router.lifespan_context(app):
+        queries_before = metrics.queries_total
+        limits = httpx.Limits(max_connections=concurrency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, timeout=None) as client:
+
+            async def call(path):
+                t0 = time.perf_counter()
+                resp = await client.get(path)
+                if resp.status_code != 200:
+                    raise RuntimeError(f"GET {path} returned {resp.status_code}: {resp.text}")
+                latencies.append(time.perf_counter() - t0)
+
+            start = time.perf_counter()
+            for burst in range(bursts):
+                path = paths[burst % len(paths)]
+                await asyncio.gather(*(call(path) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    summary = summarize(latencies, elapsed)
+    return {
+        "requests": len(latencies),
+        "rps": summary["throughput_rps"],
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+        "sql_statements": metrics.queries_total - queries_before,
+        "coalesced": request_coalescer.coalesced - coalesced_before,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with get_async_session_local()() as db:
+        template_id = (await db.execute(select(PracticeTemplate.id).limit(1))).scalar()
+        topic_name = (await db.execute(select(Topic.name).limit(1))).scalar()
+    if template_id is None:
+        raise SystemExit("No practice templates found; load infrastructure/seed_data.sql first.")
+    if not settings.METRICS_ENABLED:
+        raise SystemExit("Set METRICS_ENABLED=true to count SQL statements.")
+
+    settings.RESPONSE_CACHE_ENABLED = False
+    # Measure the routes, not admission control (one client, one address, more requests in flight than pool slots)
+    settings.ADMISSION_ENABLED = False
+    paths = ["/api/practice/topics", f"/api/search?q={topic_name.split()[0]}", f"/api/practice/{template_id}"]
+    results = {}
+    for name, coalesce in (("uncoalesced", False), ("coalesced", True)):
+        results[name] = await run_mode(paths, coalesce, args.bursts, args.concurrency)
+    print_table(results)
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bursts", type=int, default=50, help="Bursts sent per mode (rotating over the routes)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Identical requests per burst")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,58 @@
+"""
+Benchmark: in-process typeahead index vs the database ILIKE search path.
+
+Loads the topic catalog once, then times ``TopicIndex.suggest`` against the
+``/api/search`` contains query (``name ILIKE '%q%'`` via AsyncSession) for
+the same set of prefixes, reporting p50/p99 latency. ``--synthetic`` adds
+generated topics to the in-memory index to show how it scales with catalog
+size.
+
+Requires a configured PostgreSQL database (see .env.example).
+
+Usage:
+    python -m benchmarks.topic_search --iterations 2000 --synthetic 10000
+"""
+import argparse
+import asyncio
+import itertools
+
+from sqlalchemy import select
+
+from benchmarks.common import print_table, run_concurrent, time_sync
+from core.topic_index import TopicIndex, refresh_topic_index
+from database import get_async_engine, get_async_session_local
+from models.topic import Topic
+
+PREFIXES = ["rev", "revenue rec", "lea", "asc 8", "606", "fair", "inc", "cons"]
+
+
+async def main(args: argparse.Namespace) -> None:
+    index = await refresh_topic_index()
+    if args.synthetic:
+        topics = list(index.topics.values()) + [
+            {"id": -i, "name": f"Synthetic Topic {i} Measurement", "asc_reference": f"ASC {100 + i % 900}"}
+            for i in range(1, args.synthetic + 1)
+        ]
+        index = TopicIndex.build(topics)
+    print(f"Index: {len(index.topics)} topics, {len(index.postings)} tokens")
+
+    queries = itertools.cycle(PREFIXES)
+    results = {"index_suggest": time_sync(lambda: index.suggest(next(queries), 10), args.iterations)}
+
+    AsyncSessionLocal = get_async_session_local()
+    async with AsyncSessionLocal() as db:
+        async def ilike():
+            q = next(queries)
+            await db.execute(select(Topic).where(Topic.name.ilike(f"%{q}%")))
+        results["db_ilike"] = await run_concurrent(ilike, min(args.iterations, args.db_iterations), 1)
+
+    print_table(results)
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--db-iterations", type=int, default=500, help="Cap on sequential DB queries")
+    parser.add_argument("--synthetic", type=int, default=0, help="Extra generated topics for the index")
+    asyncio.run(main(parser.parse_args()))
@@ -25,6 +25,8 @@ class Settings:
     CORS_CREDENTIALS: bool = os.getenv("CORS_CREDENTIALS", "true").lower() == "true"
     CORS_METHODS: List[str] = os.getenv("CORS_METHODS", "*").split(",") if os.getenv("CORS_METHODS") != "*" else ["*"]
     CORS_HEADERS: List[str] = os.getenv("CORS_HEADERS", "*").split(",") if os.getenv("CORS_HEADERS") != "*" else ["*"]
+    # Response headers readable by cross-origin clients (pagination cursors, profiles)
+    CORS_EXPOSE_HEADERS: List[str] = ["X-Next-Cursor", "ETag", "X-Profile-Id"]
     
     # Database Settings
     DB_USER: str = os.getenv("DB_USER", "")
@@ -39,6 +41,107 @@ class Settings:
     DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
     DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
     
+    # Schema Migration Settings (apply pending migrations/ on startup; else run manage.py migrate)
+    DB_AUTO_MIGRATE: bool = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"
+    
+    # Read Replica Settings (optional; comma-separated URLs in DATABASE_URL format)
+    DB_REPLICA_URLS: List[str] = [u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()]
+    DB_REPLICA_POOL_SIZE: int = int(os.getenv("DB_REPLICA_POOL_SIZE", "5"))
+    DB_REPLICA_MAX_OVERFLOW: int = int(os.getenv("DB_REPLICA_MAX_OVERFLOW", "10"))
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("DB_REPLICA_CONNECT_TIMEOUT_SECONDS", "2"))
+    # A replica that fails to connect is skipped (reads go to the primary) for this long
+    DB_REPLICA_RETRY_SECONDS: float = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+    # After a user writes, their reads go to the primary for this long (read-your-writes)
+    DB_READ_YOUR_WRITES_SECONDS: float = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+    
+    # Bulk Progress Ingestion Settings
+    PROGRESS_BULK_CHUNK_SIZE: int = int(os.getenv("PROGRESS_BULK_CHUNK_SIZE", "1000"))
+    
+    # Progress Export Settings (rows fetched per server-side cursor batch)
+    PROGRESS_EXPORT_BATCH_SIZE: int = int(os.getenv("PROGRESS_EXPORT_BATCH_SIZE", "5000"))
+    
+    # Write-Behind Progress Buffer Settings (opt-in; see core.progress_buffer)
+    PROGRESS_BUFFER_ENABLED: bool = os.getenv("PROGRESS_BUFFER_ENABLED", "false").lower() == "true"
+    PROGRESS_BUFFER_MAX_EVENTS: int = int(os.getenv("PROGRESS_BUFFER_MAX_EVENTS", "10000"))
+    PROGRESS_BUFFER_FLUSH_BATCH: int = int(os.getenv("PROGRESS_BUFFER_FLUSH_BATCH", "500"))
+    PROGRESS_BUFFER_FLUSH_INTERVAL_MS: int = int(os.getenv("PROGRESS_BUFFER_FLUSH_INTERVAL_MS", "200"))
+    PROGRESS_BUFFER_ENQUEUE_TIMEOUT_MS: int = int(os.getenv("PROGRESS_BUFFER_ENQUEUE_TIMEOUT_MS", "100"))
+    
+    # Progress Log Partition Settings (see core.progress_partitions; retention 0 keeps every raw log)
+    PROGRESS_PARTITION_MONTHS_AHEAD: int = int(os.getenv("PROGRESS_PARTITION_MONTHS_AHEAD", "3"))
+    PROGRESS_PARTITION_CHECK_HOURS: float = float(os.getenv("PROGRESS_PARTITION_CHECK_HOURS", "24"))
+    PROGRESS_RETENTION_MONTHS: int = int(os.getenv("PROGRESS_RETENTION_MONTHS", "0"))
+    
+    # Ledger Simulator Answer Key Cache Settings
+    ANSWER_KEY_CACHE_SIZE: int = int(os.getenv("ANSWER_KEY_CACHE_SIZE", "1024"))
+    ANSWER_KEY_CACHE_TTL_SECONDS: float = float(os.getenv("ANSWER_KEY_CACHE_TTL_SECONDS", "300"))
+    LEDGER_BATCH_MAX_SUBMISSIONS: int = int(os.getenv("LEDGER_BATCH_MAX_SUBMISSIONS", "10000"))
+    
+    # Catalog Response Cache Settings (ETag / conditional GET)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+    RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    CATALOG_VERSION_TTL_SECONDS: float = float(os.getenv("CATALOG_VERSION_TTL_SECONDS", "5"))
+    
+    # Catalog Delta Sync Settings (GET /api/catalog/sync; see routers/catalog.py)
+    # Tokens are moved back this far to cover writers whose transactions are not visible in pg_stat_activity
+    CATALOG_SYNC_OVERLAP_SECONDS: float = float(os.getenv("CATALOG_SYNC_OVERLAP_SECONDS", "60"))
+    
+    # Request Coalescing Settings (identical concurrent GETs to @coalesced routes share one execution)
+    COALESCE_ENABLED: bool = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+    COALESCE_MAX_KEYS: int = int(os.getenv("COALESCE_MAX_KEYS", "1024"))
+    
+    # Admission Control Settings (see core.admission; limits are per worker; off unless enabled)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "false").lower() == "true"
+    # Open database sessions; 0 sizes it to the pool (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    ADMISSION_MAX_CONCURRENCY: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "0"))
+    # Share of those slots writes may hold, keeping the rest for reads
+    ADMISSION_WRITE_SHARE: float = float(os.getenv("ADMISSION_WRITE_SHARE", "0.75"))
+    ADMISSION_QUEUE_TIMEOUT_MS: int = int(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "100"))
+    ADMISSION_RETRY_AFTER_SECONDS: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+    # Streaming exports hold a read slot for the whole stream; at most this many at once
+    ADMISSION_EXPORT_MAX_CONCURRENCY: int = int(os.getenv("ADMISSION_EXPORT_MAX_CONCURRENCY", "2"))
+    # Per-user token buckets (requests per second, burst); a rate of 0 disables that limit
+    RATE_LIMIT_PROGRESS_WRITE_PER_SECOND: float = float(os.getenv("RATE_LIMIT_PROGRESS_WRITE_PER_SECOND", "5"))
+    RATE_LIMIT_PROGRESS_WRITE_BURST: float = float(os.getenv("RATE_LIMIT_PROGRESS_WRITE_BURST", "20"))
+    RATE_LIMIT_DASHBOARD_PER_SECOND: float = float(os.getenv("RATE_LIMIT_DASHBOARD_PER_SECOND", "2"))
+    RATE_LIMIT_DASHBOARD_BURST: float = float(os.getenv("RATE_LIMIT_DASHBOARD_BURST", "10"))
+    RATE_LIMIT_LEDGER_PER_SECOND: float = float(os.getenv("RATE_LIMIT_LEDGER_PER_SECOND", "5"))
+    RATE_LIMIT_LEDGER_BURST: float = float(os.getenv("RATE_LIMIT_LEDGER_BURST", "20"))
+    RATE_LIMIT_EXPORT_PER_SECOND: float = float(os.getenv("RATE_LIMIT_EXPORT_PER_SECOND", "0.1"))
+    RATE_LIMIT_EXPORT_BURST: float = float(os.getenv("RATE_LIMIT_EXPORT_BURST", "3"))
+    # Callers known only by client address (often many users behind one NAT or proxy)
+    # get buckets this many times larger
+    RATE_LIMIT_ANONYMOUS_FACTOR: float = float(os.getenv("RATE_LIMIT_ANONYMOUS_FACTOR", "20"))
+    RATE_LIMIT_MAX_USERS: int = int(os.getenv("RATE_LIMIT_MAX_USERS", "100000"))
+    
+    # Frontend Asset Settings (hashed assets are cached for a year; HTML for this long)
+    FRONTEND_INDEX_MAX_AGE_SECONDS: int = int(os.getenv("FRONTEND_INDEX_MAX_AGE_SECONDS", "60"))
+    
+    # Readiness Probe Settings (GET /health/ready; see core.readiness)
+    READINESS_CACHE_SECONDS: float = float(os.getenv("READINESS_CACHE_SECONDS", "1"))
+    READINESS_DB_TIMEOUT_SECONDS: float = float(os.getenv("READINESS_DB_TIMEOUT_SECONDS", "2"))
+    READINESS_DB_LATENCY_DEGRADED_MS: float = float(os.getenv("READINESS_DB_LATENCY_DEGRADED_MS", "100"))
+    READINESS_DB_LATENCY_NOT_READY_MS: float = float(os.getenv("READINESS_DB_LATENCY_NOT_READY_MS", "1000"))
+    # Share of pool capacity (DB_POOL_SIZE + DB_MAX_OVERFLOW) or progress buffer in use;
+    # a full pool is only degraded (pool waits and timeouts decide not ready)
+    READINESS_DEGRADED_UTILIZATION: float = float(os.getenv("READINESS_DEGRADED_UTILIZATION", "0.8"))
+    READINESS_NOT_READY_UTILIZATION: float = float(os.getenv("READINESS_NOT_READY_UTILIZATION", "1.0"))
+    # Mean connection checkout wait since the previous check
+    READINESS_POOL_WAIT_DEGRADED_MS: float = float(os.getenv("READINESS_POOL_WAIT_DEGRADED_MS", "50"))
+    READINESS_POOL_WAIT_NOT_READY_MS: float = float(os.getenv("READINESS_POOL_WAIT_NOT_READY_MS", "500"))
+    
+    # Request Profiling Settings (opt-in; see core.profiling and GET /admin/profiles)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    # Requests sending X-Profile: <token> are profiled; /admin/profiles is only served when set (X-Profile-Token)
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_BUFFER_SIZE: int = int(os.getenv("PROFILING_BUFFER_SIZE", "200"))
+    PROFILING_MAX_STATEMENTS: int = int(os.getenv("PROFILING_MAX_STATEMENTS", "100"))
+    
+    # Metrics Settings (Prometheus /metrics endpoint)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
     @classmethod
     def get_database_url(cls, async_driver: bool = True) -> str:
         """
@@ -65,6 +168,14 @@ class Settings:
         
         protocol = "postgresql+asyncpg" if async_driver else "postgresql"
         return f"{protocol}://{cls.DB_USER}:{cls.DB_PASSWORD}@{cls.DB_HOST}:{cls.DB_PORT}/{cls.DB_NAME}"
+    
+    @classmethod
+    def get_replica_urls(cls) -> List[str]:
+        """Read replica URLs from DB_REPLICA_URLS, using the asyncpg driver."""
+        return [
+            url.replace("postgresql://", "postgresql+asyncpg://", 1) if url.startswith("postgresql://") else url
+            for url in cls.DB_REPLICA_URLS
+        ]
 
 # Global settings instance
 settings = Settings()
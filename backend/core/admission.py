@@ -0,0 +1,309 @@
+"""
+Admission control in front of the database pool.
+
+Two independent checks, both answered immediately instead of letting a
+request queue into a pool timeout:
+
+- Per-user token buckets on the expensive routes (``rate_limit(name)``
+  as a route dependency): progress writes, the dashboard and ledger
+  grading each refill at their own RATE_LIMIT_*_PER_SECOND up to
+  RATE_LIMIT_*_BURST per user. An empty bucket answers 429 with
+  Retry-After set to when the next token arrives. Users are identified by
+  the ``user_id`` query parameter, the X-User-Id header, the ``user_id``
+  field of the JSON body (routes opting in), or else the client address.
+  A client address can stand for a whole classroom behind one NAT or
+  proxy, so those callers have their own buckets, RATE_LIMIT_ANONYMOUS_FACTOR
+  times larger.
+
+- A concurrency limiter sized to the pool (ADMISSION_MAX_CONCURRENCY, by
+  default DB_POOL_SIZE + DB_MAX_OVERFLOW), taken by get_async_db and
+  get_async_read_db for as long as the session is open. Writes (any
+  method but GET/HEAD) may hold at most ADMISSION_WRITE_SHARE of the
+  slots, and a freed slot goes to a waiting read before a waiting write,
+  so grading and progress floods cannot starve catalog and dashboard
+  reads. Cached reads are answered by core.response_cache (and shared
+  by core.request_coalescing) without opening a session, so they never
+  wait here. A request that gets no slot within ADMISSION_QUEUE_TIMEOUT_MS
+  answers 503 with Retry-After.
+
+- Progress exports stream for as long as the client reads, holding their
+  slot throughout, so at most ADMISSION_EXPORT_MAX_CONCURRENCY of them run
+  at once (``export_slot()``); another answers 503 straight away.
+
+Limits are per worker process.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from config import settings
+
+USER_ID_HEADER = "x-user-id"
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per key (user), refilled at ``rate`` tokens per second up
+    to ``burst``. At most ``max_keys`` buckets are kept (least recently
+    used dropped; a dropped bucket comes back full).
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_keys = max_keys
+        # key -> [tokens, time.monotonic() of last refill]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self.admitted = 0
+        self.limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def take(self, key: str) -> float:
+        """Take a token for key: 0 if admitted, else seconds until the next token."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            self.admitted += 1
+            return 0.0
+        self.limited += 1
+        return (1.0 - bucket[0]) / self.rate
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "users": len(self._buckets),
+            "admitted": self.admitted,
+            "limited": self.limited,
+        }
+
+
+class ConcurrencyLimiter:
+    """
+    Slots for open database sessions. Writes may hold at most
+    ``write_limit`` of the ``limit`` slots; waiting reads are admitted
+    before waiting writes.
+    """
+
+    def __init__(self, limit: int, write_limit: int):
+        self.limit = max(limit, 1)
+        self.write_limit = max(min(write_limit, self.limit), 1)
+        self.in_use = 0
+        self.writes_in_use = 0
+        self._read_waiters: Deque[asyncio.Future] = deque()
+        self._write_waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.waited = 0
+        self.shed = 0
+
+    def _can_admit(self, write: bool) -> bool:
+        if self.in_use >= self.limit:
+            return False
+        return not write or self.writes_in_use < self.write_limit
+
+    def _grant(self, write: bool) -> None:
+        self.in_use += 1
+        if write:
+            self.writes_in_use += 1
+        self.admitted += 1
+
+    async def acquire(self, write: bool, timeout: float) -> bool:
+        """Take a slot, waiting at most timeout seconds; False if none was free."""
+        # Nobody jumps the queue: reads wait behind reads, writes behind everyone
+        queued = self._read_waiters or (write and self._write_waiters)
+        if not queued and self._can_admit(write):
+            self._grant(write)
+            return True
+        if timeout <= 0:
+            self.shed += 1
+            return False
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._write_waiters if write else self._read_waiters
+        waiters.append(future)
+        self.waited += 1
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Granted just as the wait ended: hand the slot back
+                self.release(write)
+            else:
+                waiters.remove(future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.shed += 1
+            return False
+
+    def release(self, write: bool) -> None:
+        self.in_use -= 1
+        if write:
+            self.writes_in_use -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self.in_use < self.limit:
+            if self._read_waiters:
+                future, write = self._read_waiters.popleft(), False
+            elif self._write_waiters and self.writes_in_use < self.write_limit:
+                future, write = self._write_waiters.popleft(), True
+            else:
+                return
+            if not future.done():
+                self._grant(write)
+                future.set_result(True)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "write_limit": self.write_limit,
+            "in_use": self.in_use,
+            "writes_in_use": self.writes_in_use,
+            "waiting": len(self._read_waiters) + len(self._write_waiters),
+            "admitted": self.admitted,
+            "waited": self.waited,
+            "shed": self.shed,
+        }
+
+
+def _pool_capacity() -> int:
+    return settings.ADMISSION_MAX_CONCURRENCY or (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+
+class AdmissionController:
+    """The per-route token buckets and the database concurrency limiter of this worker."""
+
+    def __init__(self):
+        limit = _pool_capacity()
+        self.concurrency = ConcurrencyLimiter(limit, int(limit * settings.ADMISSION_WRITE_SHARE))
+        # Reads only, so the write limit is moot
+        exports = settings.ADMISSION_EXPORT_MAX_CONCURRENCY
+        self.exports = ConcurrencyLimiter(exports, exports)
+        limits = (
+            ("progress_write", settings.RATE_LIMIT_PROGRESS_WRITE_PER_SECOND, settings.RATE_LIMIT_PROGRESS_WRITE_BURST),
+            ("dashboard", settings.RATE_LIMIT_DASHBOARD_PER_SECOND, settings.RATE_LIMIT_DASHBOARD_BURST),
+            ("ledger", settings.RATE_LIMIT_LEDGER_PER_SECOND, settings.RATE_LIMIT_LEDGER_BURST),
+            ("export", settings.RATE_LIMIT_EXPORT_PER_SECOND, settings.RATE_LIMIT_EXPORT_BURST),
+        )
+        factor = settings.RATE_LIMIT_ANONYMOUS_FACTOR
+        self.rate_limiters: Dict[str, TokenBucketLimiter] = {
+            name: TokenBucketLimiter(rate, burst, settings.RATE_LIMIT_MAX_USERS) for name, rate, burst in limits
+        }
+        # Keyed by client address, for callers that send no user id
+        self.anonymous_rate_limiters: Dict[str, TokenBucketLimiter] = {
+            name: TokenBucketLimiter(rate * factor, burst * factor, settings.RATE_LIMIT_MAX_USERS)
+            for name, rate, burst in limits
+        }
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.ADMISSION_ENABLED,
+            "concurrency": self.concurrency.stats(),
+            "exports": self.exports.stats(),
+            "rate_limits": {name: limiter.stats() for name, limiter in self.rate_limiters.items()},
+            "anonymous_rate_limits": {name: limiter.stats() for name, limiter in self.anonymous_rate_limiters.items()},
+        }
+
+
+admission = AdmissionController()
+
+
+async def _user_key(request: Request, body_user_id: bool) -> Optional[str]:
+    user_id = request.query_params.get("user_id") or request.headers.get(USER_ID_HEADER)
+    if not user_id and body_user_id:
+        try:
+            # Already read and parsed by FastAPI for the body model, so this is cached
+            body = await request.json()
+            user_id = body.get("user_id") if isinstance(body, dict) else None
+        except ValueError:
+            user_id = None
+    if user_id:
+        return f"user:{user_id}"
+    return None
+
+
+def rate_limit(name: str, body_user_id: bool = False):
+    """
+    Route dependency taking a token from the user's bucket for ``name``
+    (429 with Retry-After when empty), or the client address's anonymous
+    bucket when the request names no user. Pass body_user_id=True on routes
+    whose JSON body model carries ``user_id``; never on streamed bodies.
+    """
+    async def check_rate_limit(request: Request) -> None:
+        if not settings.ADMISSION_ENABLED:
+            return
+        key = await _user_key(request, body_user_id)
+        if key is not None:
+            limiter = admission.rate_limiters[name]
+        else:
+            limiter = admission.anonymous_rate_limiters[name]
+            key = f"client:{request.client.host if request.client else 'unknown'}"
+        if not limiter.enabled:
+            return
+        wait = limiter.take(key)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests; slow down",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+    return check_rate_limit
+
+
+@asynccontextmanager
+async def database_slot(request: Request):
+    """Hold a concurrency slot for the body of the block, or raise 503 if none frees up in time."""
+    if not settings.ADMISSION_ENABLED:
+        yield
+        return
+    write = request.method not in ("GET", "HEAD")
+    limiter = admission.concurrency
+    if not await limiter.acquire(write, settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000.0):
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy; retry shortly",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        yield
+    finally:
+        limiter.release(write)
+
+
+@asynccontextmanager
+async def export_slot():
+    """Hold one of the ADMISSION_EXPORT_MAX_CONCURRENCY export slots, or raise 503 at once if none is free."""
+    if not settings.ADMISSION_ENABLED:
+        yield
+        return
+    limiter = admission.exports
+    if not await limiter.acquire(False, 0):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many exports running; retry shortly",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        yield
+    finally:
+        limiter.release(False)
@@ -0,0 +1,317 @@
+"""
+Compiled answer keys for the Ledger Simulator.
+
+Each practice template stores a multiset fingerprint of its expected_entries
+(expected_fingerprint): the sum, modulo 2**128, of a hash of every normalized
+(account, debit, credit) line. It does not depend on line order, so grading
+a submission is one linear pass to fingerprint its lines and one integer
+comparison; nothing is sorted. Only when the fingerprints differ are the
+expected lines loaded and a linear multiset diff run, to report missing,
+extra and wrong-amount lines.
+
+Fingerprints are set on every ORM write (see the listeners below); rows
+written in SQL get them from ``python manage.py backfill-answer-fingerprints``,
+and until then are fingerprinted from expected_entries when first loaded.
+Keys are kept in a bounded LRU/TTL cache keyed by template id, so repeat
+submissions do no database queries.
+"""
+import hashlib
+import time
+from functools import lru_cache
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import case, event, select, update
+
+from config import settings
+from models.practice_template import PracticeTemplate
+
+Line = Tuple[str, float, float]
+
+
+_FINGERPRINT_MOD = 1 << 128
+
+# Distinct (account, debit, credit) lines whose hash is memoized; submissions
+# mostly repeat the lines of a small set of answer keys
+_LINE_HASH_CACHE_SIZE = 65536
+
+
+def normalize_line(account, debit, credit) -> Line:
+    """
+    Same rules as the validator: account stripped/lower, amounts rounded to
+    cents. Adding 0.0 turns -0.0 (e.g. -0.001 rounded) into 0.0, which the
+    validator treats as equal but formats differently in _line_hash.
+    """
+    return (
+        (account or "").strip().lower(),
+        round(float(debit or 0), 2) + 0.0,
+        round(float(credit or 0), 2) + 0.0,
+    )
+
+
+def normalize_entries(expected_entries) -> Tuple[Line, ...]:
+    """Normalized lines of an expected_entries JSON array."""
+    return tuple(
+        normalize_line(e.get("account", ""), e.get("debit", 0), e.get("credit", 0)) for e in expected_entries or ()
+    )
+
+
+@lru_cache(maxsize=_LINE_HASH_CACHE_SIZE)
+def _line_hash(line: Line) -> int:
+    # Stable across processes (stored in the database), unlike hash()
+    account, debit, credit = line
+    data = f"{account}\x1f{debit:.2f}\x1f{credit:.2f}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "big")
+
+
+def multiset_fingerprint(lines: Iterable[Line]) -> int:
+    """Order-independent fingerprint of normalized lines; repeated lines count."""
+    return sum(map(_line_hash, lines)) % _FINGERPRINT_MOD
+
+
+def answer_fingerprint(expected_entries) -> Optional[str]:
+    """Value for practice_templates.expected_fingerprint; None if there is no solution."""
+    if not expected_entries:
+        return None
+    return f"{multiset_fingerprint(normalize_entries(expected_entries)):032x}"
+
+
+class AmountMismatch(NamedTuple):
+    """A submitted line whose account is expected but with different amounts."""
+    expected: Line
+    submitted: Line
+
+
+class LineDiff(NamedTuple):
+    missing: List[Line]
+    extra: List[Line]
+    wrong_amount: List[AmountMismatch]
+
+
+def diff_lines(expected: Iterable[Line], submitted: Iterable[Line]) -> LineDiff:
+    """
+    Linear-time multiset diff. Lines present on both sides cancel out; a
+    leftover submitted line whose account has a leftover expected line is a
+    wrong amount, and the rest are extra (submitted) or missing (expected).
+    """
+    remaining = Counter(expected)
+    unmatched = []
+    for line in submitted:
+        if remaining[line] > 0:
+            remaining[line] -= 1
+        else:
+            unmatched.append(line)
+    by_account: Dict[str, List[Line]] = {}
+    for line, count in remaining.items():
+        by_account.setdefault(line[0], []).extend([line] * count)
+    extra, wrong_amount = [], []
+    for line in unmatched:
+        candidates = by_account.get(line[0])
+        if candidates:
+            wrong_amount.append(AmountMismatch(expected=candidates.pop(), submitted=line))
+        else:
+            extra.append(line)
+    missing = [line for lines in by_account.values() for line in lines]
+    return LineDiff(missing=missing, extra=extra, wrong_amount=wrong_amount)
+
+
+class AnswerKey:
+    """
+    A template's solution: its fingerprint, plus the normalized expected lines
+    once loaded (only needed to explain a mismatch; see load_answer_lines).
+    """
+    __slots__ = ("fingerprint", "lines")
+
+    def __init__(self, fingerprint: int, lines: Optional[Tuple[Line, ...]] = None):
+        self.fingerprint = fingerprint
+        self.lines = lines
+
+    def matches(self, fingerprint: int) -> bool:
+        return fingerprint == self.fingerprint
+
+
+def compile_answer_key(stored_fingerprint: Optional[str], expected_entries=None) -> Optional[AnswerKey]:
+    """
+    Build a key from the stored fingerprint, or from expected_entries for rows
+    not yet backfilled. None if there is no solution.
+    """
+    if stored_fingerprint:
+        return AnswerKey(int(stored_fingerprint, 16))
+    if not expected_entries:
+        return None
+    lines = normalize_entries(expected_entries)
+    return AnswerKey(multiset_fingerprint(lines), lines)
+
+
+_MISSING = object()
+
+
+class AnswerKeyCache:
+    """
+    Bounded LRU cache of compiled answer keys with a TTL.
+
+    Templates without a solution are cached too (as None) so they also skip
+    the database. The TTL bounds staleness for edits made outside the ORM;
+    edits through the ORM invalidate immediately (see the listeners below).
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Optional[AnswerKey]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, template_id: int):
+        """Return the cached key (possibly None), or _MISSING on a miss or expiry."""
+        entry = self._entries.get(template_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(template_id)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[template_id]
+        self.misses += 1
+        return _MISSING
+
+    def put(self, template_id: int, key: Optional[AnswerKey]) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[template_id] = (time.monotonic() + self.ttl_seconds, key)
+        self._entries.move_to_end(template_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, template_id: Optional[int] = None) -> None:
+        """Drop one template's key, or every key if template_id is None."""
+        if template_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(template_id, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+answer_key_cache = AnswerKeyCache(settings.ANSWER_KEY_CACHE_SIZE, settings.ANSWER_KEY_CACHE_TTL_SECONDS)
+
+
+async def get_answer_key(db, template_id: int) -> Optional[AnswerKey]:
+    """
+    Get the compiled answer key for a template, loading it on a cache miss.
+
+    Returns:
+        The AnswerKey, or None if the template is missing or has no solution
+    """
+    key = answer_key_cache.get(template_id)
+    if key is not _MISSING:
+        return key
+    row = (await db.execute(_key_stmt().where(PracticeTemplate.id == template_id))).one_or_none()
+    key = compile_answer_key(row.expected_fingerprint, row.expected_entries) if row is not None else None
+    answer_key_cache.put(template_id, key)
+    return key
+
+
+async def get_answer_keys(db, template_ids: Iterable[int]) -> Dict[int, Optional[AnswerKey]]:
+    """
+    Get compiled answer keys for many templates, loading every uncached one
+    in a single query.
+
+    Returns:
+        Mapping of each requested id to its AnswerKey, or None if missing/no solution
+    """
+    keys: Dict[int, Optional[AnswerKey]] = {}
+    missing = []
+    for template_id in set(template_ids):
+        key = answer_key_cache.get(template_id)
+        if key is _MISSING:
+            missing.append(template_id)
+        else:
+            keys[template_id] = key
+    if missing:
+        rows = await db.execute(_key_stmt().where(PracticeTemplate.id.in_(missing)))
+        loaded = {r.id: compile_answer_key(r.expected_fingerprint, r.expected_entries) for r in rows}
+        for template_id in missing:
+            key = loaded.get(template_id)
+            answer_key_cache.put(template_id, key)
+            keys[template_id] = key
+    return keys
+
+
+def _key_stmt():
+    # expected_entries only for rows without a stored fingerprint
+    return select(
+        PracticeTemplate.id,
+        PracticeTemplate.expected_fingerprint,
+        case((PracticeTemplate.expected_fingerprint.is_(None), PracticeTemplate.expected_entries)).label(
+            "expected_entries"
+        ),
+    )
+
+
+async def load_answer_lines(db, keys: Dict[int, AnswerKey]) -> None:
+    """Fill in the expected lines of keys that need a diff (one query for all)."""
+    pending = [template_id for template_id, key in keys.items() if key.lines is None]
+    if not pending:
+        return
+    rows = await db.execute(
+        select(PracticeTemplate.id, PracticeTemplate.expected_entries).where(PracticeTemplate.id.in_(pending))
+    )
+    for row in rows:
+        keys[row.id].lines = normalize_entries(row.expected_entries)
+
+
+async def backfill_answer_fingerprints(db, batch_size: int = 1000) -> int:
+    """
+    Recompute expected_fingerprint for every practice template, in id order
+    and batches of batch_size. The caller commits.
+
+    Returns:
+        Number of templates whose fingerprint changed
+    """
+    changed = 0
+    after_id = 0
+    while True:
+        rows = (await db.execute(
+            select(PracticeTemplate.id, PracticeTemplate.expected_entries, PracticeTemplate.expected_fingerprint)
+            .where(PracticeTemplate.id > after_id)
+            .order_by(PracticeTemplate.id)
+            .limit(batch_size)
+        )).all()
+        if not rows:
+            break
+        updates = [
+            {"id": r.id, "expected_fingerprint": fingerprint}
+            for r in rows
+            if (fingerprint := answer_fingerprint(r.expected_entries)) != r.expected_fingerprint
+        ]
+        if updates:
+            await db.execute(update(PracticeTemplate), updates)
+            changed += len(updates)
+        after_id = rows[-1].id
+    answer_key_cache.invalidate()
+    return changed
+
+
+@event.listens_for(PracticeTemplate, "before_insert")
+@event.listens_for(PracticeTemplate, "before_update")
+def _fingerprint_on_write(mapper, connection, target):
+    target.expected_fingerprint = answer_fingerprint(target.expected_entries)
+
+
+@event.listens_for(PracticeTemplate, "after_insert")
+@event.listens_for(PracticeTemplate, "after_update")
+@event.listens_for(PracticeTemplate, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    answer_key_cache.invalidate(target.id)
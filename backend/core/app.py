@@ -4,7 +4,7 @@ Application factory and initialization.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
-from database import get_engine, Base
+from database import get_async_engine
 
 
 def create_app() -> FastAPI:
@@ -18,6 +18,12 @@ def create_app() -> FastAPI:
         version=settings.API_VERSION
     )
     
+    # Conditional-GET cache for catalog routes; added before CORS so CORS
+    # wraps it and cached responses still carry CORS headers
+    if settings.RESPONSE_CACHE_ENABLED:
+        from core.response_cache import CatalogCacheMiddleware
+        app.add_middleware(CatalogCacheMiddleware)
+    
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -25,8 +31,20 @@ def create_app() -> FastAPI:
         allow_credentials=settings.CORS_CREDENTIALS,
         allow_methods=settings.CORS_METHODS,
         allow_headers=settings.CORS_HEADERS,
+        expose_headers=settings.CORS_EXPOSE_HEADERS,
     )
     
+    # Opt-in request profiling; inside metrics, outside everything else
+    if settings.PROFILING_ENABLED:
+        from core.profiling import ProfilingMiddleware, install_profiling
+        install_profiling()
+        app.add_middleware(ProfilingMiddleware)
+    
+    # Request metrics; added last so it is outermost and times the full stack
+    if settings.METRICS_ENABLED:
+        from core.metrics import MetricsMiddleware
+        app.add_middleware(MetricsMiddleware)
+    
     # Register routers
     register_routers(app)
     
@@ -38,26 +56,38 @@ def create_app() -> FastAPI:
 
 def register_routers(app: FastAPI) -> None:
     """Register all application routers"""
-    from routers import search, practice, progress, health
+    from routers import search, practice, progress, analytics, catalog, health, metrics, profiling
     
     app.include_router(health.router)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router)
+    # Profiles hold query strings, user ids and SQL: never served without a token
+    if settings.PROFILING_ENABLED and settings.PROFILING_TOKEN:
+        app.include_router(profiling.router)
+    elif settings.PROFILING_ENABLED:
+        import logging
+        logging.getLogger(__name__).warning("PROFILING_TOKEN is not set; /admin/profiles is disabled")
     app.include_router(search.router, prefix="/api")
     app.include_router(practice.router, prefix="/api")
+    app.include_router(catalog.router, prefix="/api")
     app.include_router(progress.router, prefix="/api")
+    app.include_router(analytics.router, prefix="/api")
 
 
 def register_startup_events(app: FastAPI) -> None:
-    """Register application startup events"""
+    """Register application startup and shutdown events"""
     @app.on_event("startup")
     async def startup_event():
-        """Initialize database tables on startup"""
-        # Import models to ensure they're registered with Base.metadata
-        from models import Topic, PracticeTemplate, ProgressLog  # noqa: F401
-        
+        """Check the schema version (applying pending migrations) on startup"""
         try:
-            engine = get_engine()
+            engine = get_async_engine()
             if engine is not None:
-                Base.metadata.create_all(bind=engine)
+                # One query when the schema is current (see core.migrations)
+                from core.migrations import ensure_schema
+                await ensure_schema(engine)
+                # Build the in-process typeahead index (see core.topic_index)
+                from core.topic_index import refresh_topic_index
+                await refresh_topic_index()
         except Exception as e:
             # Log the error but don't prevent server startup
             # Database endpoints will handle connection errors gracefully
@@ -65,3 +95,21 @@ def register_startup_events(app: FastAPI) -> None:
             logger = logging.getLogger(__name__)
             logger.warning(f"Could not initialize database on startup: {e}")
             logger.info("Server will continue to run. Database endpoints may not work until PostgreSQL is running.")
+        
+        if settings.PROGRESS_BUFFER_ENABLED:
+            from core.progress_buffer import progress_buffer
+            progress_buffer.start()
+        
+        if get_async_engine() is not None:
+            # Future progress_logs partitions and retention (see core.progress_partitions)
+            from core.progress_partitions import partition_maintenance
+            partition_maintenance.start()
+    
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """Write any buffered progress events and stop background maintenance before the process exits"""
+        if settings.PROGRESS_BUFFER_ENABLED:
+            from core.progress_buffer import progress_buffer
+            await progress_buffer.stop()
+        from core.progress_partitions import partition_maintenance
+        await partition_maintenance.stop()
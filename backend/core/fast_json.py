@@ -0,0 +1,52 @@
+"""
+Lean JSON responses for list endpoints.
+
+Hot list routes (practice templates, topic search, progress history) select
+only the columns they return and serialize the row tuples straight to JSON
+bytes, skipping ORM hydration (identity map, instance state) and the
+per-row Pydantic validation and re-encoding that ``response_model`` does.
+The bytes are the same as FastAPI's default JSONResponse for the same data:
+compact separators, non-ASCII left unescaped, datetimes in ISO 8601.
+
+orjson is used when installed; otherwise the stdlib json module.
+"""
+import json
+from datetime import datetime
+from typing import Iterable, Sequence
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def _dumps_stdlib(content) -> bytes:
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+dumps = orjson.dumps if orjson is not None else _dumps_stdlib
+
+
+def rows_response(rows: Iterable[Sequence], fields: Sequence[str], response: Response) -> Response:
+    """
+    JSON array with one object per row, keyed by fields in row order.
+
+    Args:
+        rows: Row tuples (e.g. from a column select), values in fields order
+        fields: Object keys, in the order of the response model's fields
+        response: The endpoint's injected Response; headers set on it
+            (X-Next-Cursor) are carried over, as FastAPI would for a model
+    """
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    body = dumps([dict(zip(fields, row)) for row in rows])
+    return Response(body, media_type="application/json", headers=headers)
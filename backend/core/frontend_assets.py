@@ -0,0 +1,212 @@
+"""
+Fingerprinted, precompressed frontend asset serving.
+
+At startup (or ``python manage.py build-assets`` for a CDN / reverse proxy)
+every file under frontend/ gets a content-hashed name, e.g. ``app.3f9c2a1b7d.js``,
+and references to those files in HTML are rewritten to the hashed names.
+Text assets are compressed once, with gzip and (if the ``brotli`` package is
+installed) brotli, and kept in memory; each request only picks a variant
+from Accept-Encoding.
+
+Hashed files never change under their name, so they are sent with a
+one-year immutable Cache-Control. HTML pages, and the original unhashed
+names, are cached for FRONTEND_INDEX_MAX_AGE_SECONDS and revalidated by ETag,
+so a deploy reaches browsers within that window.
+"""
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path, PurePosixPath
+from typing import Dict
+
+from starlette.datastructures import Headers
+from starlette.responses import RedirectResponse, Response
+
+from config import settings
+from core.response_cache import etag_matches
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+_REFERENCE_RE = re.compile(r'(?P<attr>\b(?:href|src)=["\'])(?P<url>[^"\'#?]+)')
+
+
+class Asset:
+    """One servable file: its encoded bodies and response headers."""
+    __slots__ = ("media_type", "cache_control", "etag", "bodies")
+
+    def __init__(self, bodies: Dict[str, bytes], media_type: str, cache_control: str, digest: str):
+        self.bodies = bodies
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = digest
+
+    def etag_for(self, encoding: str) -> str:
+        return f'"{self.etag}"' if encoding == "identity" else f'"{self.etag}-{encoding}"'
+
+
+def _encode(content: bytes, media_type: str) -> Dict[str, bytes]:
+    """Identity body plus gzip/brotli variants for compressible types."""
+    bodies = {"identity": content}
+    if media_type.startswith(_COMPRESSIBLE_TYPES):
+        variants = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(content, quality=11)
+        # Tiny files can grow when compressed; only keep variants that save bytes
+        bodies.update((enc, body) for enc, body in variants.items() if len(body) < len(content))
+    return bodies
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:10]
+
+
+def _media_type(path: Path) -> str:
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def hashed_name(relative: str, digest: str) -> str:
+    """``js/app.js`` -> ``js/app.<digest>.js``"""
+    path = PurePosixPath(relative)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+
+def _rewrite_references(html: str, base: str, hashed: Dict[str, str]) -> str:
+    """Point relative href/src attributes at hashed asset names."""
+    def replace(match):
+        url = match.group("url")
+        target = str(PurePosixPath(base, url)) if base else str(PurePosixPath(url))
+        if target not in hashed:
+            return match.group(0)
+        name = PurePosixPath(url).name
+        return match.group("attr") + url[: len(url) - len(name)] + PurePosixPath(hashed[target]).name
+    return _REFERENCE_RE.sub(replace, html)
+
+
+def build_frontend_assets(directory: Path) -> Dict[str, Asset]:
+    """
+    Fingerprint and precompress every file under directory.
+
+    Returns:
+        Assets keyed by URL path relative to the mount: hashed names, the
+        original names, and rewritten HTML pages
+    """
+    files = {
+        path.relative_to(directory).as_posix(): path
+        for path in sorted(directory.rglob("*"))
+        if path.is_file() and not any(part.startswith(".") for part in path.relative_to(directory).parts)
+    }
+    assets: Dict[str, Asset] = {}
+    hashed: Dict[str, str] = {}
+    short_cache = f"public, max-age={settings.FRONTEND_INDEX_MAX_AGE_SECONDS}"
+
+    for relative, path in files.items():
+        if path.suffix == ".html":
+            continue
+        content = path.read_bytes()
+        digest, media_type = _digest(content), _media_type(path)
+        bodies = _encode(content, media_type)
+        hashed[relative] = hashed_name(relative, digest)
+        assets[hashed[relative]] = Asset(bodies, media_type, IMMUTABLE_CACHE_CONTROL, digest)
+        # Unhashed name stays reachable for anything that hard-codes it
+        assets[relative] = Asset(bodies, media_type, short_cache, digest)
+
+    for relative, path in files.items():
+        if path.suffix != ".html":
+            continue
+        base = str(PurePosixPath(relative).parent) if "/" in relative else ""
+        content = _rewrite_references(path.read_text(encoding="utf-8"), base, hashed).encode("utf-8")
+        media_type = _media_type(path)
+        assets[relative] = Asset(_encode(content, media_type), media_type, short_cache, _digest(content))
+    return assets
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Best encoding in ENCODINGS order that the client accepts (q > 0) and we have."""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name] = q
+    for encoding in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+def write_frontend_assets(assets: Dict[str, Asset], out_dir: Path) -> int:
+    """Write every asset and its precompressed variants (``.gz`` / ``.br``) under out_dir."""
+    written = 0
+    for relative, asset in assets.items():
+        target = out_dir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for encoding, body in asset.bodies.items():
+            target.with_name(target.name + ENCODING_SUFFIXES.get(encoding, "")).write_bytes(body)
+            written += 1
+    return written
+
+
+class FrontendAssets:
+    """ASGI app serving build_frontend_assets(directory); mount it like StaticFiles."""
+
+    def __init__(self, directory: Path, index: str = "index.html"):
+        self.assets = build_frontend_assets(directory)
+        self.index = index
+
+    async def __call__(self, scope, receive, send):
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        if path == "":
+            # Relative references in index.html need the trailing slash
+            response = RedirectResponse(url=f"{root_path}/", status_code=307)
+            await response(scope, receive, send)
+            return
+
+        if scope["method"] not in ("GET", "HEAD"):
+            await Response(status_code=405, headers={"Allow": "GET, HEAD"})(scope, receive, send)
+            return
+
+        relative = path.lstrip("/")
+        asset = self.assets.get(relative or self.index) or self.assets.get(f"{relative.rstrip('/')}/{self.index}")
+        if asset is None:
+            await Response("Not Found", status_code=404, media_type="text/plain")(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = choose_encoding(headers.get("accept-encoding", ""), asset.bodies)
+        etag = asset.etag_for(encoding)
+        response_headers = {"Cache-Control": asset.cache_control, "ETag": etag, "Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+
+        if etag_matches(headers.get("if-none-match"), etag):
+            response = Response(status_code=304, headers=response_headers)
+        else:
+            body = asset.bodies[encoding]
+            response_headers["Content-Length"] = str(len(body))
+            if scope["method"] == "HEAD":
+                body = b""
+            response = Response(body, media_type=asset.media_type, headers=response_headers)
+        await response(scope, receive, send)
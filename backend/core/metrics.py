@@ -0,0 +1,325 @@
+"""
+Lightweight in-process metrics exposed in Prometheus text format.
+
+Records per-route latency histograms, request counts by status, per-request
+SQL statement counts and DB time (via SQLAlchemy cursor events), and
+connection pool occupancy / checkout wait. Everything is plain counters and
+fixed-bucket histograms updated on the event loop, so the hot-path cost is a
+few perf_counter() calls and a bisect per request.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    """SQL activity of the request currently being served."""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set by MetricsMiddleware for the duration of each request; SQLAlchemy's
+# greenlets inherit it, so cursor events can attribute queries to the request
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+RouteKey = Tuple[str, str]  # (method, route template)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[RouteKey, Histogram] = {}
+        self.request_queries: Dict[RouteKey, Histogram] = {}
+        self.request_db_seconds: Dict[RouteKey, Histogram] = {}
+        self.queries_total = 0
+        self.db_seconds_total = 0.0
+        self.pool_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.pool_timeouts = 0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        counter_key = (method, route, status)
+        self.requests[counter_key] = self.requests.get(counter_key, 0) + 1
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self.request_db_seconds[key] = Histogram(LATENCY_BUCKETS)
+        latency.observe(seconds)
+        self.request_queries[key].observe(stats.queries)
+        self.request_db_seconds[key].observe(stats.db_seconds)
+
+
+metrics = MetricsRegistry()
+
+
+def _route_label(scope) -> str:
+    """
+    Route template for a request (/api/practice/{template_id}), not the raw
+    path, to keep label cardinality bounded. Some FastAPI versions record the
+    route without its include_router prefix, so the prefix is taken from the
+    leading segments of the request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    depth = template.count("/")
+    segments = scope["path"].split("/")
+    if len(segments) <= depth:
+        return template
+    return "/".join(segments[:len(segments) - depth]) + template
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request; register it outermost."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request_stats.reset(token)
+            metrics.observe_request(scope["method"], _route_label(scope), status, elapsed, stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    metrics.queries_total += 1
+    metrics.db_seconds_total += elapsed
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(sync_engine) -> None:
+    """Attach query counting/timing hooks to an Engine (use AsyncEngine.sync_engine)."""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Seconds spent creating connections during the checkout in progress (outermost _do_get)
+_checkout_connect_seconds: ContextVar[Optional[list]] = ContextVar("_checkout_connect_seconds", default=None)
+
+
+class MeteredAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long checkouts wait for a
+    connection. Only the outermost _do_get is timed (it recurses for
+    overflow and retries), and time spent opening a new connection is
+    not counted as waiting.
+    """
+
+    def _do_get(self):
+        if _checkout_connect_seconds.get() is not None:
+            return super()._do_get()
+        connect_seconds = [0.0]
+        token = _checkout_connect_seconds.set(connect_seconds)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.pool_timeouts += 1
+            raise
+        finally:
+            _checkout_connect_seconds.reset(token)
+            metrics.pool_wait.observe(max(time.perf_counter() - start - connect_seconds[0], 0.0))
+
+    def _create_connection(self):
+        connect_seconds = _checkout_connect_seconds.get()
+        if connect_seconds is None:
+            return super()._create_connection()
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            connect_seconds[0] += time.perf_counter() - start
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, hist: Histogram, **labels) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels) if labels else ''} {hist.sum}")
+    lines.append(f"{name}_count{_labels(**labels) if labels else ''} {hist.count}")
+    return lines
+
+
+def _header(name: str, kind: str, help_text: str) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+    out: List[str] = []
+
+    out += _header("http_requests_total", "counter", "HTTP requests by method, route and status.")
+    for (method, route, status), count in sorted(metrics.requests.items()):
+        out.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    for name, series, help_text in (
+        ("http_request_duration_seconds", metrics.latency, "Request latency by route."),
+        ("http_request_db_queries", metrics.request_queries, "SQL statements issued per request."),
+        ("http_request_db_seconds", metrics.request_db_seconds, "Time spent executing SQL per request."),
+    ):
+        out += _header(name, "histogram", help_text)
+        for (method, route), hist in sorted(series.items()):
+            out += _histogram_lines(name, hist, method=method, route=route)
+
+    out += _header("db_queries_total", "counter", "SQL statements executed.")
+    out.append(f"db_queries_total {metrics.queries_total}")
+    out += _header("db_query_seconds_total", "counter", "Time spent executing SQL.")
+    out.append(f"db_query_seconds_total {metrics.db_seconds_total}")
+
+    from database import get_async_engine
+    async_engine = get_async_engine()
+    pool = async_engine.sync_engine.pool if async_engine is not None else None
+    if pool is not None and hasattr(pool, "checkedout"):
+        for name, value, help_text in (
+            ("db_pool_size", pool.size(), "Configured pool size (DB_POOL_SIZE)."),
+            ("db_pool_checked_out", pool.checkedout(), "Connections currently checked out."),
+            ("db_pool_checked_in", pool.checkedin(), "Idle connections in the pool."),
+            ("db_pool_overflow", pool.overflow(), "Overflow connections in use (negative while below pool size)."),
+        ):
+            out += _header(name, "gauge", help_text)
+            out.append(f"{name} {value}")
+    if settings.DB_REPLICA_URLS:
+        from database import replica_status
+        replicas = replica_status()
+        out += _header("db_replica_up", "gauge", "1 if the read replica is in rotation, 0 while skipped after a failure.")
+        out += [f"db_replica_up{_labels(replica=i)} {int(r['up'])}" for i, r in enumerate(replicas)]
+        out += _header("db_replica_pool_checked_out", "gauge", "Replica connections currently checked out.")
+        out += [f"db_replica_pool_checked_out{_labels(replica=i)} {r['pool'].checkedout()}" for i, r in enumerate(replicas)]
+    out += _header("db_pool_wait_seconds", "histogram", "Time spent waiting to check out a pooled connection.")
+    out += _histogram_lines("db_pool_wait_seconds", metrics.pool_wait)
+    out += _header("db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection.")
+    out.append(f"db_pool_timeouts_total {metrics.pool_timeouts}")
+
+    from core.answer_keys import answer_key_cache
+    from core.response_cache import response_cache
+    for prefix, stats in (("answer_key_cache", answer_key_cache.stats()), ("response_cache", response_cache.stats())):
+        for stat in ("hits", "misses"):
+            out += _header(f"{prefix}_{stat}_total", "counter", f"{prefix.replace('_', ' ').capitalize()} {stat}.")
+            out.append(f"{prefix}_{stat}_total {stats[stat]}")
+
+    from core.request_coalescing import request_coalescer
+    coalescer_stats = request_coalescer.stats()
+    out += _header("request_coalescing_in_flight", "gauge", "Coalesced GET executions currently running.")
+    out.append(f"request_coalescing_in_flight {coalescer_stats['in_flight']}")
+    for stat, help_text in (
+        ("executions", "Handler executions for coalesced GET routes."),
+        ("coalesced", "Requests answered from an identical in-flight execution (executions saved)."),
+        ("bypassed", "Coalescable requests run on their own because the key table was full."),
+        ("errors", "Waiting requests that received the shared execution's error."),
+    ):
+        out += _header(f"request_coalescing_{stat}_total", "counter", help_text)
+        out.append(f"request_coalescing_{stat}_total {coalescer_stats[stat]}")
+
+    from core.admission import admission
+    concurrency = admission.concurrency.stats()
+    for name, help_text in (
+        ("limit", "Database sessions admitted at once (ADMISSION_MAX_CONCURRENCY)."),
+        ("in_use", "Admission slots held by open database sessions."),
+        ("waiting", "Requests waiting for an admission slot."),
+    ):
+        out += _header(f"admission_{name}", "gauge", help_text)
+        out.append(f"admission_{name} {concurrency[name]}")
+    for stat, help_text in (
+        ("admitted", "Requests given an admission slot."),
+        ("waited", "Requests that queued for an admission slot."),
+        ("shed", "Requests answered 503 because no admission slot freed up in time."),
+    ):
+        out += _header(f"admission_{stat}_total", "counter", help_text)
+        out.append(f"admission_{stat}_total {concurrency[stat]}")
+    exports = admission.exports.stats()
+    out += _header(
+        "admission_exports_in_use", "gauge", "Progress exports streaming (at most ADMISSION_EXPORT_MAX_CONCURRENCY)."
+    )
+    out.append(f"admission_exports_in_use {exports['in_use']}")
+    out += _header(
+        "admission_exports_shed_total", "counter", "Progress exports answered 503 because the export limit was reached."
+    )
+    out.append(f"admission_exports_shed_total {exports['shed']}")
+    out += _header(
+        "rate_limit_limited_total", "counter",
+        "Requests answered 429 by a token bucket, by route group and caller (user or anonymous client address).",
+    )
+    for caller, limiters in (("user", admission.rate_limiters), ("anonymous", admission.anonymous_rate_limiters)):
+        for name, stats in limiters.items():
+            out.append(f"rate_limit_limited_total{_labels(limit=name, caller=caller)} {stats.limited}")
+
+    from core.progress_buffer import progress_buffer
+    buffer_stats = progress_buffer.stats()
+    out += _header("progress_buffer_queued", "gauge", "Progress events waiting in the write-behind buffer.")
+    out.append(f"progress_buffer_queued {buffer_stats['queued']}")
+    for stat, help_text in (
+        ("accepted", "Progress events accepted into the write-behind buffer."),
+        ("rejected", "Progress events refused because the buffer was full."),
+        ("written", "Buffered progress events written to the database."),
+        ("dropped", "Buffered progress events discarded after failed writes."),
+        ("flushes", "Write-behind buffer flushes."),
+    ):
+        out += _header(f"progress_buffer_{stat}_total", "counter", help_text)
+        out.append(f"progress_buffer_{stat}_total {buffer_stats[stat]}")
+
+    return "\n".join(out) + "\n"
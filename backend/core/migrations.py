@@ -0,0 +1,189 @@
+"""
+Versioned schema migrations.
+
+Applies the numbered SQL files in backend/migrations/ (``NNN_description.sql``)
+in order, each in its own transaction, and records every applied version in
+the schema_version table. On startup the recorded versions are compared
+with the files in one query; pending migrations are applied then (if
+DB_AUTO_MIGRATE) or with ``python manage.py migrate``.
+
+Migrations whose header has a ``-- migrate: manual`` line (ones that
+rewrite large tables) are skipped on startup, with a warning that
+``manage.py migrate`` has to run them; later migrations are still applied,
+so a manual migration must not be a prerequisite of them. With
+``-- migrate: manual unless-empty <table>`` it is applied on startup anyway
+while that table has no rows (a new database). Concurrent runners,
+e.g. several workers starting at once, serialize on a PostgreSQL advisory
+lock, so each migration runs exactly once.
+
+The migrations are idempotent (IF NOT EXISTS), so databases created by the
+old create_all startup or from infrastructure/schema.sql are adopted by
+running them.
+"""
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+_FILENAME_RE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# Marks a migration too slow to run while workers start (see ensure_schema)
+_MANUAL_RE = re.compile(r"^--\s*migrate:\s*manual(?:\s+unless-empty\s+(\w+))?\s*$", re.MULTILINE)
+
+# Arbitrary, fixed pg_advisory_lock key for the migration runner
+_LOCK_KEY = 72_030_517
+
+_CREATE_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: Path
+    manual: bool = False
+    # Table whose being empty lets a manual migration run on startup
+    unless_empty: Optional[str] = None
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Numbered migration files in version order."""
+    migrations = []
+    for path in directory.glob("*.sql"):
+        match = _FILENAME_RE.match(path.name)
+        if match:
+            manual = _MANUAL_RE.search(path.read_text(encoding="utf-8"))
+            migrations.append(Migration(
+                int(match.group(1)), match.group(2), path, manual is not None, manual and manual.group(1),
+            ))
+    migrations.sort()
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+async def applied_versions(engine) -> Optional[Set[int]]:
+    """Versions recorded in schema_version (one query), or None if never migrated."""
+    async with engine.connect() as conn:
+        try:
+            return set((await conn.execute(text("SELECT version FROM schema_version"))).scalars())
+        except ProgrammingError:
+            # schema_version does not exist yet
+            return None
+
+
+async def migration_status(engine, directory: Path = MIGRATIONS_DIR) -> List[Tuple[Migration, Optional[datetime]]]:
+    """Every migration with its applied_at time, or None if pending."""
+    applied = {}
+    async with engine.connect() as conn:
+        try:
+            rows = await conn.execute(text("SELECT version, applied_at FROM schema_version"))
+            applied = dict(rows.all())
+        except ProgrammingError:
+            pass
+    return [(m, applied.get(m.version)) for m in discover_migrations(directory)]
+
+
+async def _table_is_empty(driver, table: Optional[str]) -> bool:
+    if table is None:
+        return False
+    exists = await driver.fetchval("SELECT to_regclass($1) IS NOT NULL", table)
+    return not exists or not await driver.fetchval(f"SELECT EXISTS (SELECT 1 FROM {table})")
+
+
+async def apply_migrations(
+    engine, directory: Path = MIGRATIONS_DIR, target: Optional[int] = None, include_manual: bool = True,
+) -> List[Migration]:
+    """
+    Apply pending migrations up to target (default: all), oldest first.
+    With include_manual=False, pending migrations marked
+    ``-- migrate: manual`` are skipped unless their unless-empty table has
+    no rows.
+
+    Returns:
+        The migrations applied by this call
+    """
+    migrations = discover_migrations(directory)
+    applied: List[Migration] = []
+    async with engine.connect() as conn:
+        # Plain asyncpg connection: migration files hold several statements,
+        # which SQLAlchemy's prepared-statement execution does not accept
+        driver = (await conn.get_raw_connection()).driver_connection
+        await driver.execute("SELECT pg_advisory_lock($1)", _LOCK_KEY)
+        try:
+            await driver.execute(_CREATE_VERSION_TABLE)
+            done = {row["version"] for row in await driver.fetch("SELECT version FROM schema_version")}
+            for migration in migrations:
+                if migration.version in done or (target is not None and migration.version > target):
+                    continue
+                if migration.manual and not include_manual and not await _table_is_empty(driver, migration.unless_empty):
+                    logger.warning(
+                        f"Migration {migration.path.name} is marked manual and was not applied. "
+                        "Run: python manage.py migrate"
+                    )
+                    continue
+                async with driver.transaction():
+                    await driver.execute(migration.path.read_text(encoding="utf-8"))
+                    await driver.execute(
+                        "INSERT INTO schema_version (version, name) VALUES ($1, $2)",
+                        migration.version, migration.name,
+                    )
+                logger.info(f"Applied migration {migration.path.name}")
+                applied.append(migration)
+        finally:
+            await driver.execute("SELECT pg_advisory_unlock($1)", _LOCK_KEY)
+    return applied
+
+
+async def _any_applicable_on_startup(engine, pending: List[Migration]) -> bool:
+    if any(not m.manual for m in pending):
+        return True
+    tables = [m.unless_empty for m in pending if m.unless_empty]
+    if not tables:
+        return False
+    async with engine.connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection
+        for table in tables:
+            if await _table_is_empty(driver, table):
+                return True
+    return False
+
+
+async def ensure_schema(engine) -> None:
+    """
+    Startup check: one query when the schema is current. Otherwise apply
+    pending migrations (skipping manual ones) if DB_AUTO_MIGRATE, or log
+    how to.
+    """
+    migrations = discover_migrations()
+    if not migrations:
+        return
+    done = await applied_versions(engine)
+    pending = [m for m in migrations if done is None or m.version not in done]
+    if not pending:
+        return
+    names = ", ".join(m.path.name for m in pending)
+    if not settings.DB_AUTO_MIGRATE:
+        logger.warning(f"Pending schema migrations: {names}. Run: python manage.py migrate")
+        return
+    if not await _any_applicable_on_startup(engine, pending):
+        # Skip the advisory lock and the migration pass
+        logger.warning(f"Pending manual schema migrations: {names}. Run: python manage.py migrate")
+        return
+    await apply_migrations(engine, include_manual=False)
@@ -0,0 +1,62 @@
+"""
+Opaque keyset (cursor) pagination helpers.
+
+List endpoints keep returning plain JSON arrays; when more rows exist the
+cursor for the next page is sent in the ``X-Next-Cursor`` response header
+and passed back as ``?cursor=``. The cursor encodes the sort key of the last
+row returned, so every page is a bounded index range scan instead of an
+OFFSET that re-reads all earlier rows.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Callable, List, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    """Encode sort-key values (datetimes as ISO strings) into an opaque token."""
+    payload = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> Tuple:
+    """
+    Decode a cursor and coerce each value to the expected type.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or from another endpoint
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(types):
+            raise ValueError(cursor)
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for v, t in zip(raw, types)
+        )
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(rows: Sequence, limit: int, response: Response, key: Callable[[object], tuple]) -> List:
+    """
+    Trim a limit+1 fetch to one page and set the next-page cursor header.
+
+    Args:
+        rows: Rows fetched with LIMIT limit + 1
+        limit: Page size
+        response: Response to set the X-Next-Cursor header on
+        key: Returns the sort-key values of a row, in cursor order
+    """
+    page = list(rows[:limit])
+    if len(rows) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(page[-1]))
+    return page
@@ -0,0 +1,261 @@
+"""
+On-demand request profiling (opt-in; PROFILING_ENABLED).
+
+A request is profiled when it carries ``X-Profile: <PROFILING_TOKEN>`` or
+is picked at PROFILING_SAMPLE_RATE. Its profile breaks the wall time down
+into:
+
+- sql: every statement (text without parameters, duration, offset from
+  the start of the request and the phase it ran in)
+- validation: FastAPI's parameter, body and dependency resolution
+  (Pydantic request validation, session setup, rate limits)
+- handler: the endpoint function
+- serialization: response_model validation and dumping (routes returning
+  a Response, such as the fast_json lists, serialize inside the handler)
+- other: everything else (middleware, cache, body read, rendering,
+  dependency teardown)
+
+validation and handler exclude the SQL they ran. Profiles go to a ring
+buffer of the last PROFILING_BUFFER_SIZE; GET /admin/profiles (with a
+PROFILING_TOKEN) lists the slowest of them (see routers/profiling.py) and profiled responses carry
+X-Profile-Id.
+
+The phases are timed by wrapping FastAPI's solve_dependencies,
+run_endpoint_function and serialize_response, and SQL by engine cursor
+events. None of this is installed unless PROFILING_ENABLED is set, so a
+disabled build runs exactly the code it ran before; when enabled,
+requests that are not profiled cost one ContextVar lookup per hook.
+"""
+import hmac
+import itertools
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, List, Optional
+from urllib.parse import parse_qs
+
+import fastapi.routing
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import settings
+from core.metrics import _route_label
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+_SQL_TEXT_LIMIT = 1000
+
+
+class RequestProfile:
+    """Timings of one profiled request; times are perf_counter() seconds until to_dict()."""
+
+    def __init__(self, profile_id: int, scope, reason: str):
+        self.id = profile_id
+        self.reason = reason
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query = scope.get("query_string", b"").decode("latin-1")
+        # Query parameter, else X-User-Id (as in core.admission)
+        self.user_id = (parse_qs(self.query).get("user_id") or [None])[0] or next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == b"x-user-id"), None
+        )
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.route = None
+        self.endpoint = None
+        self.status = 500
+        self.total = 0.0
+        self.phase: Optional[str] = None
+        self.phases = {"validation": 0.0, "handler": 0.0, "serialization": 0.0}
+        self.sql_by_phase = {}
+        self.statements: List[dict] = []
+        self.statements_dropped = 0
+        self.sql = 0.0
+
+    def add_statement(self, statement: str, elapsed: float, started: float) -> None:
+        self.sql += elapsed
+        phase = self.phase or "other"
+        self.sql_by_phase[phase] = self.sql_by_phase.get(phase, 0.0) + elapsed
+        if len(self.statements) >= settings.PROFILING_MAX_STATEMENTS:
+            self.statements_dropped += 1
+            return
+        self.statements.append({
+            "sql": statement[:_SQL_TEXT_LIMIT],
+            "ms": round(elapsed * 1000, 3),
+            "at_ms": round((started - self.start) * 1000, 3),
+            "phase": phase,
+        })
+
+    def to_dict(self, statements: bool = True) -> dict:
+        exclusive = {
+            phase: max(seconds - self.sql_by_phase.get(phase, 0.0), 0.0) for phase, seconds in self.phases.items()
+        }
+        other = max(self.total - self.sql - sum(exclusive.values()), 0.0)
+        profile = {
+            "id": self.id,
+            "reason": self.reason,
+            "method": self.method,
+            "route": self.route,
+            "path": self.path,
+            "query": self.query,
+            "user_id": self.user_id,
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "started_at": self.started_at,
+            "total_ms": round(self.total * 1000, 3),
+            "breakdown_ms": {
+                "sql": round(self.sql * 1000, 3),
+                **{phase: round(seconds * 1000, 3) for phase, seconds in exclusive.items()},
+                "other": round(other * 1000, 3),
+            },
+            "statement_count": len(self.statements) + self.statements_dropped,
+        }
+        if statements:
+            profile["statements"] = self.statements
+            profile["statements_dropped"] = self.statements_dropped
+        return profile
+
+
+# Set by ProfilingMiddleware while a profiled request runs
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+class ProfileBuffer:
+    """Ring buffer of the most recent request profiles."""
+
+    def __init__(self, size: int):
+        self._profiles: Deque[RequestProfile] = deque(maxlen=max(size, 1))
+        self._ids = itertools.count(1)
+        self.recorded = 0
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles.append(profile)
+        self.recorded += 1
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def slowest(self, limit: int, route: Optional[str] = None, user_id: Optional[str] = None) -> List[RequestProfile]:
+        profiles = [
+            p for p in self._profiles
+            if (route is None or p.route == route) and (user_id is None or p.user_id == user_id)
+        ]
+        return sorted(profiles, key=lambda p: p.total, reverse=True)[:limit]
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+    def stats(self) -> dict:
+        return {"buffered": len(self._profiles), "size": self._profiles.maxlen, "recorded": self.recorded}
+
+
+profile_buffer = ProfileBuffer(settings.PROFILING_BUFFER_SIZE)
+
+
+def token_matches(value: Optional[str]) -> bool:
+    """True if value is the configured PROFILING_TOKEN (never when no token is set)."""
+    token = settings.PROFILING_TOKEN
+    return bool(token) and value is not None and hmac.compare_digest(value.encode(), token.encode())
+
+
+def _profile_reason(scope) -> Optional[str]:
+    if settings.PROFILING_TOKEN:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                if token_matches(value.decode("latin-1")):
+                    return "header"
+                break
+    if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware starting a RequestProfile for requests picked by header or sampling."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/admin/profiles"):
+            await self.app(scope, receive, send)
+            return
+        reason = _profile_reason(scope)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile(profile_buffer.next_id(), scope, reason)
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, str(profile.id).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.total = time.perf_counter() - profile.start
+            current_profile.reset(token)
+            profile.route = _route_label(scope)
+            profile_buffer.add(profile)
+
+
+def _timed_phase(name: str, func):
+    async def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None or profile.phase is not None:
+            return await func(*args, **kwargs)
+        if name == "handler":
+            call = kwargs.get("dependant").call
+            profile.endpoint = getattr(call, "__name__", None)
+        profile.phase = name
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            profile.phases[name] += time.perf_counter() - start
+            profile.phase = None
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("_profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    starts = conn.info.get("_profile_query_start")
+    if profile is None or not starts:
+        return
+    started = starts.pop()
+    profile.add_statement(statement, time.perf_counter() - started, started)
+
+
+_installed = False
+
+
+def install_profiling() -> None:
+    """Wrap FastAPI's request phases and listen to every engine's statements (once per process)."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    for attr, phase in (
+        ("solve_dependencies", "validation"),
+        ("run_endpoint_function", "handler"),
+        ("serialize_response", "serialization"),
+    ):
+        setattr(fastapi.routing, attr, _timed_phase(phase, getattr(fastapi.routing, attr)))
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
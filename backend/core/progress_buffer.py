@@ -0,0 +1,203 @@
+"""
+Write-behind buffer for progress logging.
+
+When PROGRESS_BUFFER_ENABLED is set, POST /api/progress enqueues events in a
+bounded in-process queue and returns 202 without touching the database. One
+background task per worker drains the queue with multi-row inserts (see
+core.progress_ingest.insert_progress_logs) every PROGRESS_BUFFER_FLUSH_INTERVAL_MS
+or PROGRESS_BUFFER_FLUSH_BATCH events, whichever comes first, so a burst of
+page views costs one pooled connection instead of one per request.
+
+Events are timestamped (UTC) when the request is received, not when
+flushed. Durability trade-off: events still queued are lost if the process dies without a clean
+shutdown. Requests that cannot accept that pass ``durable=true``.
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from config import settings
+from core.progress_ingest import insert_progress_logs
+from database import get_async_session_local
+from models.topic import Topic
+
+logger = logging.getLogger(__name__)
+
+# Delays between attempts to write a batch before it is dropped
+_RETRY_DELAYS = (0.5, 2.0)
+
+
+class ProgressWriteBuffer:
+    """
+    Bounded queue of progress records plus the task that flushes it.
+
+    Attributes:
+        accepted: Records enqueued
+        rejected: Records refused because the queue stayed full (backpressure)
+        written: Records inserted into progress_logs
+        dropped: Records discarded (unknown topic, or repeated write failures)
+        flushes: Batches written
+    """
+
+    def __init__(self, max_events: int, flush_batch: int, flush_interval: float, enqueue_timeout: float):
+        self.max_events = max_events
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        # Bounds events not yet written, including the batch being flushed
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._unwritten = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._closing
+
+    def start(self) -> None:
+        """Start the flusher on the running event loop (call from app startup)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_events)
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="progress-write-buffer")
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop accepting records, flush what is queued, and end the flusher."""
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Progress buffer shutdown timed out with {self._unwritten} event(s) unwritten")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, record) -> bool:
+        """
+        Enqueue a progress record (user_id, topic_id, status, notes and
+        optionally timestamp; the database stamps records without one).
+
+        Waits up to enqueue_timeout for room when the queue is full.
+
+        Returns:
+            False if the record was not accepted (queue still full, or shutting down)
+        """
+        if not self.running:
+            return False
+        if self._slots.locked():
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+        else:
+            await self._slots.acquire()
+        self._queue.put_nowait(record)
+        self._unwritten += 1
+        self.accepted += 1
+        return True
+
+    async def flush(self) -> None:
+        """Wait until every record enqueued so far has been written or dropped."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._unwritten,
+            "max_events": self.max_events,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+        }
+
+    async def _next_batch(self) -> List:
+        """Block for one record, then gather more until the batch is full or the interval ends."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.flush_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.error(f"Dropped {len(batch)} buffered progress event(s): {e}")
+            finally:
+                self._unwritten -= len(batch)
+                for _ in batch:
+                    self._queue.task_done()
+                    self._slots.release()
+
+    async def _write(self, batch: List) -> None:
+        AsyncSessionLocal = get_async_session_local()
+        if AsyncSessionLocal is None:
+            raise ValueError("Database not configured")
+        for attempt, delay in enumerate(_RETRY_DELAYS + (None,)):
+            async with AsyncSessionLocal() as db:
+                try:
+                    if attempt:
+                        batch = await self._drop_unknown_topics(db, batch)
+                        if not batch:
+                            return
+                    self.written += await insert_progress_logs(db, batch)
+                    await db.commit()
+                    self.flushes += 1
+                    return
+                except Exception as e:
+                    await db.rollback()
+                    if delay is None:
+                        raise
+                    logger.warning(f"Buffered progress write failed ({e.__class__.__name__}); retrying")
+            await asyncio.sleep(delay)
+
+    async def _drop_unknown_topics(self, db, batch: List) -> List:
+        """One bad topic_id fails the whole multi-row insert; retry without those records."""
+        known = set((await db.execute(select(Topic.id).where(Topic.id.in_({r.topic_id for r in batch})))).scalars())
+        kept = [r for r in batch if r.topic_id in known]
+        if len(kept) < len(batch):
+            self.dropped += len(batch) - len(kept)
+            logger.warning(f"Dropped {len(batch) - len(kept)} buffered progress event(s) for unknown topics")
+        return kept
+
+
+progress_buffer = ProgressWriteBuffer(
+    max_events=settings.PROGRESS_BUFFER_MAX_EVENTS,
+    flush_batch=settings.PROGRESS_BUFFER_FLUSH_BATCH,
+    flush_interval=settings.PROGRESS_BUFFER_FLUSH_INTERVAL_MS / 1000,
+    enqueue_timeout=settings.PROGRESS_BUFFER_ENQUEUE_TIMEOUT_MS / 1000,
+)
@@ -0,0 +1,141 @@
+"""
+Streaming export of progress_logs as CSV or NDJSON.
+
+Rows are read through a server-side cursor (``AsyncSession.stream`` with
+``yield_per``) and encoded one batch at a time, so memory stays bounded by
+PROGRESS_EXPORT_BATCH_SIZE rows however large the export is.
+"""
+import csv
+import io
+import json
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from config import settings
+from core.admission import database_slot, export_slot
+from database import open_read_session
+from models.progress_log import ProgressLog
+from models.topic import Topic
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_columns(include_topic_name: bool) -> List[str]:
+    """Column names in output order."""
+    columns = ["id", "user_id", "topic_id", "status", "timestamp", "notes"]
+    if include_topic_name:
+        columns.insert(3, "topic_name")
+    return columns
+
+
+def build_export_stmt(
+    user_id: Optional[str] = None,
+    topic_id: Optional[int] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_topic_name: bool = False,
+):
+    """
+    Select progress_logs columns matching the filters, oldest first.
+
+    Args:
+        since: Inclusive lower bound on timestamp
+        until: Exclusive upper bound on timestamp
+        include_topic_name: Join topics for a topic_name column
+    """
+    columns = [
+        ProgressLog.id, ProgressLog.user_id, ProgressLog.topic_id,
+        ProgressLog.status, ProgressLog.timestamp, ProgressLog.notes,
+    ]
+    if include_topic_name:
+        columns.insert(3, Topic.name.label("topic_name"))
+    stmt = select(*columns)
+    if include_topic_name:
+        stmt = stmt.join(Topic, Topic.id == ProgressLog.topic_id)
+    if user_id is not None:
+        stmt = stmt.where(ProgressLog.user_id == user_id)
+    if topic_id is not None:
+        stmt = stmt.where(ProgressLog.topic_id == topic_id)
+    if status is not None:
+        stmt = stmt.where(ProgressLog.status == status)
+    if since is not None:
+        stmt = stmt.where(ProgressLog.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(ProgressLog.timestamp < until)
+    # (user_id, timestamp, id) and timestamp indexes serve this order without a full sort
+    return stmt.order_by(ProgressLog.timestamp, ProgressLog.id)
+
+
+def _cell(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _encode_csv(rows, header: Optional[List[str]] = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_cell(v) for v in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(rows, columns: List[str]) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(columns, (_cell(v) for v in row))), ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+async def open_progress_export(
+    request, stmt, fmt: str, columns: List[str], prefer_primary: bool = False
+) -> Tuple[AsyncIterator[bytes], Callable[[], Awaitable[None]]]:
+    """
+    Start an export: take an export slot and an admission slot
+    (core.admission), open a session (on a read replica when configured)
+    and fetch the first batch.
+    Failures raise here, before a response is started. Without this, a
+    database error would reach the client as a 200 cut off after the CSV
+    header.
+
+    Returns the body iterator, which yields one encoded chunk per batch of
+    rows, and a close() that releases the session and slots. The iterator
+    calls close() when it finishes. Also pass close() as the response's
+    background task, so they are released if the body is never iterated.
+    The session is the export's own, not a yield dependency, so its
+    lifetime does not depend on when FastAPI closes those.
+    """
+    stack = AsyncExitStack()
+    try:
+        await stack.enter_async_context(export_slot())
+        await stack.enter_async_context(database_slot(request))
+        db = await open_read_session(prefer_primary)
+        stack.push_async_callback(db.close)
+        result = await db.stream(stmt.execution_options(yield_per=settings.PROGRESS_EXPORT_BATCH_SIZE))
+        batches = result.partitions()
+        try:
+            first = await batches.__anext__()
+        except StopAsyncIteration:
+            first = []
+    except BaseException:
+        await stack.aclose()
+        raise
+
+    def encode(rows, header: Optional[List[str]] = None) -> bytes:
+        return _encode_csv(rows, header=header) if fmt == "csv" else _encode_ndjson(rows, columns)
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            yield encode(first, header=columns)
+            async for rows in batches:
+                yield encode(rows)
+        finally:
+            await stack.aclose()
+
+    return body(), stack.aclose
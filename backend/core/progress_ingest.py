@@ -0,0 +1,169 @@
+"""
+Batch writes of progress logs for bulk ingestion.
+"""
+import json
+from typing import AsyncIterator, List, Sequence, Tuple
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+
+from config import settings
+from core.progress_rollups import record_progress_rollups
+from core.progress_state import upsert_user_topic_states
+from models.progress_log import ProgressLog
+from models.topic import Topic
+from schemas.progress import ProgressBulkError, ProgressBulkResult, ProgressLogBulkRecord
+
+# Rows per multi-row statement; keeps bind parameters well under PostgreSQL's 32767 limit
+_STATEMENT_ROWS = 1000
+# Cap on per-record errors echoed back; the failed count is always exact
+MAX_REPORTED_ERRORS = 1000
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def insert_progress_logs(db, records: Sequence) -> int:
+    """
+    Insert progress records with multi-row INSERT ... RETURNING, then upsert
+    user_topic_state and the analytics rollups from the returned timestamps.
+    The caller commits.
+
+    Records need user_id, topic_id, status, notes and optionally timestamp;
+    records without one get the server-default CURRENT_TIMESTAMP.
+
+    Returns:
+        Number of progress_logs rows inserted
+    """
+    state_rows = []
+    stamped = [r for r in records if getattr(r, "timestamp", None) is not None]
+    unstamped = [r for r in records if getattr(r, "timestamp", None) is None]
+    for group, with_timestamp in ((stamped, True), (unstamped, False)):
+        if not group:
+            continue
+        params = []
+        for r in group:
+            row = {"user_id": r.user_id, "topic_id": r.topic_id, "status": r.status, "notes": r.notes}
+            if with_timestamp:
+                row["timestamp"] = r.timestamp
+            params.append(row)
+        # executemany + RETURNING is sent as batched multi-row VALUES ("insertmanyvalues")
+        result = await db.execute(
+            insert(ProgressLog).returning(ProgressLog.timestamp, sort_by_parameter_order=True),
+            params,
+        )
+        for r, ts in zip(group, result.scalars()):
+            state_rows.append({"user_id": r.user_id, "topic_id": r.topic_id, "status": r.status, "last_seen": ts})
+    for i in range(0, len(state_rows), _STATEMENT_ROWS):
+        stmt = upsert_user_topic_states(state_rows[i:i + _STATEMENT_ROWS])
+        if stmt is not None:
+            await db.execute(stmt)
+    await record_progress_rollups(
+        db, ((r["user_id"], r["topic_id"], r["status"], r["last_seen"]) for r in state_rows)
+    )
+    return len(state_rows)
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'record'}: {err['msg']}" for err in e.errors()
+    )
+
+
+async def iter_request_records(request: Request) -> AsyncIterator[Tuple[int, object]]:
+    """
+    Yield (index, parsed JSON or Exception) from a JSON array or NDJSON body.
+
+    NDJSON bodies are read incrementally so memory stays bounded by the chunk
+    size; a malformed line is reported as that record's error. A malformed
+    JSON array body is rejected as a whole with 400.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        index = 0
+        buffer = b""
+        async for piece in request.stream():
+            buffer += piece
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_line(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_line(buffer)
+        return
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON (application/x-ndjson)")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of progress records")
+    for index, item in enumerate(body):
+        yield index, item
+
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+async def ingest_progress_records(db, records: AsyncIterator[Tuple[int, object]]) -> ProgressBulkResult:
+    """
+    Validate and write progress records chunk by chunk, one transaction per chunk.
+
+    Invalid records and unknown topic ids are rejected individually; if a
+    chunk's write still fails, only that chunk is rolled back and its records
+    are reported as failed.
+    """
+    result = ProgressBulkResult(received=0, inserted=0, failed=0, errors=[])
+    chunk: List[Tuple[int, object]] = []
+
+    def reject(index: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(ProgressBulkError(index=index, error=error))
+
+    async def flush() -> None:
+        valid: List[Tuple[int, ProgressLogBulkRecord]] = []
+        for index, raw in chunk:
+            if isinstance(raw, Exception):
+                reject(index, f"Invalid JSON: {raw}")
+                continue
+            try:
+                valid.append((index, ProgressLogBulkRecord.model_validate(raw)))
+            except ValidationError as e:
+                reject(index, _format_validation_error(e))
+        chunk.clear()
+        if not valid:
+            return
+        topic_ids = {r.topic_id for _, r in valid}
+        known = set((await db.execute(select(Topic.id).where(Topic.id.in_(topic_ids)))).scalars())
+        writable = []
+        for index, r in valid:
+            if r.topic_id in known:
+                writable.append((index, r))
+            else:
+                reject(index, f"topic_id: unknown topic {r.topic_id}")
+        if not writable:
+            await db.rollback()
+            return
+        try:
+            result.inserted += await insert_progress_logs(db, [r for _, r in writable])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            for index, _ in writable:
+                reject(index, f"Write failed: {e.__class__.__name__}")
+
+    async for item in records:
+        result.received += 1
+        chunk.append(item)
+        if len(chunk) >= settings.PROGRESS_BULK_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+    result.errors.sort(key=lambda e: e.index)
+    return result
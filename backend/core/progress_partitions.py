@@ -0,0 +1,246 @@
+"""
+Monthly partitions of progress_logs and their retention.
+
+Migration 009 range-partitions progress_logs on timestamp, one partition per
+calendar month (``progress_logs_YYYY_MM``) plus a DEFAULT partition for rows
+outside them. Reads bounded by a recent timestamp (e.g. GET /api/progress
+with a cursor, exports with ``since``) scan only the months they cover, and
+each partition's indexes stay the size of one month.
+
+Partitions are created PROGRESS_PARTITION_MONTHS_AHEAD months in advance by
+a background task in every worker (rechecked every
+PROGRESS_PARTITION_CHECK_HOURS) or with
+``python manage.py create-progress-partitions``. Rows that land in the
+DEFAULT partition anyway are moved when their month's partition is created.
+
+Compaction (``python manage.py compact-progress-logs``, or the background
+task when PROGRESS_RETENTION_MONTHS is set) collapses each partition older
+than the retention window into progress_log_daily_summaries (events per
+user, topic, day and status, with the first and last time) and then drops
+it, or only detaches it with ``--detach`` for archiving. The rollups,
+milestones and user_topic_state tables are maintained on write, so
+analytics and progress summaries are unaffected.
+"""
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+
+from config import settings
+from database import get_async_session_local
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "progress_logs_default"
+
+# pg_advisory_xact_lock key shared with create_progress_log_partition() in
+# migration 009, so workers create and compact partitions one at a time
+_LOCK_KEY = 72_030_518
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+_SUMMARIZE = """
+    INSERT INTO progress_log_daily_summaries (user_id, topic_id, day, status, events, first_at, last_at)
+    SELECT user_id, topic_id, "timestamp"::date, status, count(*), min("timestamp"), max("timestamp")
+    FROM {table}
+    {where}
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (user_id, topic_id, day, status) DO UPDATE
+        SET events = progress_log_daily_summaries.events + EXCLUDED.events,
+            first_at = least(progress_log_daily_summaries.first_at, EXCLUDED.first_at),
+            last_at = greatest(progress_log_daily_summaries.last_at, EXCLUDED.last_at)
+"""
+
+_RECORD_COMPACTION = text("""
+    INSERT INTO progress_log_compactions (partition_name, range_start, range_end, rows_compacted, dropped)
+    VALUES (:name, :range_start, :range_end, :rows, :dropped)
+""")
+
+
+class Partition(NamedTuple):
+    name: str
+    # None for the DEFAULT partition
+    range_start: Optional[datetime]
+    range_end: Optional[datetime]
+
+
+async def ensure_progress_partitions(db, months_ahead: Optional[int] = None) -> Optional[int]:
+    """
+    Create any missing partitions from the current month through months_ahead.
+
+    Args:
+        db: AsyncSession; the caller commits
+        months_ahead: Default PROGRESS_PARTITION_MONTHS_AHEAD
+
+    Returns:
+        Number of partitions created, or None if migration 009 is not applied
+    """
+    if months_ahead is None:
+        months_ahead = settings.PROGRESS_PARTITION_MONTHS_AHEAD
+    installed = (await db.execute(text(
+        "SELECT to_regprocedure('create_progress_log_partitions(timestamp without time zone,timestamp without time zone)')"
+    ))).scalar()
+    if installed is None:
+        return None
+    return (await db.execute(
+        text("""
+            SELECT create_progress_log_partitions(
+                date_trunc('month', LOCALTIMESTAMP), LOCALTIMESTAMP + make_interval(months => :ahead)
+            )
+        """),
+        {"ahead": months_ahead},
+    )).scalar()
+
+
+async def list_partitions(db) -> List[Partition]:
+    """progress_logs partitions, oldest first, the DEFAULT partition last."""
+    rows = (await db.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'progress_logs'::regclass
+    """))).all()
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound)
+        if match:
+            partitions.append(Partition(name, *(datetime.fromisoformat(b) for b in match.groups())))
+        else:
+            partitions.append(Partition(name, None, None))
+    partitions.sort(key=lambda p: (p.range_start is None, p.range_start or datetime.min))
+    return partitions
+
+
+async def compact_progress_logs(db, retain_months: int, drop: bool = True, dry_run: bool = False) -> List[dict]:
+    """
+    Summarize and remove progress_logs older than retain_months whole months.
+
+    Each partition ending on or before the cutoff (the start of the month
+    retain_months before the current one) is summarized into
+    progress_log_daily_summaries, detached, and dropped unless drop is
+    False, in its own transaction. Rows older than the cutoff in the DEFAULT
+    partition are summarized and deleted the same way. Each step is
+    recorded in progress_log_compactions.
+
+    Args:
+        db: AsyncSession; committed after each partition
+        retain_months: Whole months of raw logs to keep before the current one
+        drop: Drop compacted partitions (False: detach and keep the table)
+        dry_run: Only report what would be compacted
+
+    Returns:
+        One dict per partition: name, range_start, range_end, rows
+    """
+    if retain_months < 1:
+        raise ValueError("retain_months must be at least 1")
+    cutoff = (await db.execute(
+        text("SELECT date_trunc('month', LOCALTIMESTAMP) - make_interval(months => :months)"),
+        {"months": retain_months},
+    )).scalar()
+
+    compacted = []
+    for partition in await list_partitions(db):
+        if partition.range_start is None:
+            continue
+        if partition.range_end > cutoff:
+            break
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+        attached = (await db.execute(
+            text("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:name) AND inhparent = 'progress_logs'::regclass"),
+            {"name": partition.name},
+        )).scalar()
+        if not attached:
+            # Compacted by another worker meanwhile
+            await db.rollback()
+            continue
+        # Block late inserts into this month until it is summarized and detached
+        await db.execute(text(f'LOCK TABLE "{partition.name}" IN SHARE MODE'))
+        rows = (await db.execute(text(f'SELECT count(*) FROM "{partition.name}"'))).scalar()
+        compacted.append({**partition._asdict(), "rows": rows})
+        if dry_run:
+            await db.rollback()
+            continue
+        await db.execute(text(_SUMMARIZE.format(table=f'"{partition.name}"', where="")))
+        await db.execute(text(f'ALTER TABLE progress_logs DETACH PARTITION "{partition.name}"'))
+        if drop:
+            await db.execute(text(f'DROP TABLE "{partition.name}"'))
+        await db.execute(_RECORD_COMPACTION, {
+            "name": partition.name, "range_start": partition.range_start,
+            "range_end": partition.range_end, "rows": rows, "dropped": drop,
+        })
+        await db.commit()
+        logger.info(f"Compacted {partition.name}: {rows} row(s)")
+
+    # Late arrivals outside any partition
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    await db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN SHARE MODE"))
+    where = {"cutoff": cutoff}
+    rows = (await db.execute(
+        text(f'SELECT count(*) FROM {DEFAULT_PARTITION} WHERE "timestamp" < :cutoff'), where
+    )).scalar()
+    if rows and not dry_run:
+        await db.execute(text(_SUMMARIZE.format(table=DEFAULT_PARTITION, where='WHERE "timestamp" < :cutoff')), where)
+        await db.execute(text(f'DELETE FROM {DEFAULT_PARTITION} WHERE "timestamp" < :cutoff'), where)
+        await db.execute(_RECORD_COMPACTION, {
+            "name": DEFAULT_PARTITION, "range_start": None, "range_end": cutoff, "rows": rows, "dropped": True,
+        })
+        await db.commit()
+        logger.info(f"Compacted {rows} row(s) from {DEFAULT_PARTITION}")
+    else:
+        await db.rollback()
+    if rows:
+        compacted.append({"name": DEFAULT_PARTITION, "range_start": None, "range_end": cutoff, "rows": rows})
+    return compacted
+
+
+class PartitionMaintenance:
+    """Background task that keeps future partitions created and, if configured, compacts old ones."""
+
+    def __init__(self, check_interval: float, retain_months: int):
+        self.check_interval = check_interval
+        self.retain_months = retain_months
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the task on the running event loop (call from app startup)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(), name="progress-partition-maintenance")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> None:
+        AsyncSessionLocal = get_async_session_local()
+        if AsyncSessionLocal is None:
+            return
+        async with AsyncSessionLocal() as db:
+            created = await ensure_progress_partitions(db)
+            await db.commit()
+            if created:
+                logger.info(f"Created {created} progress_logs partition(s)")
+            if created is not None and self.retain_months > 0:
+                await compact_progress_logs(db, self.retain_months)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"progress_logs partition maintenance failed: {e}")
+            await asyncio.sleep(self.check_interval)
+
+
+partition_maintenance = PartitionMaintenance(
+    check_interval=settings.PROGRESS_PARTITION_CHECK_HOURS * 3600,
+    retain_months=settings.PROGRESS_RETENTION_MONTHS,
+)
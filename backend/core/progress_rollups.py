@@ -0,0 +1,166 @@
+"""
+Incremental maintenance of progress rollups for cohort analytics.
+
+Every progress_logs insert also:
+
+* records first-reached milestones (user_topic_milestones), one row per
+  user/topic/status, so "learners who mastered X" is a sum, not a
+  COUNT(DISTINCT) over raw logs;
+* adds its events, and any newly reached milestones, to the hourly and
+  daily rollup rows for its topic and status.
+
+Both happen in the writer's transaction, so rollups never disagree with
+committed logs. A replayed event older than an existing milestone leaves
+the milestone (and its learner count) at the later time; run
+``python manage.py backfill-progress-rollups`` after large historical
+imports to rebuild everything exactly.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import text
+
+# (user_id, topic_id, status, timestamp)
+ProgressEvent = Tuple[str, int, str, datetime]
+
+# Events to rollup rows in one round trip, whatever the batch size: the
+# events arrive as four arrays, new milestones come back from the first
+# CTE, and each rollup is upserted in key order so concurrent writers lock
+# rows in the same order (no deadlocks).
+_RECORD_SQL = text("""
+    WITH events AS (
+        SELECT * FROM unnest(
+            CAST(:user_ids AS varchar[]), CAST(:topic_ids AS integer[]),
+            CAST(:statuses AS varchar[]), CAST(:timestamps AS timestamp[])
+        ) AS e(user_id, topic_id, status, ts)
+    ),
+    new_milestones AS (
+        INSERT INTO user_topic_milestones (user_id, topic_id, status, first_at)
+        SELECT user_id, topic_id, status, min(ts) FROM events
+        GROUP BY user_id, topic_id, status
+        ORDER BY user_id, topic_id, status
+        ON CONFLICT DO NOTHING
+        RETURNING topic_id, status, first_at
+    ),
+    counts AS (
+        SELECT topic_id, status, ts, 1 AS events, 0 AS learners FROM events
+        UNION ALL
+        SELECT topic_id, status, first_at, 0, 1 FROM new_milestones
+    ),
+    hourly AS (
+        INSERT INTO progress_rollups_hourly AS r (topic_id, bucket, status, events, learners)
+        SELECT topic_id, date_trunc('hour', ts), status, sum(events), sum(learners) FROM counts
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (topic_id, bucket, status) DO UPDATE
+            SET events = r.events + EXCLUDED.events, learners = r.learners + EXCLUDED.learners
+    )
+    INSERT INTO progress_rollups_daily AS r (topic_id, bucket, status, events, learners)
+    SELECT topic_id, date_trunc('day', ts), status, sum(events), sum(learners) FROM counts
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    ON CONFLICT (topic_id, bucket, status) DO UPDATE
+        SET events = r.events + EXCLUDED.events, learners = r.learners + EXCLUDED.learners
+""")
+
+
+async def record_progress_rollups(db, events: Iterable[ProgressEvent]) -> None:
+    """
+    Add progress events to milestones and the hourly/daily rollups.
+    Run in the same transaction as the progress_logs insert; the caller commits.
+
+    Args:
+        db: AsyncSession
+        events: (user_id, topic_id, status, timestamp) for each inserted log
+    """
+    columns = tuple(zip(*events))
+    if not columns:
+        return
+    user_ids, topic_ids, statuses, timestamps = columns
+    await db.execute(_RECORD_SQL, {
+        "user_ids": list(user_ids),
+        "topic_ids": list(topic_ids),
+        "statuses": list(statuses),
+        "timestamps": list(timestamps),
+    })
+
+
+# Start of the raw logs still kept: compacted months (core.progress_partitions)
+# survive only as daily summaries, so their rollups are left as they are
+_RAW_LOGS_FROM = "(SELECT COALESCE(max(range_end), '-infinity') FROM progress_log_compactions)"
+
+# Milestones of compacted months; the table exists from migration 009 on
+_COMPACTED_MILESTONES = """
+            UNION ALL
+            SELECT user_id, topic_id, status, first_at
+            FROM progress_log_daily_summaries"""
+
+# Formatted with compacted and raw_logs_from (see backfill_progress_rollups)
+_BACKFILL_STATEMENTS = [
+    # Hold off concurrent progress writes so the rebuilt rollups match the logs exactly
+    "LOCK TABLE progress_logs IN SHARE MODE",
+    "DELETE FROM user_topic_milestones",
+    """
+        INSERT INTO user_topic_milestones (user_id, topic_id, status, first_at)
+        SELECT user_id, topic_id, status, min(first_at)
+        FROM (
+            SELECT user_id, topic_id, status, COALESCE(timestamp, 'epoch'::timestamp) AS first_at
+            FROM progress_logs{compacted}
+        ) events
+        GROUP BY user_id, topic_id, status
+    """,
+    "DELETE FROM progress_rollups_hourly WHERE bucket >= {raw_logs_from}",
+    """
+        INSERT INTO progress_rollups_hourly (topic_id, bucket, status, events, learners)
+        SELECT topic_id, bucket, status, sum(events), sum(learners)
+        FROM (
+            SELECT topic_id, date_trunc('hour', COALESCE(timestamp, 'epoch'::timestamp)) AS bucket, status,
+                   count(*) AS events, 0 AS learners
+            FROM progress_logs
+            WHERE COALESCE(timestamp, 'epoch'::timestamp) >= {raw_logs_from}
+            GROUP BY 1, 2, 3
+            UNION ALL
+            SELECT topic_id, date_trunc('hour', first_at), status, 0, count(*)
+            FROM user_topic_milestones
+            WHERE first_at >= {raw_logs_from}
+            GROUP BY 1, 2, 3
+        ) counts
+        GROUP BY topic_id, bucket, status
+    """,
+    "DELETE FROM progress_rollups_daily WHERE bucket >= {raw_logs_from}",
+    """
+        INSERT INTO progress_rollups_daily (topic_id, bucket, status, events, learners)
+        SELECT topic_id, date_trunc('day', bucket), status, sum(events), sum(learners)
+        FROM progress_rollups_hourly
+        WHERE bucket >= {raw_logs_from}
+        GROUP BY 1, 2, 3
+    """,
+]
+
+
+async def backfill_progress_rollups(db) -> Dict[str, int]:
+    """
+    Rebuild milestones and hourly/daily rollups from progress_logs (and the
+    daily summaries of compacted months, for milestones, once migration 009
+    has created them). Rollup buckets older than the last compaction are
+    kept as they are. Blocks progress writes until the caller commits;
+    safe to re-run.
+
+    Args:
+        db: AsyncSession; the caller commits
+
+    Returns:
+        Row counts of the rebuilt tables
+    """
+    # Both tables are created by migration 009 (partitioning); before it nothing is compacted
+    compacted = (await db.execute(text("SELECT to_regclass('progress_log_compactions') IS NOT NULL"))).scalar()
+    fragments = {
+        "compacted": _COMPACTED_MILESTONES if compacted else "",
+        "raw_logs_from": _RAW_LOGS_FROM if compacted else "'-infinity'::timestamp",
+    }
+    for stmt in _BACKFILL_STATEMENTS:
+        await db.execute(text(stmt.format(**fragments)))
+    counts = {}
+    for table in ("user_topic_milestones", "progress_rollups_hourly", "progress_rollups_daily"):
+        counts[table] = (await db.execute(text(f"SELECT count(*) FROM {table}"))).scalar()
+    return counts
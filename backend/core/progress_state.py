@@ -0,0 +1,95 @@
+"""
+Incremental maintenance of per-user topic state (models.UserTopicState).
+"""
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+
+from models.user_topic_state import UserTopicState
+
+
+def _on_conflict_keep_latest(stmt):
+    """Update on (user_id, topic_id) conflict only if the incoming row is not older."""
+    return stmt.on_conflict_do_update(
+        index_elements=[UserTopicState.user_id, UserTopicState.topic_id],
+        set_={"status": stmt.excluded.status, "last_seen": stmt.excluded.last_seen},
+        where=UserTopicState.last_seen <= stmt.excluded.last_seen,
+    )
+
+
+def upsert_user_topic_state(user_id: str, topic_id: int, status: str, last_seen=None):
+    """
+    Build an upsert that records status as the latest for user/topic.
+
+    Run it in the same transaction as the progress_logs insert. last_seen
+    defaults to CURRENT_TIMESTAMP, which PostgreSQL fixes per transaction, so
+    it equals the log row's server-default timestamp. Older events never
+    overwrite newer state, which keeps replays and backfills idempotent.
+    """
+    stmt = insert(UserTopicState).values(
+        user_id=user_id,
+        topic_id=topic_id,
+        status=status,
+        last_seen=last_seen if last_seen is not None else func.current_timestamp(),
+    )
+    return _on_conflict_keep_latest(stmt)
+
+
+def upsert_user_topic_states(rows: Iterable[dict]):
+    """
+    Build one multi-row upsert from dicts with user_id, topic_id, status, last_seen.
+
+    Rows are reduced to the latest per user/topic first (later rows win ties),
+    since PostgreSQL rejects an INSERT ... ON CONFLICT that touches the same
+    key twice. Returns None when there is nothing to write.
+    """
+    latest: Dict[Tuple[str, int], dict] = {}
+    for row in rows:
+        key = (row["user_id"], row["topic_id"])
+        current = latest.get(key)
+        if current is None or current["last_seen"] <= row["last_seen"]:
+            latest[key] = row
+    if not latest:
+        return None
+    return _on_conflict_keep_latest(insert(UserTopicState).values(list(latest.values())))
+
+
+_BACKFILL_SQL = """
+    INSERT INTO user_topic_state (user_id, topic_id, status, last_seen)
+    SELECT DISTINCT ON (user_id, topic_id)
+        user_id, topic_id, status, seen_at
+    FROM (
+        SELECT user_id, topic_id, status, COALESCE(timestamp, 'epoch'::timestamp) AS seen_at, id
+        FROM progress_logs{compacted}
+    ) events
+    ORDER BY user_id, topic_id, seen_at DESC, id DESC NULLS LAST
+    ON CONFLICT (user_id, topic_id) DO UPDATE
+        SET status = EXCLUDED.status, last_seen = EXCLUDED.last_seen
+        WHERE user_topic_state.last_seen <= EXCLUDED.last_seen
+"""
+
+# Compacted months (core.progress_partitions); the table exists from migration 009 on
+_COMPACTED_EVENTS = """
+        UNION ALL
+        SELECT user_id, topic_id, status, last_at, NULL
+        FROM progress_log_daily_summaries"""
+
+
+async def backfill_user_topic_state(db) -> int:
+    """
+    Build user_topic_state from existing progress_logs (and the daily
+    summaries of compacted months, once migration 009 has created them)
+    in one statement.
+    Safe to re-run and to run while the API is taking writes.
+
+    Args:
+        db: AsyncSession; the caller commits
+
+    Returns:
+        Number of user/topic rows inserted or updated
+    """
+    has_summaries = (await db.execute(text("SELECT to_regclass('progress_log_daily_summaries') IS NOT NULL"))).scalar()
+    sql = _BACKFILL_SQL.format(compacted=_COMPACTED_EVENTS if has_summaries else "")
+    result = await db.execute(text(sql))
+    return result.rowcount
@@ -0,0 +1,160 @@
+"""
+Readiness checks for load balancers and orchestrators.
+
+GET /health/ready runs a timed ``SELECT 1`` against the primary and reads
+the connection pool's state: utilization (checked-out connections over
+DB_POOL_SIZE + DB_MAX_OVERFLOW) and the mean checkout wait and timeouts
+since the previous check (from core.metrics' pool instrumentation), plus
+the write-behind progress buffer's fill when it is enabled. Each is
+compared with a "degraded" and a "not ready" threshold; the worst wins.
+Pool utilization only ever degrades: admission control lets in exactly
+pool capacity, so a fully checked-out pool is normal at peak, and only
+requests waiting on it (mean checkout wait, timeouts) make a worker not
+ready.
+Not ready answers 503 so the balancer stops routing to a worker that is
+down or saturated before its requests start timing out; degraded still
+answers 200 but says so.
+
+The result is cached for READINESS_CACHE_SECONDS, and concurrent checks
+share one probe, so frequent polling costs at most one query per interval
+per worker.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from config import settings
+from core.metrics import metrics
+from database import get_async_engine
+
+OK, DEGRADED, NOT_READY = "ok", "degraded", "not_ready"
+_SEVERITY = {OK: 0, DEGRADED: 1, NOT_READY: 2}
+
+
+def _grade(value: float, degraded_at: float, not_ready_at: float) -> str:
+    if value >= not_ready_at:
+        return NOT_READY
+    if value >= degraded_at:
+        return DEGRADED
+    return OK
+
+
+def _worst(*statuses: str) -> str:
+    return max(statuses, key=_SEVERITY.__getitem__)
+
+
+class ReadinessProbe:
+    """Cached readiness result plus the pool-wait counters of the previous check."""
+
+    def __init__(self, cache_seconds: float):
+        self.cache_seconds = cache_seconds
+        self._result: Optional[dict] = None
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+        self._last_wait_count = metrics.pool_wait.count
+        self._last_wait_sum = metrics.pool_wait.sum
+        self._last_timeouts = metrics.pool_timeouts
+
+    async def check(self) -> dict:
+        """Current readiness report (cached); ``status`` is ok, degraded or not_ready."""
+        if self._result is not None and time.monotonic() < self._expires:
+            return self._result
+        async with self._lock:
+            if self._result is None or time.monotonic() >= self._expires:
+                self._result = await self._run()
+                self._expires = time.monotonic() + self.cache_seconds
+        return self._result
+
+    async def _run(self) -> dict:
+        pool = self._pool_state()
+        if pool.get("checked_out", 0) >= pool.get("capacity", float("inf")):
+            # The probe would only queue behind the app's requests; the pool's
+            # wait and timeout figures say whether they are being served
+            database = {"status": DEGRADED, "skipped": "connection pool fully checked out"}
+        else:
+            database = await self._probe_database()
+        checks = {"database": database, "pool": pool}
+        if settings.PROGRESS_BUFFER_ENABLED:
+            from core.progress_buffer import progress_buffer
+            buffer = progress_buffer.stats()
+            utilization = buffer["queued"] / buffer["max_events"] if buffer["max_events"] else 0.0
+            checks["progress_buffer"] = {
+                "status": NOT_READY if not buffer["running"] else _grade(
+                    utilization, settings.READINESS_DEGRADED_UTILIZATION, settings.READINESS_NOT_READY_UTILIZATION
+                ),
+                "queued": buffer["queued"],
+                "utilization": round(utilization, 3),
+            }
+        if settings.DB_REPLICA_URLS:
+            from database import replica_status
+            replicas = replica_status()
+            up = sum(1 for r in replicas if r["up"])
+            # Reads fall back to the primary, so lost replicas only degrade
+            checks["replicas"] = {"status": OK if up == len(replicas) else DEGRADED, "up": up, "total": len(replicas)}
+        return {
+            "status": _worst(*(check["status"] for check in checks.values())),
+            "checked_at": time.time(),
+            "checks": checks,
+        }
+
+    async def _probe_database(self) -> dict:
+        engine = get_async_engine()
+        if engine is None:
+            return {"status": NOT_READY, "error": "Database not configured"}
+
+        async def select_one():
+            # Includes the pool checkout, so a saturated pool shows up as latency
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(select_one(), settings.READINESS_DB_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            return {"status": NOT_READY, "error": f"Probe timed out after {settings.READINESS_DB_TIMEOUT_SECONDS}s"}
+        except Exception as e:
+            return {"status": NOT_READY, "error": e.__class__.__name__}
+        latency_ms = (time.perf_counter() - start) * 1000
+        return {
+            "status": _grade(
+                latency_ms, settings.READINESS_DB_LATENCY_DEGRADED_MS, settings.READINESS_DB_LATENCY_NOT_READY_MS
+            ),
+            "latency_ms": round(latency_ms, 2),
+        }
+
+    def _pool_state(self) -> dict:
+        # Checkout waits and timeouts since the previous check
+        waits = metrics.pool_wait.count - self._last_wait_count
+        wait_seconds = metrics.pool_wait.sum - self._last_wait_sum
+        timeouts = metrics.pool_timeouts - self._last_timeouts
+        self._last_wait_count = metrics.pool_wait.count
+        self._last_wait_sum = metrics.pool_wait.sum
+        self._last_timeouts = metrics.pool_timeouts
+        mean_wait_ms = wait_seconds / waits * 1000 if waits else 0.0
+
+        engine = get_async_engine()
+        pool = engine.sync_engine.pool if engine is not None else None
+        if pool is None or not hasattr(pool, "checkedout"):
+            return {"status": OK, "checkouts": waits, "mean_wait_ms": round(mean_wait_ms, 3), "timeouts": timeouts}
+        capacity = pool.size() + settings.DB_MAX_OVERFLOW
+        checked_out = pool.checkedout()
+        utilization = checked_out / capacity if capacity else 1.0
+        status = _worst(
+            DEGRADED if utilization >= settings.READINESS_DEGRADED_UTILIZATION else OK,
+            _grade(mean_wait_ms, settings.READINESS_POOL_WAIT_DEGRADED_MS, settings.READINESS_POOL_WAIT_NOT_READY_MS),
+            NOT_READY if timeouts else OK,
+        )
+        return {
+            "status": status,
+            "checked_out": checked_out,
+            "capacity": capacity,
+            "utilization": round(utilization, 3),
+            "checkouts": waits,
+            "mean_wait_ms": round(mean_wait_ms, 3),
+            "timeouts": timeouts,
+        }
+
+
+readiness_probe = ReadinessProbe(cache_seconds=settings.READINESS_CACHE_SECONDS)
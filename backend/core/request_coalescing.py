@@ -0,0 +1,145 @@
+"""
+Single-flight coalescing of identical concurrent GET requests.
+
+When a class opens the hub at once, dozens of identical catalog requests
+(topic list, search, one practice template) arrive within milliseconds.
+For endpoints marked ``@coalesced`` on a router using ``CoalescingRoute``,
+the first request for a path and query string runs the handler; requests
+for the same key that arrive while it is in flight wait for it and get a
+copy of its response (status, headers and body) instead of opening their
+own session and running the same query. Nothing is kept once the response
+is complete, so this never serves stale data; core.response_cache handles
+reuse over time.
+
+An exception raised by the shared execution (including HTTPException, e.g.
+a 404) is re-raised in every waiting request and handled as usual. If the
+leading request is cancelled (its client went away), or its response
+cannot be copied (streaming), the waiters run the handler themselves. At
+most COALESCE_MAX_KEYS keys are in flight per worker; further distinct
+keys run uncoalesced.
+
+Only mark endpoints whose response depends on nothing but the path and
+query string (no per-user headers or cookies).
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from config import settings
+
+
+def coalesced(endpoint):
+    """Mark a GET endpoint as safe to share between identical concurrent requests."""
+    endpoint.coalesced = True
+    return endpoint
+
+
+class _NotShared(Exception):
+    """The shared execution was cancelled or its response cannot be copied; run your own."""
+
+
+class _Flight:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    """
+    In-flight executions by key, plus counters.
+
+    Attributes:
+        executions: Handler runs for @coalesced routes, each shared with
+            any identical requests that arrived while it ran
+        coalesced: Requests answered from another request's execution
+            (database executions saved)
+        bypassed: Requests run uncoalesced because the key table was full
+        errors: Waiting requests that re-raised the shared execution's error
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._flights: Dict[str, _Flight] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.bypassed = 0
+        self.errors = 0
+
+    async def run(self, key: str, handler: Callable[[], Awaitable[Response]]) -> Response:
+        """Run handler(), or wait for the in-flight run for key and copy its response."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.waiters += 1
+            try:
+                # shield: a waiter's cancellation must not cancel the shared result
+                status, headers, body = await asyncio.shield(flight.future)
+            except _NotShared:
+                return await handler()
+            except Exception:
+                self.errors += 1
+                raise
+            self.coalesced += 1
+            response = Response(body, status_code=status)
+            response.raw_headers = list(headers)
+            return response
+        if len(self._flights) >= self.max_keys:
+            self.bypassed += 1
+            return await handler()
+
+        flight = self._flights[key] = _Flight()
+        self.executions += 1
+        try:
+            response = await handler()
+        except BaseException as e:
+            # Set only if someone waits, so an unshared error is not logged as unretrieved
+            if flight.waiters:
+                flight.future.set_exception(e if isinstance(e, Exception) else _NotShared())
+            raise
+        finally:
+            del self._flights[key]
+        if flight.waiters:
+            body = getattr(response, "body", None)
+            if body is None or response.background is not None:
+                flight.future.set_exception(_NotShared())
+            else:
+                # Copied now: outer middlewares (CORS) edit the leader's headers in place when sending
+                flight.future.set_result((response.status_code, list(response.raw_headers), body))
+        return response
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "max_keys": self.max_keys,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "bypassed": self.bypassed,
+            "errors": self.errors,
+        }
+
+
+request_coalescer = RequestCoalescer(settings.COALESCE_MAX_KEYS)
+
+
+class CoalescingRoute(APIRoute):
+    """
+    Route class (``APIRouter(route_class=CoalescingRoute)``) that runs
+    ``@coalesced`` GET endpoints through request_coalescer; other
+    endpoints are unaffected.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "coalesced", False):
+            return handler
+
+        async def coalesced_handler(request: Request) -> Response:
+            if request.method != "GET" or not settings.COALESCE_ENABLED:
+                return await handler(request)
+            key = request.url.path + "?" + request.url.query
+            return await request_coalescer.run(key, lambda: handler(request))
+
+        return coalesced_handler
@@ -0,0 +1,267 @@
+"""
+Conditional-GET response cache for read-mostly catalog endpoints.
+
+Responses from the topic/practice-template catalog routes are cached in
+process, keyed by path and query string, and tagged with the catalog
+version they were built from. Each carries a strong ETag (a hash of the
+body), so a matching If-None-Match gets a 304 and a cache hit is answered
+without running the handler or touching the database.
+
+The catalog version combines a database fingerprint over topics and
+practice_templates (max updated_at, kept current by the schema.sql
+triggers, plus row counts to catch deletes) with a local generation that
+is bumped whenever the ORM writes a Topic or PracticeTemplate. The
+fingerprint is re-read at most once per CATALOG_VERSION_TTL_SECONDS, so
+edits made directly in SQL show up within that window on every worker.
+Cache misses are rendered on the primary (not a read replica), which the
+version is read from.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, text
+from starlette.datastructures import Headers
+
+from config import settings
+from database import READ_PRIMARY_STATE, get_async_session_local
+from models.practice_template import PracticeTemplate
+from models.topic import Topic
+
+logger = logging.getLogger(__name__)
+
+# GET routes whose responses depend only on the topic/template catalog
+CACHEABLE_PATHS = re.compile(r"^/api/(practice|practice/topics|practice/\d+|search|catalog/sync)$")
+
+_FINGERPRINT_SQL = text("""
+    SELECT (SELECT max(updated_at) FROM topics), (SELECT count(*) FROM topics),
+           (SELECT max(updated_at) FROM practice_templates), (SELECT count(*) FROM practice_templates)
+""")
+# Databases created by create_all alone have no updated_at columns
+_FALLBACK_FINGERPRINT_SQL = text("""
+    SELECT (SELECT max(id) FROM topics), (SELECT count(*) FROM topics),
+           (SELECT max(id) FROM practice_templates), (SELECT count(*) FROM practice_templates)
+""")
+
+# Response headers replayed from the cache
+_STORED_HEADERS = (b"content-type", b"x-next-cursor")
+
+
+class CatalogVersion:
+    """Process-local catalog version: local generation plus a TTL-cached DB fingerprint."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._fingerprint: Optional[str] = None
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+        self._use_fallback = False
+
+    def bump(self) -> None:
+        """Invalidate: the next read gets a new version and re-reads the fingerprint."""
+        self.generation += 1
+        self._expires = 0.0
+
+    async def current(self) -> Optional[str]:
+        """
+        Current version string, or None if the database cannot be reached.
+        A failed read is remembered for the TTL too, so during an outage
+        requests skip the cache instead of queueing to retry the database.
+        """
+        if time.monotonic() >= self._expires:
+            async with self._lock:
+                # Another request may have refreshed it while we waited
+                if time.monotonic() >= self._expires:
+                    self._fingerprint = await self._read_fingerprint()
+                    self._expires = time.monotonic() + self.ttl_seconds
+        if self._fingerprint is None:
+            return None
+        return f"{self.generation}:{self._fingerprint}"
+
+    async def _read_fingerprint(self) -> Optional[str]:
+        AsyncSessionLocal = get_async_session_local()
+        if AsyncSessionLocal is None:
+            return None
+        try:
+            async with AsyncSessionLocal() as db:
+                if not self._use_fallback:
+                    try:
+                        row = (await db.execute(_FINGERPRINT_SQL)).one()
+                        return "|".join(str(v) for v in row)
+                    except Exception:
+                        await db.rollback()
+                        self._use_fallback = True
+                row = (await db.execute(_FALLBACK_FINGERPRINT_SQL)).one()
+                return "|".join(str(v) for v in row)
+        except Exception as e:
+            logger.warning(f"Could not read catalog version: {e}")
+            return None
+
+
+class _Entry:
+    __slots__ = ("version", "etag", "status", "headers", "body", "route")
+
+    def __init__(self, version: str, etag: bytes, status: int, headers: list, body: bytes, route=None):
+        self.version = version
+        self.etag = etag
+        self.status = status
+        self.headers = headers
+        self.body = body
+        # Matched route, restored on hits so metrics keep the route label
+        self.route = route
+
+
+class ResponseCache:
+    """LRU of cached responses bounded by entry count and total body bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: str, version: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: _Entry) -> None:
+        size = len(entry.body)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.body)
+        self._entries[key] = entry
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.body)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "catalog_generation": catalog_version.generation,
+        }
+
+
+catalog_version = CatalogVersion(settings.CATALOG_VERSION_TTL_SECONDS)
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_MAX_BYTES)
+
+
+def invalidate_catalog() -> None:
+    """Call after topics or practice templates change outside the ORM."""
+    catalog_version.bump()
+    response_cache.clear()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison, as for GET/HEAD)."""
+    if not if_none_match:
+        return False
+    candidates = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class CatalogCacheMiddleware:
+    """
+    ASGI middleware serving cached catalog GET responses with strong ETags.
+    Register it inside CORSMiddleware so cached responses still get CORS headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not CACHEABLE_PATHS.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        version = await catalog_version.current()
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = scope["path"] + "?" + scope.get("query_string", b"").decode("latin-1")
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        entry = response_cache.get(key, version)
+        if entry is None:
+            entry = await self._render(scope, receive, send, version)
+            if entry is None:
+                return  # Not cacheable; already sent as-is
+            response_cache.put(key, entry)
+        elif entry.route is not None:
+            scope["route"] = entry.route
+        await self._send(entry, if_none_match, send)
+
+    async def _render(self, scope, receive, send, version: str) -> Optional[_Entry]:
+        """Run the route, buffering a 200 response; anything else streams through."""
+        # The entry is stored under a version read from the primary, so the body
+        # must come from there too: a lagging replica's would outlive the change
+        scope.setdefault("state", {})[READ_PRIMARY_STATE] = True
+        start = {}
+        chunks = []
+        passthrough = False
+
+        async def capture(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start.update(message)
+            elif passthrough:
+                await send(message)
+            else:
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if passthrough:
+            return None
+        body = b"".join(chunks)
+        headers = [(k, v) for k, v in start.get("headers", []) if k.lower() in _STORED_HEADERS]
+        etag = b'"' + hashlib.sha256(body).hexdigest()[:32].encode() + b'"'
+        return _Entry(version, etag, 200, headers, body, scope.get("route"))
+
+    async def _send(self, entry: _Entry, if_none_match: Optional[str], send) -> None:
+        headers = entry.headers + [(b"etag", entry.etag), (b"cache-control", b"no-cache")]
+        if etag_matches(if_none_match, entry.etag.decode()):
+            response_cache.not_modified += 1
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers.append((b"content-length", str(len(entry.body)).encode()))
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+
+@event.listens_for(Topic, "after_insert")
+@event.listens_for(Topic, "after_update")
+@event.listens_for(Topic, "after_delete")
+@event.listens_for(PracticeTemplate, "after_insert")
+@event.listens_for(PracticeTemplate, "after_update")
+@event.listens_for(PracticeTemplate, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    invalidate_catalog()
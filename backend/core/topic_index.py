@@ -0,0 +1,184 @@
+"""
+In-process topic search index for typeahead suggestions.
+
+Topics change rarely, so the catalog is loaded at startup into a prefix
+trie plus a token-level inverted index over ``name`` and ``asc_reference``.
+Each index remembers the catalog version (core.response_cache) it was
+built from; ``ensure_topic_index_current()``, called on every suggest,
+compares it with the current version (re-read from the database at most
+once per CATALOG_VERSION_TTL_SECONDS) and rebuilds in the background when
+the catalog has changed, so every worker picks up edits made through any
+worker or directly in SQL. Lookups themselves never touch the database.
+"""
+import asyncio
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+
+from core.response_cache import catalog_version
+from database import get_async_session_local
+from models.topic import Topic
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase text and split it into alphanumeric tokens."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Every topic with a token passing through this node, so a prefix
+        # lookup is O(len(prefix)) regardless of how many tokens share it
+        self.ids: Set[int] = set()
+
+
+class TopicIndex:
+    """
+    Immutable-once-built search index over topics.
+
+    Attributes:
+        topics: Topic rows by id as plain dicts (id, name, asc_reference)
+        postings: Inverted index of full token -> topic ids
+        version: Incremented on every rebuild
+    """
+
+    def __init__(self):
+        self.topics: Dict[int, dict] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self._normalized_names: Dict[int, str] = {}
+        self._root = _TrieNode()
+        self.version = 0
+        self.ready = False
+        # Catalog version (core.response_cache) the topics were read at
+        self.catalog_version: Optional[str] = None
+
+    @classmethod
+    def build(cls, topics: Iterable[dict], version: int = 1, catalog_version: Optional[str] = None) -> "TopicIndex":
+        """Build a new index from dicts with id, name and asc_reference."""
+        index = cls()
+        index.catalog_version = catalog_version
+        for topic in topics:
+            topic_id = topic["id"]
+            index.topics[topic_id] = {
+                "id": topic_id,
+                "name": topic["name"],
+                "asc_reference": topic.get("asc_reference"),
+            }
+            index._normalized_names[topic_id] = " ".join(tokenize(topic["name"]))
+            for token in set(tokenize(topic["name"]) + tokenize(topic.get("asc_reference"))):
+                index.postings.setdefault(token, set()).add(topic_id)
+                node = index._root
+                for ch in token:
+                    node = node.children.setdefault(ch, _TrieNode())
+                    node.ids.add(topic_id)
+        index.version = version
+        index.ready = True
+        return index
+
+    def _prefix_ids(self, prefix: str) -> Set[int]:
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.ids
+
+    def suggest(self, q: str, limit: int = 10) -> List[dict]:
+        """
+        Return topics matching every query token, the last one as a prefix.
+
+        Topics whose name starts with the query rank first, then by name.
+        """
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        # Completed words are exact token lookups; the word being typed is a prefix
+        candidates: Optional[Set[int]] = None
+        for token in tokens[:-1]:
+            ids = self.postings.get(token) or self._prefix_ids(token)
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        last = self._prefix_ids(tokens[-1])
+        candidates = set(last) if candidates is None else candidates & last
+        needle = " ".join(tokens)
+        ranked = sorted(
+            candidates,
+            key=lambda i: (not self._normalized_names[i].startswith(needle), self._normalized_names[i]),
+        )
+        return [self.topics[i] for i in ranked[:limit]]
+
+
+# Process-wide index; swapped atomically on refresh so readers never see a partial build
+_index = TopicIndex()
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def get_topic_index() -> TopicIndex:
+    """Get the current in-process topic index."""
+    return _index
+
+
+async def refresh_topic_index(db=None) -> TopicIndex:
+    """
+    Rebuild the topic index from the database and swap it in.
+
+    Args:
+        db: Optional AsyncSession; a short-lived session is opened if omitted
+
+    Returns:
+        The newly built index
+
+    Raises:
+        ValueError: If database configuration is missing
+    """
+    global _index
+    # Read before the topics, so a change made during the load triggers another rebuild
+    version = await catalog_version.current()
+    stmt = select(Topic.id, Topic.name, Topic.asc_reference)
+    if db is None:
+        AsyncSessionLocal = get_async_session_local()
+        if AsyncSessionLocal is None:
+            raise ValueError("Database not configured; cannot build topic index.")
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(stmt)).all()
+    else:
+        rows = (await db.execute(stmt)).all()
+    _index = TopicIndex.build(
+        ({"id": r.id, "name": r.name, "asc_reference": r.asc_reference} for r in rows),
+        version=_index.version + 1,
+        catalog_version=version,
+    )
+    return _index
+
+
+async def _refresh_in_background() -> None:
+    try:
+        await refresh_topic_index()
+    except Exception as e:
+        logger.warning(f"Could not rebuild topic index: {e}")
+
+
+async def ensure_topic_index_current() -> TopicIndex:
+    """
+    Start a rebuild if the catalog changed since the index was built (one
+    at a time). Until it finishes the previous index keeps serving, unless
+    there is none yet, in which case this waits for the build.
+    """
+    global _refresh_task
+    version = await catalog_version.current()
+    if version is not None and version != _index.catalog_version:
+        if _refresh_task is None or _refresh_task.done():
+            _refresh_task = asyncio.create_task(_refresh_in_background())
+        if not _index.ready:
+            await asyncio.shield(_refresh_task)
+    return _index
@@ -1,15 +1,46 @@
 """
 Database configuration and session management for Azure PostgreSQL.
-Uses SQLAlchemy with psycopg2-binary driver.
+Uses SQLAlchemy with psycopg2-binary driver for sync sessions and
+asyncpg for the async sessions used by request handlers.
+
+Optional read replicas (DB_REPLICA_URLS) get their own pools; read-only
+routes take get_async_read_db, which picks a healthy replica and falls
+back to the primary when none is reachable or the user has just written.
 """
+import asyncio
+import logging
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
 from config import settings
-from typing import Optional
+from core.admission import database_slot
+from core.metrics import MeteredAsyncAdaptedQueuePool, instrument_engine
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
 
 # Lazy initialization - engine created only when needed
 _engine: Optional[object] = None
 _SessionLocal: Optional[sessionmaker] = None
+_async_engine: Optional[object] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+_replica_engines: Optional[List[object]] = None
+_ReplicaSessionLocals: List[async_sessionmaker] = []
+# Per replica: time.monotonic() before which it is skipped after a failed connect
+_replica_down_until: List[float] = []
+_replica_next = 0
+# user_id -> time.monotonic() until which that user's reads go to the primary
+_recent_writers: Dict[str, float] = {}
+
+# Cookie carrying the read-your-writes deadline (epoch seconds) across workers
+READ_PRIMARY_COOKIE = "studyhub_read_primary_until"
+
+# Set in the request scope's state by code that caches what the route reads
+# (core.response_cache), so the route reads from the primary
+READ_PRIMARY_STATE = "read_primary"
 
 def get_engine():
     """Get or create the database engine (lazy initialization)"""
@@ -26,6 +57,8 @@ def get_engine():
                 max_overflow=settings.DB_MAX_OVERFLOW,
                 echo=settings.DB_ECHO
             )
+            if settings.METRICS_ENABLED:
+                instrument_engine(_engine)
             engine = _engine
         except (ValueError, Exception):
             # Missing config or connection error: allow app to run without DB
@@ -44,6 +77,157 @@ def get_session_local():
         _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return _SessionLocal
 
+def get_async_engine():
+    """Get or create the async database engine (lazy initialization)"""
+    global _async_engine
+    if _async_engine is None:
+        try:
+            # Get database URL from settings (asyncpg driver)
+            DATABASE_URL = settings.get_database_url(async_driver=True)
+            _async_engine = create_async_engine(
+                DATABASE_URL,
+                pool_pre_ping=True,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                echo=settings.DB_ECHO,
+                # Same queue pool, plus checkout wait timing for /metrics
+                poolclass=MeteredAsyncAdaptedQueuePool,
+            )
+            if settings.METRICS_ENABLED:
+                instrument_engine(_async_engine.sync_engine)
+        except (ValueError, Exception):
+            # Missing config or driver: allow app to run without DB
+            _async_engine = None
+            return None
+    return _async_engine
+
+def get_async_session_local():
+    """Get or create the async session maker (lazy initialization)"""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        async_engine = get_async_engine()
+        if async_engine is None:
+            return None
+        # expire_on_commit=False so returned ORM objects can be serialized
+        # after commit without triggering lazy loads outside the event loop
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _AsyncSessionLocal
+
+def get_replica_engines() -> List[object]:
+    """Get or create one async engine, with its own pool, per read replica (lazy initialization)"""
+    global _replica_engines, _ReplicaSessionLocals, _replica_down_until
+    if _replica_engines is None:
+        _replica_engines = [
+            create_async_engine(
+                url,
+                pool_pre_ping=True,
+                pool_size=settings.DB_REPLICA_POOL_SIZE,
+                max_overflow=settings.DB_REPLICA_MAX_OVERFLOW,
+                echo=settings.DB_ECHO,
+                poolclass=MeteredAsyncAdaptedQueuePool,
+                # Fail over quickly instead of waiting on an unreachable host
+                connect_args={"timeout": settings.DB_REPLICA_CONNECT_TIMEOUT_SECONDS},
+            )
+            for url in settings.get_replica_urls()
+        ]
+        if settings.METRICS_ENABLED:
+            for replica in _replica_engines:
+                instrument_engine(replica.sync_engine)
+        _ReplicaSessionLocals = [
+            async_sessionmaker(bind=replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for replica in _replica_engines
+        ]
+        _replica_down_until = [0.0] * len(_replica_engines)
+    return _replica_engines
+
+def replica_status() -> List[dict]:
+    """Pool occupancy and availability of each replica (for /metrics)."""
+    now = time.monotonic()
+    return [
+        {"pool": replica.sync_engine.pool, "up": _replica_down_until[i] <= now}
+        for i, replica in enumerate(get_replica_engines())
+    ]
+
+async def dispose_replica_engines() -> None:
+    for replica in _replica_engines or []:
+        await replica.dispose()
+
+def note_user_write(user_id: str, response=None) -> None:
+    """
+    Send this user's reads to the primary for DB_READ_YOUR_WRITES_SECONDS,
+    so a replica that has not caught up cannot hide the write they just made.
+    With a response, also set a cookie so other workers honour it.
+    """
+    if not settings.DB_REPLICA_URLS:
+        return
+    now = time.monotonic()
+    if len(_recent_writers) > 10000:
+        for key in [k for k, until in _recent_writers.items() if until <= now]:
+            del _recent_writers[key]
+    _recent_writers[user_id] = now + settings.DB_READ_YOUR_WRITES_SECONDS
+    if response is not None:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            f"{time.time() + settings.DB_READ_YOUR_WRITES_SECONDS:.3f}",
+            max_age=int(settings.DB_READ_YOUR_WRITES_SECONDS) + 1,
+            httponly=True,
+            samesite="lax",
+        )
+
+def reads_own_writes(request: Request) -> bool:
+    """
+    True if the request's user wrote within DB_READ_YOUR_WRITES_SECONDS, or
+    the request must not read a lagging replica (scope state READ_PRIMARY_STATE).
+    """
+    if request.scope.get("state", {}).get(READ_PRIMARY_STATE):
+        return True
+    cookie = request.cookies.get(READ_PRIMARY_COOKIE)
+    if cookie:
+        try:
+            if float(cookie) > time.time():
+                return True
+        except ValueError:
+            pass
+    user_id = request.query_params.get("user_id")
+    return user_id is not None and _recent_writers.get(user_id, 0.0) > time.monotonic()
+
+async def open_read_session(prefer_primary: bool = False) -> AsyncSession:
+    """
+    Open a session for read-only queries: on the next healthy replica
+    (round robin, connection already checked out), else on the primary.
+    The caller closes it.
+    """
+    global _replica_next
+    if settings.DB_REPLICA_URLS and not prefer_primary:
+        get_replica_engines()
+        count = len(_ReplicaSessionLocals)
+        for offset in range(count):
+            index = (_replica_next + offset) % count
+            if _replica_down_until[index] > time.monotonic():
+                continue
+            db = _ReplicaSessionLocals[index]()
+            try:
+                await db.connection()
+            except (OSError, SQLAlchemyError, asyncio.TimeoutError) as e:
+                await db.close()
+                _replica_down_until[index] = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+                logger.warning(f"Read replica {index} unavailable, reading from the primary: {e.__class__.__name__}")
+                continue
+            _replica_next = index + 1
+            return db
+    AsyncSessionLocal = get_async_session_local()
+    if AsyncSessionLocal is None:
+        raise ValueError(
+            "Database not configured. Please set database credentials in .env file. "
+            "See .env.example for required variables."
+        )
+    return AsyncSessionLocal()
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -75,3 +259,52 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get async database session
+async def get_async_db(request: Request):
+    """
+    Dependency function to get an async database session.
+    Use this in async FastAPI route dependencies so queries do not
+    block the event loop. Holds an admission slot (core.admission) while
+    the session is open.
+    
+    Yields:
+        AsyncSession: Database session that will be automatically closed
+        
+    Raises:
+        ValueError: If database configuration is missing
+        HTTPException: 503 if no admission slot frees up in time
+    """
+    AsyncSessionLocal = get_async_session_local()
+    if AsyncSessionLocal is None:
+        raise ValueError(
+            "Database not configured. Please set database credentials in .env file. "
+            "See .env.example for required variables."
+        )
+    
+    async with database_slot(request):
+        async with AsyncSessionLocal() as db:
+            yield db
+
+
+# Dependency to get a read-only async database session
+async def get_async_read_db(request: Request):
+    """
+    Dependency function for read-only routes. Uses a read replica when
+    DB_REPLICA_URLS is set (falling back to the primary if none is
+    reachable, or if the user has just written), otherwise the primary.
+    Do not write through this session. Holds an admission slot
+    (core.admission) while the session is open.
+    
+    Yields:
+        AsyncSession: Database session that will be automatically closed
+        
+    Raises:
+        ValueError: If database configuration is missing
+        HTTPException: 503 if no admission slot frees up in time
+    """
+    async with database_slot(request):
+        db = await open_read_session(prefer_primary=reads_own_writes(request))
+        async with db:
+            yield db
@@ -27,6 +27,7 @@ echo Verifying installations...
 %PYTHON_PATH% -m pip show sqlalchemy >nul 2>&1 && echo [OK] sqlalchemy || echo [FAIL] sqlalchemy
 %PYTHON_PATH% -m pip show psycopg2-binary >nul 2>&1 && echo [OK] psycopg2-binary || echo [FAIL] psycopg2-binary
 %PYTHON_PATH% -m pip show python-dotenv >nul 2>&1 && echo [OK] python-dotenv || echo [FAIL] python-dotenv
+%PYTHON_PATH% -m pip show asyncpg >nul 2>&1 && echo [OK] asyncpg || echo [FAIL] asyncpg
 
 echo.
 echo Installation complete!
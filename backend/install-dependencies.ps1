@@ -26,7 +26,8 @@ $packages = @(
     @{Name="uvicorn"; Check="uvicorn"},
     @{Name="sqlalchemy"; Check="sqlalchemy"},
     @{Name="psycopg2-binary"; Check="psycopg2"},
-    @{Name="python-dotenv"; Check="dotenv"}
+    @{Name="python-dotenv"; Check="dotenv"},
+    @{Name="asyncpg"; Check="asyncpg"}
 )
 
 foreach ($package in $packages) {
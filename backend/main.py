@@ -14,8 +14,9 @@ app = create_app()
 # Serve frontend at /app so API routes (/health, /api) are not overridden
 _frontend = Path(__file__).resolve().parent.parent / "frontend"
 if _frontend.exists():
-    from fastapi.staticfiles import StaticFiles
-    app.mount("/app", StaticFiles(directory=str(_frontend), html=True), name="frontend")
+    # Content-hashed, precompressed assets (see core.frontend_assets)
+    from core.frontend_assets import FrontendAssets
+    app.mount("/app", FrontendAssets(_frontend), name="frontend")
     @app.get("/")
     async def root():
         return RedirectResponse(url="/app/", status_code=302)
@@ -0,0 +1,158 @@
+"""
+Management commands for maintenance tasks.
+Run from the backend directory, e.g. ``python manage.py backfill-user-topic-state``.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from database import get_async_engine, get_async_session_local
+
+
+async def _run_in_session(func):
+    """Run func(db) in a committed AsyncSession and dispose the engine afterwards."""
+    AsyncSessionLocal = get_async_session_local()
+    if AsyncSessionLocal is None:
+        raise ValueError(
+            "Database not configured. Please set database credentials in .env file. "
+            "See .env.example for required variables."
+        )
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await func(db)
+            await db.commit()
+            return result
+    finally:
+        await get_async_engine().dispose()
+
+
+def migrate(args: argparse.Namespace) -> None:
+    """Apply pending schema migrations from migrations/ (--status lists them)."""
+    from core.migrations import apply_migrations, migration_status
+
+    async def run():
+        engine = get_async_engine()
+        if engine is None:
+            raise ValueError(
+                "Database not configured. Please set database credentials in .env file. "
+                "See .env.example for required variables."
+            )
+        try:
+            if args.status:
+                for migration, applied_at in await migration_status(engine):
+                    pending = "pending (manual)" if migration.manual else "pending"
+                    print(f"{migration.path.name}: {applied_at or pending}")
+                return
+            applied = await apply_migrations(engine, target=args.target)
+            for migration in applied:
+                print(f"applied {migration.path.name}")
+            print(f"{len(applied)} migration(s) applied")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def backfill_user_topic_state(args: argparse.Namespace) -> None:
+    """Build user_topic_state from existing progress_logs."""
+    from core.progress_state import backfill_user_topic_state as backfill
+
+    rows = asyncio.run(_run_in_session(backfill))
+    print(f"user_topic_state: {rows} row(s) inserted or updated")
+
+
+def backfill_progress_rollups(args: argparse.Namespace) -> None:
+    """Rebuild analytics milestones and hourly/daily rollups from progress_logs."""
+    from core.progress_rollups import backfill_progress_rollups as backfill
+
+    counts = asyncio.run(_run_in_session(backfill))
+    for table, rows in counts.items():
+        print(f"{table}: {rows} row(s)")
+
+
+def backfill_answer_fingerprints(args: argparse.Namespace) -> None:
+    """Recompute practice template answer-key fingerprints from expected_entries."""
+    from core.answer_keys import backfill_answer_fingerprints as backfill
+
+    rows = asyncio.run(_run_in_session(backfill))
+    print(f"practice_templates: {rows} fingerprint(s) updated")
+
+
+def create_progress_partitions(args: argparse.Namespace) -> None:
+    """Create missing monthly progress_logs partitions through --months-ahead."""
+    from core.progress_partitions import ensure_progress_partitions
+
+    created = asyncio.run(_run_in_session(lambda db: ensure_progress_partitions(db, args.months_ahead)))
+    if created is None:
+        raise SystemExit("progress_logs is not partitioned yet. Run: python manage.py migrate")
+    print(f"progress_logs: {created} partition(s) created")
+
+
+def compact_progress_logs(args: argparse.Namespace) -> None:
+    """Summarize progress_logs partitions older than --retain-months into daily summaries and drop them."""
+    from config import settings
+    from core.progress_partitions import compact_progress_logs as compact
+
+    retain_months = args.retain_months or settings.PROGRESS_RETENTION_MONTHS
+    if retain_months < 1:
+        raise SystemExit("Pass --retain-months or set PROGRESS_RETENTION_MONTHS")
+    compacted = asyncio.run(_run_in_session(
+        lambda db: compact(db, retain_months, drop=not args.detach, dry_run=args.dry_run)
+    ))
+    for partition in compacted:
+        print(f"{partition['name']}: {partition['rows']} row(s) before {partition['range_end']:%Y-%m-%d}")
+    verb = "would be compacted" if args.dry_run else "compacted"
+    print(f"{len(compacted)} partition(s) {verb}")
+
+
+def build_assets(args: argparse.Namespace) -> None:
+    """Write fingerprinted, precompressed frontend assets for a CDN or reverse proxy."""
+    from core.frontend_assets import build_frontend_assets, write_frontend_assets
+
+    assets = build_frontend_assets(Path(args.frontend))
+    files = write_frontend_assets(assets, Path(args.out))
+    print(f"{args.out}: {files} file(s) for {len(assets)} asset(s)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Master's Accounting Study Hub management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("migrate", help=migrate.__doc__)
+    cmd.add_argument("--status", action="store_true", help="List migrations and when each was applied")
+    cmd.add_argument("--target", type=int, help="Stop after this version")
+    cmd.set_defaults(handler=migrate)
+
+    cmd = commands.add_parser("backfill-user-topic-state", help=backfill_user_topic_state.__doc__)
+    cmd.set_defaults(handler=backfill_user_topic_state)
+
+    cmd = commands.add_parser("backfill-progress-rollups", help=backfill_progress_rollups.__doc__)
+    cmd.set_defaults(handler=backfill_progress_rollups)
+
+    cmd = commands.add_parser("backfill-answer-fingerprints", help=backfill_answer_fingerprints.__doc__)
+    cmd.set_defaults(handler=backfill_answer_fingerprints)
+
+    cmd = commands.add_parser("create-progress-partitions", help=create_progress_partitions.__doc__)
+    cmd.add_argument("--months-ahead", type=int, help="Months after the current one (default: PROGRESS_PARTITION_MONTHS_AHEAD)")
+    cmd.set_defaults(handler=create_progress_partitions)
+
+    cmd = commands.add_parser("compact-progress-logs", help=compact_progress_logs.__doc__)
+    cmd.add_argument("--retain-months", type=int, help="Whole months of raw logs to keep (default: PROGRESS_RETENTION_MONTHS)")
+    cmd.add_argument("--detach", action="store_true", help="Detach compacted partitions instead of dropping them")
+    cmd.add_argument("--dry-run", action="store_true", help="List the partitions that would be compacted")
+    cmd.set_defaults(handler=compact_progress_logs)
+
+    frontend = Path(__file__).resolve().parent.parent / "frontend"
+    cmd = commands.add_parser("build-assets", help=build_assets.__doc__)
+    cmd.add_argument("--frontend", default=str(frontend), help="Source directory (default: ../frontend)")
+    cmd.add_argument("--out", default=str(frontend.parent / "frontend-dist"), help="Output directory")
+    cmd.set_defaults(handler=build_assets)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+-- Adopt databases created by the app's old create_all startup, before 001
+-- runs on them: their topics and practice_templates have no timestamp
+-- columns, which 001 indexes. On a new database the tables do not exist yet
+-- and this does nothing; where 001 is already applied it changes nothing.
+-- Master's Accounting Study Hub
+
+ALTER TABLE IF EXISTS topics ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE IF EXISTS topics ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE IF EXISTS practice_templates ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE IF EXISTS practice_templates ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+-- Databases built from an infrastructure/schema.sql without schema_version
+-- rows already have 001's triggers, which 001 creates without IF NOT EXISTS
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM schema_version WHERE version = 1) THEN
+        DROP TRIGGER IF EXISTS update_topics_updated_at ON topics;
+        DROP TRIGGER IF EXISTS update_practice_templates_updated_at ON practice_templates;
+    END IF;
+EXCEPTION WHEN undefined_table THEN
+    NULL;  -- new database: no topics / practice_templates yet
+END;
+$$;
@@ -0,0 +1,11 @@
+-- Trigram indexes for ranked, typo-tolerant topic search
+-- Master's Accounting Study Hub
+-- Requires the pg_trgm extension (available on Azure PostgreSQL; allow-list it
+-- under server parameters azure.extensions if CREATE EXTENSION is rejected)
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- GIN trigram indexes serve both fuzzy (<%) and leading-wildcard ILIKE lookups,
+-- which the B-tree idx_topics_name / idx_topics_asc_reference cannot
+CREATE INDEX IF NOT EXISTS idx_topics_name_trgm ON topics USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_topics_asc_reference_trgm ON topics USING GIN (asc_reference gin_trgm_ops);
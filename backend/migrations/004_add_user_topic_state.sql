@@ -0,0 +1,19 @@
+-- Latest progress status per user/topic, maintained by POST /api/progress
+-- Master's Accounting Study Hub
+-- After applying, populate from history with: python manage.py backfill-user-topic-state
+
+CREATE TABLE IF NOT EXISTS user_topic_state (
+    user_id VARCHAR(255) NOT NULL,
+    topic_id INTEGER NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    last_seen TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, topic_id),
+    CONSTRAINT fk_user_topic_state_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+-- Dashboard reads one user's rows newest first
+CREATE INDEX IF NOT EXISTS idx_user_topic_state_user_last_seen ON user_topic_state(user_id, last_seen);
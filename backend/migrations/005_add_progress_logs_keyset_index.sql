@@ -0,0 +1,6 @@
+-- Keyset pagination index for GET /api/progress
+-- Master's Accounting Study Hub
+-- Serves WHERE user_id = ? ORDER BY timestamp DESC, id DESC with a cursor
+-- predicate on (timestamp, id) as a single backward index range scan
+
+CREATE INDEX IF NOT EXISTS idx_progress_logs_user_timestamp_id ON progress_logs(user_id, timestamp, id);
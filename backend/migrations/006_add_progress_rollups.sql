@@ -0,0 +1,50 @@
+-- Cohort analytics rollups, maintained alongside every progress_logs insert
+-- Master's Accounting Study Hub
+-- After applying, populate from history with: python manage.py backfill-progress-rollups
+
+-- First time each user reached each status on a topic (makes learner counts additive)
+CREATE TABLE IF NOT EXISTS user_topic_milestones (
+    user_id VARCHAR(255) NOT NULL,
+    topic_id INTEGER NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    first_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, topic_id, status),
+    CONSTRAINT fk_user_topic_milestones_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+-- Events and first-time learners per topic, status and hour/day
+CREATE TABLE IF NOT EXISTS progress_rollups_hourly (
+    topic_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    events BIGINT NOT NULL DEFAULT 0,
+    learners BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (topic_id, bucket, status),
+    CONSTRAINT fk_progress_rollups_hourly_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS progress_rollups_daily (
+    topic_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    events BIGINT NOT NULL DEFAULT 0,
+    learners BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (topic_id, bucket, status),
+    CONSTRAINT fk_progress_rollups_daily_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+-- Cross-topic window queries ("mastered this week")
+CREATE INDEX IF NOT EXISTS idx_progress_rollups_hourly_bucket ON progress_rollups_hourly(bucket);
+CREATE INDEX IF NOT EXISTS idx_progress_rollups_daily_bucket ON progress_rollups_daily(bucket);
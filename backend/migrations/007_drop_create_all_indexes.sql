@@ -0,0 +1,11 @@
+-- Drop indexes that only exist on databases created by the app's old
+-- create_all startup: they duplicate 001's idx_* indexes (or a primary key)
+-- and slow every insert
+-- Master's Accounting Study Hub
+
+DROP INDEX IF EXISTS ix_topics_id;
+DROP INDEX IF EXISTS ix_topics_name;
+DROP INDEX IF EXISTS ix_practice_templates_id;
+DROP INDEX IF EXISTS ix_progress_logs_id;
+DROP INDEX IF EXISTS ix_progress_logs_user_id;
+DROP INDEX IF EXISTS ix_progress_logs_status;
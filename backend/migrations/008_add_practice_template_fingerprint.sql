@@ -0,0 +1,6 @@
+-- Add expected_fingerprint: multiset hash of expected_entries, so ledger
+-- grading compares one value instead of sorting lines (see core/answer_keys.py)
+-- Master's Accounting Study Hub
+-- Existing rows: python manage.py backfill-answer-fingerprints
+
+ALTER TABLE practice_templates ADD COLUMN IF NOT EXISTS expected_fingerprint VARCHAR(32);
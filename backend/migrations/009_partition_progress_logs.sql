@@ -0,0 +1,136 @@
+-- Convert progress_logs to monthly range partitions on timestamp, with
+-- per-user/topic/day summaries for compacted partitions (see core/progress_partitions.py)
+-- Master's Accounting Study Hub
+-- Existing rows are copied into the partitions inside this migration, so it
+-- is applied on startup only while progress_logs is empty; otherwise run
+-- python manage.py migrate in a maintenance window.
+-- migrate: manual unless-empty progress_logs
+
+-- Create the partition for one month, moving that month's rows out of the
+-- DEFAULT partition. The table is filled before it is attached, so only
+-- progress_logs_default is scanned under lock. Returns false if it exists.
+CREATE OR REPLACE FUNCTION create_progress_log_partition(month_start TIMESTAMP)
+RETURNS BOOLEAN AS $$
+DECLARE
+    lo TIMESTAMP := date_trunc('month', month_start);
+    hi TIMESTAMP := date_trunc('month', month_start) + INTERVAL '1 month';
+    part TEXT := 'progress_logs_' || to_char(date_trunc('month', month_start), 'YYYY_MM');
+BEGIN
+    -- Workers creating partitions at the same time take turns
+    PERFORM pg_advisory_xact_lock(72030518);
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE progress_logs INCLUDING DEFAULTS)', part);
+    IF to_regclass('progress_logs_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM progress_logs_default WHERE "timestamp" >= $1 AND "timestamp" < $2 RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved', part
+        ) USING lo, hi;
+    END IF;
+    EXECUTE format('ALTER TABLE progress_logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', part, lo, hi);
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create every missing monthly partition from range_start's month through range_end's
+CREATE OR REPLACE FUNCTION create_progress_log_partitions(range_start TIMESTAMP, range_end TIMESTAMP)
+RETURNS INTEGER AS $$
+DECLARE
+    month TIMESTAMP := date_trunc('month', range_start);
+    created INTEGER := 0;
+BEGIN
+    WHILE month <= range_end LOOP
+        IF create_progress_log_partition(month) THEN
+            created := created + 1;
+        END IF;
+        month := month + INTERVAL '1 month';
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    seq TEXT := pg_get_serial_sequence('progress_logs', 'id');
+    pkey TEXT;
+    oldest TIMESTAMP;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'progress_logs'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE progress_logs RENAME TO progress_logs_unpartitioned;
+    SELECT conname INTO pkey FROM pg_constraint
+    WHERE conrelid = 'progress_logs_unpartitioned'::regclass AND contype = 'p';
+    EXECUTE format('ALTER TABLE progress_logs_unpartitioned RENAME CONSTRAINT %I TO progress_logs_unpartitioned_pkey', pkey);
+
+    -- The partition key must be part of the primary key; ids stay unique via the sequence
+    EXECUTE format($ddl$
+        CREATE TABLE progress_logs (
+            id INTEGER NOT NULL DEFAULT nextval(%L::regclass),
+            user_id VARCHAR(255) NOT NULL,
+            topic_id INTEGER NOT NULL,
+            "timestamp" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            status VARCHAR(50) NOT NULL,
+            notes TEXT,
+            PRIMARY KEY (id, "timestamp"),
+            CONSTRAINT fk_progress_logs_topic
+                FOREIGN KEY (topic_id)
+                REFERENCES topics(id)
+                ON DELETE CASCADE
+                ON UPDATE CASCADE
+        ) PARTITION BY RANGE ("timestamp")
+    $ddl$, seq);
+    CREATE TABLE progress_logs_default PARTITION OF progress_logs DEFAULT;
+
+    SELECT min("timestamp") INTO oldest FROM progress_logs_unpartitioned;
+    PERFORM create_progress_log_partitions(COALESCE(oldest, LOCALTIMESTAMP), LOCALTIMESTAMP + INTERVAL '3 months');
+    INSERT INTO progress_logs (id, user_id, topic_id, "timestamp", status, notes)
+    SELECT id, user_id, topic_id, COALESCE("timestamp", 'epoch'::timestamp), status, notes
+    FROM progress_logs_unpartitioned;
+
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY progress_logs.id', seq);
+    DROP TABLE progress_logs_unpartitioned;
+END $$;
+
+-- Secondary indexes, built per partition. user_id and (user_id, topic_id)
+-- are covered by the (user_id, timestamp, id) prefix, and status alone is
+-- too unselective to pay for itself on every insert.
+CREATE INDEX IF NOT EXISTS idx_progress_logs_user_timestamp_id ON progress_logs(user_id, "timestamp", id);
+CREATE INDEX IF NOT EXISTS idx_progress_logs_timestamp ON progress_logs("timestamp");
+CREATE INDEX IF NOT EXISTS idx_progress_logs_topic_id ON progress_logs(topic_id);
+DROP INDEX IF EXISTS idx_progress_logs_user_id;
+DROP INDEX IF EXISTS idx_progress_logs_status;
+DROP INDEX IF EXISTS idx_progress_logs_user_topic;
+
+-- Raw logs of compacted partitions, summarized per user, topic, day and status
+CREATE TABLE IF NOT EXISTS progress_log_daily_summaries (
+    user_id VARCHAR(255) NOT NULL,
+    topic_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    events INTEGER NOT NULL,
+    first_at TIMESTAMP NOT NULL,
+    last_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, topic_id, day, status),
+    CONSTRAINT fk_progress_log_daily_summaries_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_progress_log_daily_summaries_topic_id ON progress_log_daily_summaries(topic_id);
+
+-- One row per compaction: progress_logs holds no rows before max(range_end)
+-- other than late arrivals in the default partition
+CREATE TABLE IF NOT EXISTS progress_log_compactions (
+    id SERIAL PRIMARY KEY,
+    partition_name VARCHAR(63) NOT NULL,
+    range_start TIMESTAMP,
+    range_end TIMESTAMP NOT NULL,
+    rows_compacted BIGINT NOT NULL,
+    dropped BOOLEAN NOT NULL,
+    compacted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,42 @@
+-- Delta sync of the topic / practice-template catalog (GET /api/catalog/sync,
+-- see routers/catalog.py): changes are found by updated_at, deletes by tombstone
+-- Master's Accounting Study Hub
+
+-- updated_at is set by default on insert and by trigger on update (001)
+UPDATE topics SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL;
+UPDATE practice_templates SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_topics_updated_at ON topics(updated_at);
+CREATE INDEX IF NOT EXISTS idx_practice_templates_updated_at ON practice_templates(updated_at);
+
+-- One row per deleted topic or template (entity is the table name)
+CREATE TABLE IF NOT EXISTS catalog_tombstones (
+    entity VARCHAR(63) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_catalog_tombstones_deleted_at ON catalog_tombstones(deleted_at);
+
+CREATE OR REPLACE FUNCTION record_catalog_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO catalog_tombstones (entity, entity_id) VALUES (TG_TABLE_NAME, OLD.id)
+    ON CONFLICT (entity, entity_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row-level, so templates removed by a topic's ON DELETE CASCADE are recorded too
+DROP TRIGGER IF EXISTS record_topics_tombstone ON topics;
+CREATE TRIGGER record_topics_tombstone
+    AFTER DELETE ON topics
+    FOR EACH ROW
+    EXECUTE FUNCTION record_catalog_tombstone();
+
+DROP TRIGGER IF EXISTS record_practice_templates_tombstone ON practice_templates;
+CREATE TRIGGER record_practice_templates_tombstone
+    AFTER DELETE ON practice_templates
+    FOR EACH ROW
+    EXECUTE FUNCTION record_catalog_tombstone();
@@ -4,5 +4,13 @@ Models package for SQLAlchemy database models.
 from models.topic import Topic
 from models.practice_template import PracticeTemplate
 from models.progress_log import ProgressLog
+from models.user_topic_state import UserTopicState
+from models.progress_rollup import UserTopicMilestone, ProgressRollupHourly, ProgressRollupDaily
+from models.progress_log_summary import ProgressLogDailySummary, ProgressLogCompaction
+from models.catalog_tombstone import CatalogTombstone
 
-__all__ = ["Topic", "PracticeTemplate", "ProgressLog"]
+__all__ = [
+    "Topic", "PracticeTemplate", "ProgressLog", "UserTopicState",
+    "UserTopicMilestone", "ProgressRollupHourly", "ProgressRollupDaily",
+    "ProgressLogDailySummary", "ProgressLogCompaction", "CatalogTombstone",
+]
@@ -0,0 +1,29 @@
+"""
+CatalogTombstone model: deleted topics and practice templates, for delta sync.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
+from database import Base
+
+
+class CatalogTombstone(Base):
+    """
+    SQLAlchemy model for a deleted catalog row. Written by the
+    record_catalog_tombstone() triggers (migrations/010), so deletes made in
+    SQL or by ON DELETE CASCADE are recorded too.
+    
+    Attributes:
+        entity: Table of the deleted row: topics or practice_templates (part of primary key)
+        entity_id: Its id (part of primary key)
+        deleted_at: When it was deleted (transaction start, like updated_at)
+    """
+    __tablename__ = "catalog_tombstones"
+    __table_args__ = (
+        Index("idx_catalog_tombstones_deleted_at", "deleted_at"),
+    )
+    
+    entity = Column(String(63), primary_key=True)
+    entity_id = Column(Integer, primary_key=True)
+    deleted_at = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    
+    def __repr__(self):
+        return f"<CatalogTombstone(entity='{self.entity}', entity_id={self.entity_id})>"
@@ -1,7 +1,7 @@
 """
 PracticeTemplate model for accounting practice scenarios.
 """
-from sqlalchemy import Column, Integer, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, DateTime, Index, text
 from database import Base
 
 
@@ -14,13 +14,24 @@ class PracticeTemplate(Base):
         topic_id: Foreign key to topics
         template_text: Scenario description / instructions
         expected_entries: JSON array of {account, debit, credit} for validation
+        expected_fingerprint: Multiset hash of expected_entries (see core.answer_keys)
+        created_at / updated_at: Set by the database (updated_at by trigger)
     """
     __tablename__ = "practice_templates"
+    __table_args__ = (
+        Index("idx_practice_templates_topic_id", "topic_id"),
+        Index("idx_practice_templates_created_at", "created_at"),
+        # Delta sync: rows changed since a client's token (migrations/010)
+        Index("idx_practice_templates_updated_at", "updated_at"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), nullable=False)
     template_text = Column(Text, nullable=False)
     expected_entries = Column(JSON, nullable=True)  # [{account, debit, credit}, ...]
+    expected_fingerprint = Column(String(32), nullable=True)
+    created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
+    updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     
     def __repr__(self):
         return f"<PracticeTemplate(id={self.id}, topic_id={self.topic_id})>"
@@ -1,7 +1,7 @@
 """
 ProgressLog model for user study progress.
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, text
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, text
 from database import Base
 
 
@@ -13,15 +13,27 @@ class ProgressLog(Base):
         id: Primary key
         user_id: User identifier
         topic_id: Foreign key to topics
-        timestamp: When the progress was recorded
+        timestamp: When the progress was recorded (partition key)
         status: viewed, in_progress, mastered
         notes: Optional notes
     """
     __tablename__ = "progress_logs"
+    __table_args__ = (
+        Index("idx_progress_logs_topic_id", "topic_id"),
+        Index("idx_progress_logs_timestamp", "timestamp"),
+        # Keyset pagination of a user's history on (timestamp, id); also
+        # serves lookups by user_id and by user_id + topic_id
+        Index("idx_progress_logs_user_timestamp_id", "user_id", "timestamp", "id"),
+        # Monthly partitions (migrations/009, core.progress_partitions); the
+        # table's primary key is (id, timestamp), ids come from one sequence
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    # Load the server-default timestamp via INSERT ... RETURNING on flush
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String(255), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String(255), nullable=False)
     topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), nullable=False)
-    timestamp = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
-    status = Column(String(50), nullable=False, index=True)
+    timestamp = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    status = Column(String(50), nullable=False)
     notes = Column(Text, nullable=True)
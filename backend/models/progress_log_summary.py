@@ -0,0 +1,63 @@
+"""
+Compacted progress history: daily summaries of dropped progress_logs
+partitions and the record of each compaction (see core.progress_partitions).
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, ForeignKey, Date, DateTime, Index, text
+from database import Base
+
+
+class ProgressLogDailySummary(Base):
+    """
+    SQLAlchemy model for the raw logs of compacted months, collapsed per
+    user, topic, day and status.
+
+    Attributes:
+        user_id: User identifier (part of primary key)
+        topic_id: Foreign key to topics (part of primary key)
+        day: Calendar day of the logs (part of primary key)
+        status: viewed, in_progress, mastered (part of primary key)
+        events: Progress logs summarized
+        first_at / last_at: Earliest and latest of their timestamps
+    """
+    __tablename__ = "progress_log_daily_summaries"
+    __table_args__ = (
+        Index("idx_progress_log_daily_summaries_topic_id", "topic_id"),
+    )
+
+    user_id = Column(String(255), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    events = Column(Integer, nullable=False)
+    first_at = Column(DateTime, nullable=False)
+    last_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ProgressLogDailySummary(user_id='{self.user_id}', topic_id={self.topic_id}, day={self.day})>"
+
+
+class ProgressLogCompaction(Base):
+    """
+    SQLAlchemy model for one compacted progress_logs partition (or the
+    DEFAULT partition's rows before range_end).
+
+    Attributes:
+        id: Primary key
+        partition_name: Partition summarized
+        range_start / range_end: Its bounds (range_start None for the DEFAULT partition)
+        rows_compacted: Progress logs summarized
+        dropped: False if the partition was only detached
+        compacted_at: When the compaction ran
+    """
+    __tablename__ = "progress_log_compactions"
+
+    id = Column(Integer, primary_key=True)
+    partition_name = Column(String(63), nullable=False)
+    range_start = Column(DateTime, nullable=True)
+    range_end = Column(DateTime, nullable=False)
+    rows_compacted = Column(BigInteger, nullable=False)
+    dropped = Column(Boolean, nullable=False)
+    compacted_at = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+
+    def __repr__(self):
+        return f"<ProgressLogCompaction(partition_name='{self.partition_name}', rows_compacted={self.rows_compacted})>"
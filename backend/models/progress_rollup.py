@@ -0,0 +1,64 @@
+"""
+Progress rollup models: first-reached milestones and time-bucketed counts
+per topic and status for cohort analytics.
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Index
+from database import Base
+
+
+class UserTopicMilestone(Base):
+    """
+    SQLAlchemy model for the first time a user reached a status on a topic.
+    A row is inserted once per user/topic/status, which makes distinct
+    learner counts additive across rollup buckets.
+    
+    Attributes:
+        user_id: User identifier (part of primary key)
+        topic_id: Foreign key to topics (part of primary key)
+        status: viewed, in_progress, mastered (part of primary key)
+        first_at: Timestamp of the first progress log with this status
+    """
+    __tablename__ = "user_topic_milestones"
+    
+    user_id = Column(String(255), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    first_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<UserTopicMilestone(user_id='{self.user_id}', topic_id={self.topic_id}, status='{self.status}')>"
+
+
+class _RollupColumns:
+    """
+    Columns shared by the hourly and daily rollups.
+    
+    Attributes:
+        topic_id: Foreign key to topics (part of primary key)
+        bucket: Start of the hour/day (part of primary key)
+        status: viewed, in_progress, mastered (part of primary key)
+        events: Progress logs with this status in the bucket
+        learners: Users who first reached this status in the bucket
+    """
+    topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    events = Column(BigInteger, nullable=False, default=0)
+    learners = Column(BigInteger, nullable=False, default=0)
+
+
+class ProgressRollupHourly(_RollupColumns, Base):
+    """Hourly progress counts per topic and status."""
+    __tablename__ = "progress_rollups_hourly"
+    __table_args__ = (
+        # Cross-topic window queries ("mastered this week")
+        Index("idx_progress_rollups_hourly_bucket", "bucket"),
+    )
+
+
+class ProgressRollupDaily(_RollupColumns, Base):
+    """Daily progress counts per topic and status."""
+    __tablename__ = "progress_rollups_daily"
+    __table_args__ = (
+        Index("idx_progress_rollups_daily_bucket", "bucket"),
+    )
@@ -1,7 +1,7 @@
 """
 Topic model for accounting study topics.
 """
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
 from database import Base
 
 
@@ -14,14 +14,29 @@ class Topic(Base):
         name: Topic name (required)
         oer_link: Open Educational Resource link (optional)
         asc_reference: ASC (Accounting Standards Codification) reference (optional)
+        created_at / updated_at: Set by the database (updated_at by trigger)
     """
     __tablename__ = "topics"
+    __table_args__ = (
+        Index("idx_topics_name", "name"),
+        Index("idx_topics_asc_reference", "asc_reference"),
+        # Trigram indexes for fuzzy / substring search (migrations/003)
+        Index("idx_topics_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "idx_topics_asc_reference_trgm", "asc_reference",
+            postgresql_using="gin", postgresql_ops={"asc_reference": "gin_trgm_ops"},
+        ),
+        # Delta sync: rows changed since a client's token (migrations/010)
+        Index("idx_topics_updated_at", "updated_at"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False, index=True)
-    oer_link = Column(String, nullable=True)
-    asc_reference = Column(String, nullable=True)
-    fasb_link = Column(String, nullable=True)  # FASB Codification Basic View link
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    oer_link = Column(String(500), nullable=True)
+    asc_reference = Column(String(100), nullable=True)
+    fasb_link = Column(String(500), nullable=True)  # FASB Codification Basic View link
+    created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
+    updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     
     def __repr__(self):
         return f"<Topic(id={self.id}, name='{self.name}')>"
@@ -0,0 +1,31 @@
+"""
+UserTopicState model: latest progress status per user/topic.
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from database import Base
+
+
+class UserTopicState(Base):
+    """
+    SQLAlchemy model for the latest status of each topic a user has touched.
+    Maintained by upsert alongside every progress_logs insert, so the
+    dashboard reads O(topics) rows instead of the user's full history.
+    
+    Attributes:
+        user_id: User identifier (part of primary key)
+        topic_id: Foreign key to topics (part of primary key)
+        status: Latest status: viewed, in_progress, mastered
+        last_seen: Timestamp of the latest progress log for this user/topic
+    """
+    __tablename__ = "user_topic_state"
+    __table_args__ = (
+        Index("idx_user_topic_state_user_last_seen", "user_id", "last_seen"),
+    )
+    
+    user_id = Column(String(255), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(50), nullable=False)
+    last_seen = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<UserTopicState(user_id='{self.user_id}', topic_id={self.topic_id}, status='{self.status}')>"
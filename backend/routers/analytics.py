@@ -0,0 +1,133 @@
+"""
+Analytics router: cohort-level progress across all users, served from the
+pre-aggregated rollups maintained by core.progress_rollups.
+"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from database import get_async_read_db
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.topic import Topic
+from models.progress_rollup import ProgressRollupDaily, ProgressRollupHourly
+from schemas.analytics import FunnelSummary, RollupBucket, TopicActivity
+from schemas.progress import NaiveUTCDatetime
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"],
+)
+
+STATUS_PATTERN = "^(viewed|in_progress|mastered)$"
+
+
+def _is_midnight(ts: Optional[datetime]) -> bool:
+    return ts is None or ts == ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rollup_model(since: Optional[datetime], until: Optional[datetime]):
+    """Daily rollups when the window falls on day boundaries (24x fewer rows), else hourly."""
+    if _is_midnight(since) and _is_midnight(until):
+        return ProgressRollupDaily
+    return ProgressRollupHourly
+
+
+def _window(stmt, model, since: Optional[datetime], until: Optional[datetime]):
+    """Restrict to buckets starting in [since, until); since is rounded down to the bucket."""
+    if since is not None:
+        floor = "day" if model is ProgressRollupDaily else "hour"
+        stmt = stmt.where(model.bucket >= func.date_trunc(floor, since))
+    if until is not None:
+        stmt = stmt.where(model.bucket < until)
+    return stmt
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+@router.get("/topics/{topic_id}/timeline", response_model=List[RollupBucket])
+async def topic_timeline(
+    topic_id: int,
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    since: Optional[NaiveUTCDatetime] = Query(None, description="First bucket (ISO 8601)"),
+    until: Optional[NaiveUTCDatetime] = Query(None, description="Buckets before this time (ISO 8601)"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Hourly or daily events and first-time learners per status for one topic,
+    oldest bucket first. Buckets with no activity are omitted.
+    """
+    model = ProgressRollupHourly if granularity == "hour" else ProgressRollupDaily
+    stmt = select(model.bucket, model.status, model.events, model.learners).where(model.topic_id == topic_id)
+    result = await db.execute(_window(stmt, model, since, until).order_by(model.bucket, model.status))
+    return [RollupBucket(bucket=r.bucket, status=r.status, events=r.events, learners=r.learners) for r in result]
+
+
+@router.get("/topics", response_model=List[TopicActivity])
+async def topic_activity(
+    status: str = Query("mastered", pattern=STATUS_PATTERN),
+    since: Optional[NaiveUTCDatetime] = Query(None, description="Window start (ISO 8601); hour resolution"),
+    until: Optional[NaiveUTCDatetime] = Query(None, description="Window end, exclusive (ISO 8601)"),
+    asc_reference: Optional[str] = Query(None, description="Only topics with this ASC reference, e.g. ASC 842"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Topics ranked by learners who first reached status in the window,
+    e.g. "how many learners mastered ASC 842 this week".
+    """
+    model = _rollup_model(since, until)
+    events = func.sum(model.events).label("events")
+    learners = func.sum(model.learners).label("learners")
+    stmt = (
+        select(Topic.id, Topic.name, Topic.asc_reference, events, learners)
+        .join(Topic, Topic.id == model.topic_id)
+        .where(model.status == status)
+    )
+    if asc_reference is not None:
+        stmt = stmt.where(func.lower(Topic.asc_reference) == asc_reference.strip().lower())
+    stmt = _window(stmt, model, since, until).group_by(Topic.id).order_by(learners.desc(), Topic.id).limit(limit)
+    result = await db.execute(stmt)
+    return [
+        TopicActivity(topic_id=r.id, topic_name=r.name, asc_reference=r.asc_reference, events=r.events, learners=r.learners)
+        for r in result
+    ]
+
+
+@router.get("/funnel", response_model=FunnelSummary)
+async def funnel(
+    topic_id: Optional[int] = Query(None),
+    asc_reference: Optional[str] = Query(None, description="All topics with this ASC reference"),
+    since: Optional[NaiveUTCDatetime] = Query(None, description="Window start (ISO 8601); hour resolution"),
+    until: Optional[NaiveUTCDatetime] = Query(None, description="Window end, exclusive (ISO 8601)"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Viewed -> in_progress -> mastered funnel: learners reaching each stage
+    for the first time in the window, and conversion between stages.
+    Covers every topic unless topic_id or asc_reference narrows it.
+    """
+    model = _rollup_model(since, until)
+    stmt = select(model.status, func.sum(model.learners).label("learners"))
+    if topic_id is not None:
+        stmt = stmt.where(model.topic_id == topic_id)
+    if asc_reference is not None:
+        stmt = stmt.join(Topic, Topic.id == model.topic_id).where(
+            func.lower(Topic.asc_reference) == asc_reference.strip().lower()
+        )
+    result = await db.execute(_window(stmt, model, since, until).group_by(model.status))
+    stages = {r.status: int(r.learners) for r in result}
+    viewed, in_progress, mastered = (stages.get(s, 0) for s in ("viewed", "in_progress", "mastered"))
+    return FunnelSummary(
+        topic_id=topic_id,
+        asc_reference=asc_reference,
+        since=since,
+        until=until,
+        viewed=viewed,
+        in_progress=in_progress,
+        mastered=mastered,
+        viewed_to_in_progress=_ratio(in_progress, viewed),
+        in_progress_to_mastered=_ratio(mastered, in_progress),
+        viewed_to_mastered=_ratio(mastered, viewed),
+    )
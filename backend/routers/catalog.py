@@ -0,0 +1,91 @@
+"""
+Catalog router: delta sync of topics and practice templates for clients
+that keep a local copy of the catalog.
+
+GET /catalog/sync without ``since`` returns the whole catalog and a token.
+Passing that token back returns only the rows inserted or updated since
+(by updated_at, set from the writer's transaction start time) and the ids
+deleted since (by catalog_tombstones, written by trigger). Clients apply
+the deletions first, then the rows.
+
+A transaction that started before a sync but commits after it stamps its
+rows with a time before the sync, so the token is not the sync time but
+the start of the oldest transaction open at the time, less
+CATALOG_SYNC_OVERLAP_SECONDS. Rows changed near a sync may be sent again;
+applying them twice is harmless. The token is computed from the primary's
+pg_stat_activity, so this route always reads from the primary.
+"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Optional
+from config import settings
+from database import get_async_db
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.catalog_tombstone import CatalogTombstone
+from models.practice_template import PracticeTemplate
+from models.topic import Topic
+from schemas.catalog import CatalogSyncResponse
+from core import fast_json
+from core.pagination import decode_cursor, encode_cursor
+from core.request_coalescing import CoalescingRoute, coalesced
+
+router = APIRouter(
+    prefix="/catalog",
+    tags=["catalog"],
+    # Identical concurrent GETs of @coalesced endpoints share one execution
+    route_class=CoalescingRoute,
+)
+
+# Selected in schema field order and serialized straight from the rows
+_TOPIC_COLUMNS = (Topic.name, Topic.oer_link, Topic.asc_reference, Topic.fasb_link, Topic.id)
+_TOPIC_FIELDS = tuple(c.key for c in _TOPIC_COLUMNS)
+_TEMPLATE_COLUMNS = (PracticeTemplate.id, PracticeTemplate.topic_id, PracticeTemplate.template_text)
+_TEMPLATE_FIELDS = tuple(c.key for c in _TEMPLATE_COLUMNS)
+
+# Start of the oldest open transaction (or now), less the overlap. Read
+# before the catalog rows, so anything committed after them is newer.
+_TOKEN_SQL = text("""
+    SELECT least(LOCALTIMESTAMP, min(xact_start)::timestamp) - make_interval(secs => :overlap)
+    FROM pg_stat_activity
+    WHERE backend_type = 'client backend'
+""")
+
+
+@router.get("/sync", response_model=CatalogSyncResponse)
+@coalesced
+async def sync_catalog(
+    since: Optional[str] = Query(None, description="token from the previous sync; omit for the whole catalog"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Topics and practice templates changed since the client's last sync,
+    plus deleted ids. Responses are small when nothing changed, and are
+    cached with an ETag like the other catalog routes.
+    """
+    changed_since = decode_cursor(since, datetime)[0] if since is not None else None
+    token = (await db.execute(_TOKEN_SQL, {"overlap": settings.CATALOG_SYNC_OVERLAP_SECONDS})).scalar()
+
+    topics = select(*_TOPIC_COLUMNS).order_by(Topic.id)
+    templates = select(*_TEMPLATE_COLUMNS).order_by(PracticeTemplate.id)
+    deleted = {"topics": [], "practice_templates": []}
+    if changed_since is not None:
+        topics = topics.where(Topic.updated_at >= changed_since)
+        templates = templates.where(PracticeTemplate.updated_at >= changed_since)
+        tombstones = await db.execute(
+            select(CatalogTombstone.entity, CatalogTombstone.entity_id)
+            .where(CatalogTombstone.deleted_at >= changed_since)
+            .order_by(CatalogTombstone.entity_id)
+        )
+        for entity, entity_id in tombstones:
+            if entity in deleted:
+                deleted[entity].append(entity_id)
+
+    body = {
+        "token": encode_cursor(token),
+        "full": changed_since is None,
+        "topics": [dict(zip(_TOPIC_FIELDS, row)) for row in await db.execute(topics)],
+        "practice_templates": [dict(zip(_TEMPLATE_FIELDS, row)) for row in await db.execute(templates)],
+        "deleted": deleted,
+    }
+    return Response(fast_json.dumps(body), media_type="application/json")
@@ -1,7 +1,9 @@
 """
-Health check router.
+Health check router: liveness and readiness probes.
 """
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from core.readiness import NOT_READY, readiness_probe
 
 router = APIRouter(
     prefix="/health",
@@ -10,5 +12,21 @@ router = APIRouter(
 
 @router.get("")
 async def health_check():
-    """Health check endpoint for monitoring"""
+    """Health check endpoint for monitoring (same as /health/live)"""
     return {"status": "ok"}
+
+
+@router.get("/live")
+async def liveness():
+    """Liveness: the process is up and serving requests; no dependencies are checked"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness: database probe latency, pool utilization and checkout wait.
+    200 when ok or degraded, 503 when not ready (take this worker out of rotation).
+    """
+    report = await readiness_probe.check()
+    return JSONResponse(report, status_code=503 if report["status"] == NOT_READY else 200)
@@ -0,0 +1,16 @@
+"""
+Metrics router exposing request, database and cache metrics for Prometheus.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from core.metrics import render_prometheus
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition (scrape target)"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
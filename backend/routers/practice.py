@@ -1,69 +1,98 @@
 """
 Practice router: practice templates and Ledger Simulator validation.
 """
-from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import List, Optional
-from database import get_db
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from typing import List, Optional, Tuple
+from config import settings
+from database import get_async_db, get_async_read_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.topic import Topic
 from models.practice_template import PracticeTemplate
+from core.admission import rate_limit
+from core.fast_json import rows_response
+from core.pagination import decode_cursor, paginate
+from core.request_coalescing import CoalescingRoute, coalesced
+from core.response_cache import invalidate_catalog
+from core.answer_keys import (
+    AnswerKey,
+    answer_key_cache,
+    diff_lines,
+    get_answer_key,
+    get_answer_keys,
+    load_answer_lines,
+    multiset_fingerprint,
+    normalize_line,
+)
 from schemas.practice import (
     PracticeTemplateOut,
     LedgerValidateRequest,
     LedgerValidateResponse,
+    LedgerBatchValidateRequest,
+    LedgerBatchValidateResponse,
+    LedgerAmountMismatch,
+    LedgerDifferences,
     JournalEntryLine,
 )
 
 router = APIRouter(
     prefix="/practice",
     tags=["practice"],
+    # Identical concurrent GETs of @coalesced endpoints share one execution
+    route_class=CoalescingRoute,
 )
 
 
+# PracticeTemplateOut field order; expected_entries is always null in the list
+_TEMPLATE_LIST_FIELDS = ("id", "topic_id", "template_text", "expected_entries")
+
+
 @router.get("", response_model=List[PracticeTemplateOut])
+@coalesced
 async def list_practice_templates(
+    response: Response,
     topic_id: Optional[int] = Query(None, description="Filter by topic ID"),
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     List practice templates, optionally filtered by topic.
     Excludes expected_entries in list view (use GET /practice/{id} for full template).
+    Keyset-paginated by id: follow the X-Next-Cursor response header.
     """
-    q = db.query(PracticeTemplate)
+    stmt = select(PracticeTemplate.id, PracticeTemplate.topic_id, PracticeTemplate.template_text)
     if topic_id is not None:
-        q = q.filter(PracticeTemplate.topic_id == topic_id)
-    templates = q.order_by(PracticeTemplate.id).all()
-    return [
-        PracticeTemplateOut(
-            id=t.id,
-            topic_id=t.topic_id,
-            template_text=t.template_text,
-            expected_entries=None,
-        )
-        for t in templates
-    ]
+        stmt = stmt.where(PracticeTemplate.topic_id == topic_id)
+    if cursor is not None:
+        (after_id,) = decode_cursor(cursor, int)
+        stmt = stmt.where(PracticeTemplate.id > after_id)
+    result = await db.execute(stmt.order_by(PracticeTemplate.id).limit(limit + 1))
+    templates = paginate(result.all(), limit, response, key=lambda t: (t.id,))
+    return rows_response(((*t, None) for t in templates), _TEMPLATE_LIST_FIELDS, response)
 
 
 @router.get("/topics", response_model=List[dict])
-async def list_topics_for_practice(db: Session = Depends(get_db)):
+@coalesced
+async def list_topics_for_practice(db: AsyncSession = Depends(get_async_read_db)):
     """List all topics that have at least one practice template (id, name)."""
-    from sqlalchemy import func
-    rows = (
-        db.query(Topic.id, Topic.name)
+    result = await db.execute(
+        select(Topic.id, Topic.name)
         .join(PracticeTemplate, PracticeTemplate.topic_id == Topic.id)
         .distinct()
-        .all()
     )
+    rows = result.all()
     return [{"id": r.id, "name": r.name} for r in rows]
 
 
 @router.get("/{template_id}", response_model=PracticeTemplateOut)
+@coalesced
 async def get_practice_template(
     template_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Get a single practice template including expected_entries for Ledger Simulator."""
-    t = db.query(PracticeTemplate).filter(PracticeTemplate.id == template_id).first()
+    t = await db.get(PracticeTemplate, template_id)
     if not t:
         raise HTTPException(status_code=404, detail="Practice template not found")
     return PracticeTemplateOut(
@@ -78,11 +107,8 @@ def _normalize_entries(entries: List[JournalEntryLine]) -> List[dict]:
     """Normalize to comparable dicts: account stripped/lower, debit/credit as float."""
     out = []
     for e in entries:
-        out.append({
-            "account": (e.account or "").strip().lower(),
-            "debit": round(float(e.debit or 0), 2),
-            "credit": round(float(e.credit or 0), 2),
-        })
+        account, debit, credit = normalize_line(e.account, e.debit, e.credit)
+        out.append({"account": account, "debit": debit, "credit": credit})
     return out
 
 
@@ -92,25 +118,26 @@ def _entries_balance(entries: List[dict]) -> tuple[bool, float, float]:
     return (abs(total_d - total_c) < 0.01, round(total_d, 2), round(total_c, 2))
 
 
-@router.post("/ledger/validate", response_model=LedgerValidateResponse)
-async def validate_ledger(
-    body: LedgerValidateRequest,
-    template_id: Optional[int] = Query(None, description="If provided, check against this practice template"),
-    db: Session = Depends(get_db),
-):
+def _grade_balance(
+    lines: List[JournalEntryLine], template_id: Optional[int]
+) -> Tuple[Optional[LedgerValidateResponse], Tuple[tuple, ...], float, float]:
     """
-    Ledger Simulator: validate that debits equal credits.
-    If template_id is provided, also check that entries match the expected solution.
+    First grading stage: empty/unbalanced checks, which need no answer key.
+
+    Returns:
+        (final response or None, normalized lines, total debits, total credits).
+        A None response means the entries balance and must still be compared
+        against the template's answer key.
     """
-    if not body.entries:
+    if not lines:
         return LedgerValidateResponse(
             balanced=False,
             total_debits=0,
             total_credits=0,
             message="No entries provided.",
             hint="Add at least one debit and one credit line.",
-        )
-    entries = _normalize_entries(body.entries)
+        ), (), 0, 0
+    entries = _normalize_entries(lines)
     balanced, total_d, total_c = _entries_balance(entries)
     if not balanced:
         return LedgerValidateResponse(
@@ -119,36 +146,157 @@ async def validate_ledger(
             total_credits=total_c,
             message="Entries do not balance. Debits must equal credits.",
             hint="Total debits and total credits must be equal.",
-        )
+        ), (), total_d, total_c
     if template_id is None:
         return LedgerValidateResponse(
             balanced=True,
             total_debits=total_d,
             total_credits=total_c,
             message="Entries balance. Debits equal credits.",
+        ), (), total_d, total_c
+    actual = tuple((x["account"], x["debit"], x["credit"]) for x in entries)
+    return None, actual, total_d, total_c
+
+
+def _entry_line(line: tuple) -> JournalEntryLine:
+    return JournalEntryLine(account=line[0], debit=line[1], credit=line[2])
+
+
+def _differences(expected: Tuple[tuple, ...], actual: Tuple[tuple, ...]) -> Tuple[LedgerDifferences, str]:
+    """Line diff for a mismatched submission, plus a hint summarizing it."""
+    diff = diff_lines(expected, actual)
+    differences = LedgerDifferences(
+        missing=[_entry_line(line) for line in diff.missing],
+        extra=[_entry_line(line) for line in diff.extra],
+        wrong_amount=[
+            LedgerAmountMismatch(expected=_entry_line(m.expected), submitted=_entry_line(m.submitted))
+            for m in diff.wrong_amount
+        ],
+    )
+    parts = [
+        f"{count} {label}"
+        for count, label in (
+            (len(diff.missing), "line(s) missing"),
+            (len(diff.extra), "unexpected line(s)"),
+            (len(diff.wrong_amount), "line(s) with the wrong amount"),
         )
-    t = db.query(PracticeTemplate).filter(PracticeTemplate.id == template_id).first()
-    if not t or not t.expected_entries:
+        if count
+    ]
+    return differences, "Compare each line: account name and debit/credit amounts (" + ", ".join(parts) + ")."
+
+
+def _grade_against_key(
+    actual: Tuple[tuple, ...],
+    fingerprint: int,
+    total_d: float,
+    total_c: float,
+    answer_key: Optional[AnswerKey],
+) -> LedgerValidateResponse:
+    """
+    Second grading stage: compare the submission's fingerprint with the answer
+    key's. Mismatched keys must have their lines loaded (load_answer_lines).
+    """
+    if answer_key is None:
         return LedgerValidateResponse(
             balanced=True,
             total_debits=total_d,
             total_credits=total_c,
             message="Entries balance. (No solution to compare against.)",
         )
-    expected = _normalize_entries(
-        [JournalEntryLine(account=e.get("account", ""), debit=float(e.get("debit", 0) or 0), credit=float(e.get("credit", 0) or 0)) for e in t.expected_entries]
-    )
-    # Sort both by account and amounts for comparison
-    def key(x):
-        return (x["account"], x["debit"], x["credit"])
-    expected_sorted = sorted(expected, key=key)
-    actual_sorted = sorted(entries, key=key)
-    correct = expected_sorted == actual_sorted
+    if answer_key.matches(fingerprint):
+        return LedgerValidateResponse(
+            balanced=True,
+            total_debits=total_d,
+            total_credits=total_c,
+            correct=True,
+            message="Entries balance. Your solution matches the expected solution.",
+        )
+    differences, hint = _differences(answer_key.lines, actual)
     return LedgerValidateResponse(
         balanced=True,
         total_debits=total_d,
         total_credits=total_c,
-        correct=correct,
-        message="Entries balance. " + ("Your solution matches the expected solution." if correct else "Your solution does not match the expected solution. Check accounts and amounts."),
-        hint=None if correct else "Compare each line: account name and debit/credit amounts.",
+        correct=False,
+        message="Entries balance. Your solution does not match the expected solution. Check accounts and amounts.",
+        hint=hint,
+        differences=differences,
     )
+
+
+@router.post("/ledger/validate", response_model=LedgerValidateResponse, dependencies=[Depends(rate_limit("ledger"))])
+async def validate_ledger(
+    body: LedgerValidateRequest,
+    template_id: Optional[int] = Query(None, description="If provided, check against this practice template"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Ledger Simulator: validate that debits equal credits.
+    If template_id is provided, also check that entries match the expected solution.
+    """
+    response, actual, total_d, total_c = _grade_balance(body.entries, template_id)
+    if response is not None:
+        return response
+    # Stored answer-key fingerprint; cached per template
+    answer_key = await get_answer_key(db, template_id)
+    fingerprint = multiset_fingerprint(actual)
+    if answer_key is not None and not answer_key.matches(fingerprint):
+        await load_answer_lines(db, {template_id: answer_key})
+    return _grade_against_key(actual, fingerprint, total_d, total_c, answer_key)
+
+
+@router.post(
+    "/ledger/validate/batch",
+    response_model=LedgerBatchValidateResponse,
+    dependencies=[Depends(rate_limit("ledger"))],
+)
+async def validate_ledger_batch(
+    body: LedgerBatchValidateRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Grade many Ledger Simulator submissions in one request.
+    Each submission carries its own template_id; results are returned in
+    submission order with the same shape as POST /practice/ledger/validate.
+    Answer keys are loaded once per distinct template (one query for all
+    uncached templates), and each balanced submission is then graded by a
+    fingerprint comparison. Expected lines are loaded, in one more query, only
+    for templates with a mismatched submission.
+    """
+    if len(body.submissions) > settings.LEDGER_BATCH_MAX_SUBMISSIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.LEDGER_BATCH_MAX_SUBMISSIONS} submissions per batch",
+        )
+    results: List[Optional[LedgerValidateResponse]] = []
+    pending = []
+    for i, submission in enumerate(body.submissions):
+        response, actual, total_d, total_c = _grade_balance(submission.entries, submission.template_id)
+        results.append(response)
+        if response is None:
+            pending.append((i, submission.template_id, actual, multiset_fingerprint(actual), total_d, total_c))
+    answer_keys = await get_answer_keys(db, {p[1] for p in pending})
+    await load_answer_lines(db, {
+        template_id: answer_keys[template_id]
+        for _, template_id, _, fingerprint, _, _ in pending
+        if answer_keys[template_id] is not None and not answer_keys[template_id].matches(fingerprint)
+    })
+    for i, template_id, actual, fingerprint, total_d, total_c in pending:
+        results[i] = _grade_against_key(actual, fingerprint, total_d, total_c, answer_keys[template_id])
+    return LedgerBatchValidateResponse(results=results)
+
+
+@router.get("/ledger/answer-key-cache")
+async def answer_key_cache_stats():
+    """Answer key cache size and hit/miss counters."""
+    return answer_key_cache.stats()
+
+
+@router.delete("/ledger/answer-key-cache")
+async def clear_answer_key_cache(template_id: Optional[int] = Query(None, description="Drop only this template's key")):
+    """
+    Invalidate cached answer keys after templates are edited outside the API.
+    Also invalidates cached catalog responses (ETags) on this worker.
+    """
+    answer_key_cache.invalidate(template_id)
+    invalidate_catalog()
+    return answer_key_cache.stats()
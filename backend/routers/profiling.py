@@ -0,0 +1,50 @@
+"""
+Profiling router: recent request profiles collected by core.profiling
+(registered only with PROFILING_ENABLED and a PROFILING_TOKEN).
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from core.profiling import profile_buffer, token_matches
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)):
+    """Profiles are only served to requests sending PROFILING_TOKEN as X-Profile-Token (never without one)."""
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Missing or invalid X-Profile-Token")
+
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["admin"],
+    dependencies=[Depends(require_profiling_token)],
+)
+
+
+@router.get("")
+async def list_profiles(
+    limit: int = Query(20, ge=1, le=1000, description="Number of profiles"),
+    route: Optional[str] = Query(None, description="Only this route template, e.g. /api/progress/dashboard"),
+    user_id: Optional[str] = Query(None, description="Only requests for this user"),
+    statements: bool = Query(False, description="Include each SQL statement"),
+):
+    """Slowest of the recently profiled requests, slowest first, with their time breakdown."""
+    return {
+        **profile_buffer.stats(),
+        "profiles": [p.to_dict(statements) for p in profile_buffer.slowest(limit, route, user_id)],
+    }
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: int):
+    """One profile (see the X-Profile-Id response header) with all its SQL statements."""
+    profile = profile_buffer.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (or already rotated out)")
+    return profile.to_dict()
+
+
+@router.delete("")
+async def clear_profiles():
+    """Drop all buffered profiles."""
+    profile_buffer.clear()
+    return profile_buffer.stats()
@@ -1,14 +1,32 @@
 """
 Progress router: log and retrieve study progress for the learning dashboard.
 """
-from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import List, Optional
-from database import get_db
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from collections import Counter
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Optional, Union
+from database import (
+    get_async_db, get_async_read_db, get_async_session_local, note_user_write, reads_own_writes,
+)
+from sqlalchemy import desc, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.progress_log import ProgressLog
 from models.topic import Topic
-from schemas.progress import ProgressLogCreate, ProgressLogOut, DashboardSummary
+from models.user_topic_state import UserTopicState
+from core.admission import database_slot, rate_limit
+from core.progress_state import upsert_user_topic_state
+from core.progress_rollups import record_progress_rollups
+from core.fast_json import rows_response
+from core.pagination import decode_cursor, paginate
+from core.progress_ingest import ingest_progress_records, iter_request_records
+from core.progress_buffer import progress_buffer
+from core.progress_export import EXPORT_FORMATS, build_export_stmt, export_columns, open_progress_export
+from schemas.progress import (
+    ProgressLogCreate, ProgressLogBulkRecord, ProgressLogOut, ProgressLogAccepted, DashboardSummary, ProgressBulkResult,
+    NaiveUTCDatetime,
+)
 
 router = APIRouter(
     prefix="/progress",
@@ -16,70 +34,171 @@ router = APIRouter(
 )
 
 
-@router.post("", response_model=ProgressLogOut)
-async def log_progress(body: ProgressLogCreate, db: Session = Depends(get_db)):
-    """Log progress for a user/topic (viewed, in_progress, mastered)."""
-    log = ProgressLog(
-        user_id=body.user_id,
-        topic_id=body.topic_id,
-        status=body.status,
-        notes=body.notes,
-    )
-    db.add(log)
-    db.commit()
-    db.refresh(log)
+@router.post(
+    "",
+    response_model=Union[ProgressLogOut, ProgressLogAccepted],
+    dependencies=[Depends(rate_limit("progress_write", body_user_id=True))],
+)
+async def log_progress(
+    body: ProgressLogCreate,
+    request: Request,
+    response: Response,
+    durable: bool = Query(False, description="Write before responding even when the write-behind buffer is on"),
+):
+    """
+    Log progress for a user/topic (viewed, in_progress, mastered).
+
+    With PROGRESS_BUFFER_ENABLED the event is stamped with the time it was
+    received, queued and written by the write-behind buffer (202 Accepted)
+    without opening a session; a full queue returns 503 with Retry-After.
+    durable=true always writes synchronously (200).
+    """
+    if not durable and progress_buffer.running:
+        record = ProgressLogBulkRecord(**body.model_dump(), timestamp=datetime.now(timezone.utc).replace(tzinfo=None))
+        if not await progress_buffer.submit(record):
+            raise HTTPException(
+                status_code=503,
+                detail="Progress buffer is full; retry shortly or pass durable=true",
+                headers={"Retry-After": "1"},
+            )
+        response.status_code = 202
+        note_user_write(body.user_id, response)
+        return ProgressLogAccepted(**record.model_dump())
+    AsyncSessionLocal = get_async_session_local()
+    if AsyncSessionLocal is None:
+        raise ValueError(
+            "Database not configured. Please set database credentials in .env file. "
+            "See .env.example for required variables."
+        )
+    # Opened here rather than as a dependency so buffered events hold no session or admission slot
+    async with database_slot(request):
+        async with AsyncSessionLocal() as db:
+            log = ProgressLog(
+                user_id=body.user_id,
+                topic_id=body.topic_id,
+                status=body.status,
+                notes=body.notes,
+            )
+            db.add(log)
+            # INSERT ... RETURNING fills in id and the server-default timestamp
+            await db.flush()
+            # Keep the dashboard's per-topic state and the analytics rollups current in the same transaction
+            await db.execute(upsert_user_topic_state(body.user_id, body.topic_id, body.status, log.timestamp))
+            await record_progress_rollups(db, [(log.user_id, log.topic_id, log.status, log.timestamp)])
+            await db.commit()
+    note_user_write(body.user_id, response)
     return log
 
 
+@router.post("/bulk", response_model=ProgressBulkResult, dependencies=[Depends(rate_limit("progress_write"))])
+async def log_progress_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Bulk-log progress records (e.g. LMS replays or semester imports).
+
+    Body is a JSON array of progress records, or NDJSON streamed with
+    Content-Type application/x-ndjson. Each record may carry a timestamp.
+    Records are validated and written in chunks of PROGRESS_BULK_CHUNK_SIZE,
+    one transaction per chunk; invalid records are reported by index
+    without aborting the rest of the batch.
+    """
+    return await ingest_progress_records(db, iter_request_records(request))
+
+
+# Selected in ProgressLogOut field order and serialized straight from the rows
+_PROGRESS_LOG_COLUMNS = (
+    ProgressLog.id, ProgressLog.user_id, ProgressLog.topic_id, ProgressLog.timestamp, ProgressLog.status, ProgressLog.notes,
+)
+_PROGRESS_LOG_FIELDS = tuple(c.key for c in _PROGRESS_LOG_COLUMNS)
+
+
 @router.get("", response_model=List[ProgressLogOut])
 async def get_progress(
+    response: Response,
     user_id: str = Query(..., description="User identifier"),
     topic_id: Optional[int] = Query(None),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    """Get progress logs for a user, optionally filtered by topic."""
-    q = db.query(ProgressLog).filter(ProgressLog.user_id == user_id)
+    """
+    Get progress logs for a user, optionally filtered by topic.
+    Newest first, keyset-paginated on (timestamp, id): follow the
+    X-Next-Cursor response header for older pages.
+    """
+    stmt = select(*_PROGRESS_LOG_COLUMNS).where(ProgressLog.user_id == user_id)
     if topic_id is not None:
-        q = q.filter(ProgressLog.topic_id == topic_id)
-    logs = q.order_by(desc(ProgressLog.timestamp)).limit(limit).all()
-    return logs
+        stmt = stmt.where(ProgressLog.topic_id == topic_id)
+    if cursor is not None:
+        before_ts, before_id = decode_cursor(cursor, datetime, int)
+        stmt = stmt.where(tuple_(ProgressLog.timestamp, ProgressLog.id) < (before_ts, before_id))
+    result = await db.execute(
+        stmt.order_by(desc(ProgressLog.timestamp), desc(ProgressLog.id)).limit(limit + 1)
+    )
+    logs = paginate(result.all(), limit, response, key=lambda r: (r.timestamp, r.id))
+    return rows_response(logs, _PROGRESS_LOG_FIELDS, response)
+
+
+@router.get("/export", dependencies=[Depends(rate_limit("export"))])
+async def export_progress(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    user_id: Optional[str] = Query(None, description="Only this user's logs"),
+    topic_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None, description="viewed, in_progress or mastered"),
+    since: Optional[NaiveUTCDatetime] = Query(None, description="Logs at or after this time (ISO 8601)"),
+    until: Optional[NaiveUTCDatetime] = Query(None, description="Logs before this time (ISO 8601)"),
+    include_topic_name: bool = Query(False, description="Add a topic_name column"),
+):
+    """
+    Stream progress history for analysis as CSV or NDJSON, oldest first.
+    Rows come from a server-side cursor in batches of PROGRESS_EXPORT_BATCH_SIZE,
+    so exports of any size use constant memory. Unlike GET /progress there is
+    no row limit; omit every filter to export the whole table.
+    """
+    if get_async_session_local() is None:
+        raise ValueError(
+            "Database not configured. Please set database credentials in .env file. "
+            "See .env.example for required variables."
+        )
+    stmt = build_export_stmt(user_id, topic_id, status, since, until, include_topic_name)
+    body, close = await open_progress_export(
+        request, stmt, format, export_columns(include_topic_name), reads_own_writes(request)
+    )
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="progress_logs.{format}"'},
+        background=BackgroundTask(close),
+    )
 
 
-@router.get("/dashboard", response_model=DashboardSummary)
+@router.get("/dashboard", response_model=DashboardSummary, dependencies=[Depends(rate_limit("dashboard"))])
 async def get_dashboard(
     user_id: str = Query(..., description="User identifier"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Personalized learning dashboard: counts of viewed, in progress, mastered,
     and recent activity.
     """
-    # Most recent status per topic (order by timestamp desc, first occurrence wins)
-    topic_status = {}
-    for row in db.query(ProgressLog).filter(ProgressLog.user_id == user_id).order_by(desc(ProgressLog.timestamp)).all():
-        if row.topic_id not in topic_status:
-            topic_status[row.topic_id] = row.status
-    viewed = sum(1 for s in topic_status.values() if s == "viewed")
-    in_progress = sum(1 for s in topic_status.values() if s == "in_progress")
-    mastered = sum(1 for s in topic_status.values() if s == "mastered")
-    # Recent activity: last 10 logs with topic names
-    recent = (
-        db.query(ProgressLog, Topic.name)
-        .join(Topic, Topic.id == ProgressLog.topic_id)
-        .filter(ProgressLog.user_id == user_id)
-        .order_by(desc(ProgressLog.timestamp))
-        .limit(10)
-        .all()
+    # Latest status per topic from user_topic_state, newest first (one indexed query)
+    result = await db.execute(
+        select(UserTopicState.topic_id, UserTopicState.status, UserTopicState.last_seen, Topic.name)
+        .join(Topic, Topic.id == UserTopicState.topic_id)
+        .where(UserTopicState.user_id == user_id)
+        .order_by(desc(UserTopicState.last_seen))
     )
+    rows = result.all()
+    counts = Counter(r.status for r in rows)
+    # Recent activity: 10 most recently touched topics with their latest status
     recent_activity = [
-        {"topic_id": r[0].topic_id, "topic_name": r[1], "status": r[0].status, "timestamp": r[0].timestamp.isoformat() if r[0].timestamp else None}
-        for r in recent
+        {"topic_id": r.topic_id, "topic_name": r.name, "status": r.status, "timestamp": r.last_seen.isoformat() if r.last_seen else None}
+        for r in rows[:10]
     ]
     return DashboardSummary(
         user_id=user_id,
-        topics_viewed=viewed,
-        topics_in_progress=in_progress,
-        topics_mastered=mastered,
+        topics_viewed=counts["viewed"],
+        topics_in_progress=counts["in_progress"],
+        topics_mastered=counts["mastered"],
         recent_activity=recent_activity,
     )
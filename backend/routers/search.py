@@ -1,36 +1,120 @@
 """
 Search router for handling search-related endpoints.
 """
-from fastapi import APIRouter, Depends, Query
-from typing import List
-from database import get_db
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from typing import List, Optional
+from database import get_async_db, get_async_read_db
+from sqlalchemy import func, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.topic import Topic
-from schemas.topic import Topic as TopicSchema
+from schemas.topic import Topic as TopicSchema, TopicSuggestion
+from core.fast_json import rows_response
+from core.pagination import decode_cursor, paginate
+from core.topic_index import ensure_topic_index_current, refresh_topic_index
+from core.request_coalescing import CoalescingRoute, coalesced
+from core.response_cache import invalidate_catalog
 
 router = APIRouter(
     prefix="/search",
-    tags=["search"]
+    tags=["search"],
+    # Identical concurrent GETs of @coalesced endpoints share one execution
+    route_class=CoalescingRoute,
 )
 
+# Selected in TopicSchema field order and serialized straight from the rows
+_TOPIC_COLUMNS = (Topic.name, Topic.oer_link, Topic.asc_reference, Topic.fasb_link, Topic.id)
+_TOPIC_FIELDS = tuple(c.key for c in _TOPIC_COLUMNS)
+
+
+def _fuzzy_search_stmt(q: str, limit: int):
+    """
+    Build a ranked, typo-tolerant topic query over name and ASC reference.
+
+    Uses pg_trgm word similarity (``<%``), served by the GIN trigram indexes
+    from migrations/003_add_topic_search_indexes.sql, so "revnue" still finds
+    "Revenue Recognition" and "606" finds "ASC 606".
+    """
+    term = literal(q)
+    score = func.greatest(
+        func.word_similarity(term, Topic.name),
+        func.word_similarity(term, func.coalesce(Topic.asc_reference, "")),
+    )
+    return (
+        select(*_TOPIC_COLUMNS)
+        .where(
+            or_(
+                term.op("<%")(Topic.name),
+                term.op("<%")(Topic.asc_reference),
+                Topic.name.ilike(f"%{q}%"),
+                Topic.asc_reference.ilike(f"%{q}%"),
+            )
+        )
+        .order_by(score.desc(), Topic.name)
+        .limit(limit)
+    )
+
+
 @router.get("", response_model=List[TopicSchema])
+@coalesced
 async def search(
+    response: Response,
     q: str = Query(..., description="Search query string"),
-    db: Session = Depends(get_db)
+    mode: str = Query("contains", pattern="^(contains|fuzzy)$", description="contains: name substring match; fuzzy: ranked trigram match on name and ASC reference"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum results (page size in contains mode)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page (contains mode)"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Search topics by name (case-insensitive).
     
     Args:
         q: Search query string
+        mode: "contains" (default) or "fuzzy" for ranked, typo-tolerant results
+        limit: Maximum number of results; in contains mode, the page size
+        cursor: Next-page cursor; contains mode is keyset-paginated on (name, id)
+                and returns the following page's cursor in X-Next-Cursor
         db: Database session dependency
         
     Returns:
         List of topics matching the search query
     """
+    if mode == "fuzzy":
+        result = await db.execute(_fuzzy_search_stmt(q.strip(), limit))
+        return rows_response(result.all(), _TOPIC_FIELDS, response)
+
     # Query Topic table where name ILIKE %q%
-    topics = db.query(Topic).filter(
-        Topic.name.ilike(f"%{q}%")
-    ).all()
-    
-    return topics
+    stmt = select(*_TOPIC_COLUMNS).where(Topic.name.ilike(f"%{q}%"))
+    if cursor is not None:
+        after_name, after_id = decode_cursor(cursor, str, int)
+        stmt = stmt.where(tuple_(Topic.name, Topic.id) > (after_name, after_id))
+    result = await db.execute(stmt.order_by(Topic.name, Topic.id).limit(limit + 1))
+    topics = paginate(result.all(), limit, response, key=lambda t: (t.name, t.id))
+    return rows_response(topics, _TOPIC_FIELDS, response)
+
+
+@router.get("/suggest", response_model=List[TopicSuggestion])
+async def suggest(
+    q: str = Query(..., description="Partial query; the last word is matched as a prefix"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Typeahead suggestions from the in-process topic index.
+    Matches name and ASC reference tokens without querying topics; the
+    index is rebuilt in the background when the catalog version changes.
+    """
+    index = await ensure_topic_index_current()
+    if not index.ready:
+        raise HTTPException(status_code=503, detail="Search index not ready")
+    return index.suggest(q, limit)
+
+
+@router.post("/suggest/refresh")
+async def refresh_suggest_index(db: AsyncSession = Depends(get_async_db)):
+    """
+    Rebuild the in-process topic index now, on this worker (others rebuild
+    within CATALOG_VERSION_TTL_SECONDS of a catalog change on their own).
+    Also invalidates cached catalog responses (ETags) on this worker.
+    """
+    invalidate_catalog()
+    index = await refresh_topic_index(db)
+    return {"topics": len(index.topics), "version": index.version}
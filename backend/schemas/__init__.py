@@ -1,6 +1,6 @@
 """
 Schemas package for Pydantic models.
 """
-from schemas.topic import Topic, TopicCreate, TopicUpdate, TopicBase
+from schemas.topic import Topic, TopicCreate, TopicUpdate, TopicBase, TopicSuggestion
 
-__all__ = ["Topic", "TopicCreate", "TopicUpdate", "TopicBase"]
+__all__ = ["Topic", "TopicCreate", "TopicUpdate", "TopicBase", "TopicSuggestion"]
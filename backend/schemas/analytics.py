@@ -0,0 +1,37 @@
+"""
+Pydantic schemas for cohort analytics over progress rollups.
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class RollupBucket(BaseModel):
+    """Progress counts for one topic, time bucket and status."""
+    bucket: datetime  # Start of the hour or day
+    status: str
+    events: int  # Progress logs with this status
+    learners: int  # Users who reached this status for the first time
+
+
+class TopicActivity(BaseModel):
+    """Progress counts for one topic over a time window."""
+    topic_id: int
+    topic_name: str
+    asc_reference: Optional[str] = None
+    events: int
+    learners: int
+
+
+class FunnelSummary(BaseModel):
+    """Learners first reaching each stage in a window, with stage-to-stage conversion."""
+    topic_id: Optional[int] = None
+    asc_reference: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    viewed: int
+    in_progress: int
+    mastered: int
+    viewed_to_in_progress: Optional[float] = None  # None when the earlier stage is empty
+    in_progress_to_mastered: Optional[float] = None
+    viewed_to_mastered: Optional[float] = None
@@ -0,0 +1,29 @@
+"""
+Pydantic schemas for catalog delta sync (GET /api/catalog/sync).
+"""
+from pydantic import BaseModel
+from typing import List
+
+from schemas.topic import Topic
+
+
+class CatalogTemplate(BaseModel):
+    """Practice template as cached by clients (GET /practice/{id} adds expected_entries)."""
+    id: int
+    topic_id: int
+    template_text: str
+
+
+class CatalogDeletions(BaseModel):
+    """Ids deleted since the client's token."""
+    topics: List[int] = []
+    practice_templates: List[int] = []
+
+
+class CatalogSyncResponse(BaseModel):
+    """Catalog rows inserted or updated since the client's token, plus deletions."""
+    token: str  # Pass back as ?since= on the next sync
+    full: bool  # True: the whole catalog; replace the local copy
+    topics: List[Topic]
+    practice_templates: List[CatalogTemplate]
+    deleted: CatalogDeletions
@@ -28,6 +28,19 @@ class LedgerValidateRequest(BaseModel):
     entries: List[JournalEntryLine]
 
 
+class LedgerAmountMismatch(BaseModel):
+    """A submitted line for an expected account, with different amounts."""
+    expected: JournalEntryLine
+    submitted: JournalEntryLine
+
+
+class LedgerDifferences(BaseModel):
+    """Line-level differences from the expected solution (normalized lines)."""
+    missing: List[JournalEntryLine] = []
+    extra: List[JournalEntryLine] = []
+    wrong_amount: List[LedgerAmountMismatch] = []
+
+
 class LedgerValidateResponse(BaseModel):
     """Response from Ledger Simulator validation."""
     balanced: bool
@@ -36,3 +49,19 @@ class LedgerValidateResponse(BaseModel):
     hint: Optional[str] = None
     correct: Optional[bool] = None  # When validating against a scenario
     message: str
+    differences: Optional[LedgerDifferences] = None  # Only when correct is False
+
+
+class LedgerSubmission(LedgerValidateRequest):
+    """One submission in a batch, graded against its own template (if any)."""
+    template_id: Optional[int] = None
+
+
+class LedgerBatchValidateRequest(BaseModel):
+    """Request body for batch Ledger Simulator grading."""
+    submissions: List[LedgerSubmission]
+
+
+class LedgerBatchValidateResponse(BaseModel):
+    """Per-submission results, in submission order."""
+    results: List[LedgerValidateResponse]
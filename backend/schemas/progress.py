@@ -1,9 +1,20 @@
 """
 Pydantic schemas for progress tracking.
 """
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from pydantic import AfterValidator, BaseModel, field_validator
+from typing import Annotated, Optional, List
+from datetime import datetime, timezone
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an offset-aware datetime to naive UTC, as stored in the TIMESTAMP columns."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# For datetime query parameters compared with TIMESTAMP columns (e.g. ?since=2025-01-01T00:00:00Z)
+NaiveUTCDatetime = Annotated[datetime, AfterValidator(to_naive_utc)]
 
 
 class ProgressLogCreate(BaseModel):
@@ -14,6 +25,30 @@ class ProgressLogCreate(BaseModel):
     notes: Optional[str] = None
 
 
+class ProgressLogBulkRecord(ProgressLogCreate):
+    """Progress log entry for bulk ingestion; timestamp lets replays keep the event time."""
+    timestamp: Optional[datetime] = None
+
+    @field_validator("timestamp")
+    @classmethod
+    def timestamp_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return to_naive_utc(value)
+
+
+class ProgressBulkError(BaseModel):
+    """A rejected record in a bulk ingestion request."""
+    index: int  # Position of the record in the array / NDJSON stream (0-based)
+    error: str
+
+
+class ProgressBulkResult(BaseModel):
+    """Outcome of a bulk ingestion request."""
+    received: int
+    inserted: int
+    failed: int
+    errors: List[ProgressBulkError] = []
+
+
 class ProgressLogOut(BaseModel):
     """Progress log response."""
     id: int
@@ -27,6 +62,16 @@ class ProgressLogOut(BaseModel):
         from_attributes = True
 
 
+class ProgressLogAccepted(BaseModel):
+    """Progress log queued by the write-behind buffer (HTTP 202); written within a flush interval."""
+    user_id: str
+    topic_id: int
+    status: str
+    notes: Optional[str] = None
+    timestamp: Optional[datetime] = None  # When the event was received (UTC), as it will be stored
+    queued: bool = True
+
+
 class DashboardSummary(BaseModel):
     """Learning dashboard summary for a user."""
     user_id: str
@@ -33,3 +33,10 @@ class Topic(TopicBase):
     class Config:
         """Pydantic configuration"""
         from_attributes = True
+
+
+class TopicSuggestion(BaseModel):
+    """Lightweight topic for typeahead suggestions"""
+    id: int
+    name: str
+    asc_reference: Optional[str] = None
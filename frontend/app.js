@@ -48,6 +48,73 @@ function initNavigation() {
   showPage();
 }
 
+// —— Catalog (topics and practice templates) ——
+// Kept in localStorage; each page load asks /api/catalog/sync only for what
+// changed since the stored token (deletions first, then inserted/updated rows).
+const CATALOG_STORAGE_KEY = "studyhub_catalog";
+let catalogPromise = null;
+
+function loadStoredCatalog() {
+  try {
+    const stored = JSON.parse(localStorage.getItem(CATALOG_STORAGE_KEY) || "null");
+    if (stored && stored.token && stored.topics && stored.practiceTemplates) return stored;
+  } catch (_) {}
+  return null;
+}
+
+function storeCatalog(catalog) {
+  try {
+    localStorage.setItem(CATALOG_STORAGE_KEY, JSON.stringify(catalog));
+  } catch (_) {
+    // Over the storage quota: keep the catalog for this page only
+    localStorage.removeItem(CATALOG_STORAGE_KEY);
+  }
+}
+
+async function fetchCatalogDelta(token) {
+  const url = `${API_BASE_URL}/api/catalog/sync` + (token ? `?since=${encodeURIComponent(token)}` : "");
+  const res = await fetch(url, { headers: { Accept: "application/json" } });
+  if (!res.ok) throw new Error(res.status);
+  return res.json();
+}
+
+async function syncCatalog() {
+  const stored = loadStoredCatalog();
+  let delta;
+  try {
+    delta = await fetchCatalogDelta(stored && stored.token);
+  } catch (err) {
+    if (!stored) throw err;
+    if (err.message !== "400") return stored; // Offline or server error: use the stored copy
+    delta = await fetchCatalogDelta(null); // Token not accepted: start over
+  }
+  const catalog = delta.full || !stored ? { topics: {}, practiceTemplates: {} } : stored;
+  delta.deleted.topics.forEach((id) => delete catalog.topics[id]);
+  delta.deleted.practice_templates.forEach((id) => delete catalog.practiceTemplates[id]);
+  delta.topics.forEach((t) => { catalog.topics[t.id] = t; });
+  delta.practice_templates.forEach((t) => { catalog.practiceTemplates[t.id] = t; });
+  catalog.token = delta.token;
+  storeCatalog(catalog);
+  return catalog;
+}
+
+// One sync per page load, shared by the Practice and Ledger pages
+function getCatalog() {
+  if (!catalogPromise) {
+    catalogPromise = syncCatalog().catch((err) => {
+      catalogPromise = null;
+      throw err;
+    });
+  }
+  return catalogPromise;
+}
+
+function catalogTemplates(catalog, topicId) {
+  return Object.values(catalog.practiceTemplates)
+    .filter((t) => topicId === undefined || t.topic_id === topicId)
+    .sort((a, b) => a.id - b.id);
+}
+
 function setStatus(el, message, type) {
   if (!el) return;
   el.textContent = message;
@@ -64,6 +131,8 @@ function initSearch() {
 
   if (!form || !queryInput || !resultsList || !statusMessage) return;
 
+  initSuggestions(queryInput, document.getElementById("query-suggestions"));
+
   form.addEventListener("submit", async (e) => {
     e.preventDefault();
     const query = queryInput.value.trim();
@@ -75,7 +144,7 @@ function initSearch() {
     setStatus(statusMessage, "Searching...", "info");
     resultsList.innerHTML = "";
     try {
-      const url = `${API_BASE_URL}/api/search?q=${encodeURIComponent(query)}`;
+      const url = `${API_BASE_URL}/api/search?q=${encodeURIComponent(query)}&mode=fuzzy`;
       const res = await fetch(url, { method: "GET", headers: { Accept: "application/json" } });
       if (!res.ok) throw new Error(`Request failed: ${res.status}`);
       const data = await res.json();
@@ -92,6 +161,36 @@ function initSearch() {
   });
 }
 
+// Typeahead from the in-memory index (/api/search/suggest); debounced per keystroke
+function initSuggestions(input, datalist) {
+  if (!input || !datalist) return;
+  let timer = null;
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    const q = input.value.trim();
+    if (q.length < 2) {
+      datalist.innerHTML = "";
+      return;
+    }
+    timer = setTimeout(async () => {
+      try {
+        const res = await fetch(`${API_BASE_URL}/api/search/suggest?q=${encodeURIComponent(q)}&limit=8`, { headers: { Accept: "application/json" } });
+        if (!res.ok) return;
+        const data = await res.json();
+        datalist.innerHTML = "";
+        (data || []).forEach((t) => {
+          const opt = document.createElement("option");
+          opt.value = t.name;
+          if (t.asc_reference) opt.label = t.asc_reference;
+          datalist.appendChild(opt);
+        });
+      } catch (_) {
+        // Suggestions are best-effort; the full search still works
+      }
+    }, 150);
+  });
+}
+
 function renderSearchResults(topics, listEl) {
   listEl.innerHTML = "";
   if (!Array.isArray(topics) || topics.length === 0) return;
@@ -171,10 +270,13 @@ function initPractice() {
 
   async function loadTopics() {
     try {
-      const res = await fetch(`${API_BASE_URL}/api/practice/topics`, { headers: { Accept: "application/json" } });
-      if (!res.ok) throw new Error(res.status);
-      const data = await res.json();
-      topicSelect.innerHTML = "<option value=''>Select a topic</option>" + (data || []).map((t) => `<option value="${t.id}">${escapeHtml(t.name)}</option>`).join("");
+      const catalog = await getCatalog();
+      // Topics with at least one practice template
+      const withTemplates = new Set(catalogTemplates(catalog).map((t) => t.topic_id));
+      const data = Object.values(catalog.topics)
+        .filter((t) => withTemplates.has(t.id))
+        .sort((a, b) => a.name.localeCompare(b.name));
+      topicSelect.innerHTML = "<option value=''>Select a topic</option>" + data.map((t) => `<option value="${t.id}">${escapeHtml(t.name)}</option>`).join("");
     } catch (_) {
       topicSelect.innerHTML = "<option value=''>Failed to load topics</option>";
     }
@@ -186,9 +288,7 @@ function initPractice() {
     practiceDetail.classList.add("hidden");
     if (!topicId) return;
     try {
-      const res = await fetch(`${API_BASE_URL}/api/practice?topic_id=${topicId}`, { headers: { Accept: "application/json" } });
-      if (!res.ok) throw new Error(res.status);
-      const templates = await res.json();
+      const templates = catalogTemplates(await getCatalog(), Number(topicId));
       templates.forEach((t) => {
         const li = document.createElement("li");
         li.className = "practice-item";
@@ -220,6 +320,22 @@ function initPractice() {
 }
 
 // —— Ledger Simulator ——
+function formatLedgerLine(line) {
+  return `${line.account} (Dr ${line.debit.toFixed(2)}, Cr ${line.credit.toFixed(2)})`;
+}
+
+function describeLedgerDifferences(differences) {
+  const parts = [];
+  if (differences.missing.length) parts.push("Missing: " + differences.missing.map(formatLedgerLine).join(", ") + ".");
+  if (differences.extra.length) parts.push("Not expected: " + differences.extra.map(formatLedgerLine).join(", ") + ".");
+  if (differences.wrong_amount.length) {
+    parts.push("Wrong amount: " + differences.wrong_amount
+      .map((m) => `${formatLedgerLine(m.submitted)}, expected ${formatLedgerLine(m.expected)}`)
+      .join("; ") + ".");
+  }
+  return parts.join(" ");
+}
+
 function initLedger() {
   const templateSelect = document.getElementById("ledger-template");
   const tbody = document.getElementById("ledger-tbody");
@@ -229,10 +345,8 @@ function initLedger() {
 
   async function loadTemplates() {
     try {
-      const res = await fetch(`${API_BASE_URL}/api/practice`, { headers: { Accept: "application/json" } });
-      if (!res.ok) throw new Error(res.status);
-      const list = await res.json();
-      templateSelect.innerHTML = "<option value=''>Free-form (balance only)</option>" + (list || []).map((t) => `<option value="${t.id}">#${t.id} ${escapeHtml(t.template_text.slice(0, 50))}…</option>`).join("");
+      const list = catalogTemplates(await getCatalog());
+      templateSelect.innerHTML = "<option value=''>Free-form (balance only)</option>" + list.map((t) => `<option value="${t.id}">#${t.id} ${escapeHtml(t.template_text.slice(0, 50))}…</option>`).join("");
     } catch (_) {
       templateSelect.innerHTML = "<option value=''>Free-form (balance only)</option>";
     }
@@ -274,16 +388,17 @@ function initLedger() {
     if (templateId) url += `template_id=${encodeURIComponent(templateId)}`;
     setStatus(messageEl, "Checking…", "info");
     try {
-      const res = await fetch(url, {
-        method: "POST",
-        headers: { "Content-Type": "application/json", Accept: "application/json" },
-        body: JSON.stringify({ entries }),
-      });
+      const headers = { "Content-Type": "application/json", Accept: "application/json" };
+      // Lets the server rate-limit grading per user rather than per address
+      const userId = localStorage.getItem("studyhub_user_id");
+      if (userId) headers["X-User-Id"] = userId;
+      const res = await fetch(url, { method: "POST", headers, body: JSON.stringify({ entries }) });
       if (!res.ok) throw new Error(res.status);
       const data = await res.json();
       messageEl.classList.remove("info", "error", "success");
       messageEl.classList.add(data.balanced ? (data.correct === false ? "info" : "success") : "error");
-      messageEl.textContent = data.message + (data.hint ? " " + data.hint : "");
+      messageEl.textContent = data.message + (data.hint ? " " + data.hint : "")
+        + (data.differences ? " " + describeLedgerDifferences(data.differences) : "");
     } catch (_) {
       setStatus(messageEl, "Could not validate. Is the backend running?", "error");
     }
@@ -16,12 +16,18 @@ CREATE TABLE IF NOT EXISTS topics (
 CREATE INDEX IF NOT EXISTS idx_topics_name ON topics(name);
 CREATE INDEX IF NOT EXISTS idx_topics_asc_reference ON topics(asc_reference);
 
+-- Trigram indexes for fuzzy / substring topic search (GET /api/search?mode=fuzzy)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_topics_name_trgm ON topics USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_topics_asc_reference_trgm ON topics USING GIN (asc_reference gin_trgm_ops);
+
 -- Create practice_templates table
 CREATE TABLE IF NOT EXISTS practice_templates (
     id SERIAL PRIMARY KEY,
     topic_id INTEGER NOT NULL,
     template_text TEXT NOT NULL,
     expected_entries JSONB,
+    expected_fingerprint VARCHAR(32),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT fk_practice_templates_topic
@@ -35,27 +41,173 @@ CREATE TABLE IF NOT EXISTS practice_templates (
 CREATE INDEX IF NOT EXISTS idx_practice_templates_topic_id ON practice_templates(topic_id);
 CREATE INDEX IF NOT EXISTS idx_practice_templates_created_at ON practice_templates(created_at);
 
--- Create progress_logs table
+-- Create progress_logs table, range-partitioned by month on timestamp
+-- (partitions are created ahead by the app, see backend/core/progress_partitions.py).
+-- The partition key must be part of the primary key; ids stay unique via the sequence.
+CREATE SEQUENCE IF NOT EXISTS progress_logs_id_seq;
 CREATE TABLE IF NOT EXISTS progress_logs (
-    id SERIAL PRIMARY KEY,
+    id INTEGER NOT NULL DEFAULT nextval('progress_logs_id_seq'),
     user_id VARCHAR(255) NOT NULL,
     topic_id INTEGER NOT NULL,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     status VARCHAR(50) NOT NULL,
     notes TEXT,
+    PRIMARY KEY (id, timestamp),
     CONSTRAINT fk_progress_logs_topic
         FOREIGN KEY (topic_id)
         REFERENCES topics(id)
         ON DELETE CASCADE
         ON UPDATE CASCADE
-);
+) PARTITION BY RANGE (timestamp);
+ALTER SEQUENCE progress_logs_id_seq OWNED BY progress_logs.id;
+CREATE TABLE IF NOT EXISTS progress_logs_default PARTITION OF progress_logs DEFAULT;
+
+-- Create the partition for one month, moving that month's rows out of the
+-- DEFAULT partition. The table is filled before it is attached, so only
+-- progress_logs_default is scanned under lock. Returns false if it exists.
+CREATE OR REPLACE FUNCTION create_progress_log_partition(month_start TIMESTAMP)
+RETURNS BOOLEAN AS $$
+DECLARE
+    lo TIMESTAMP := date_trunc('month', month_start);
+    hi TIMESTAMP := date_trunc('month', month_start) + INTERVAL '1 month';
+    part TEXT := 'progress_logs_' || to_char(date_trunc('month', month_start), 'YYYY_MM');
+BEGIN
+    -- Workers creating partitions at the same time take turns
+    PERFORM pg_advisory_xact_lock(72030518);
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE progress_logs INCLUDING DEFAULTS)', part);
+    IF to_regclass('progress_logs_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM progress_logs_default WHERE "timestamp" >= $1 AND "timestamp" < $2 RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved', part
+        ) USING lo, hi;
+    END IF;
+    EXECUTE format('ALTER TABLE progress_logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', part, lo, hi);
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create every missing monthly partition from range_start's month through range_end's
+CREATE OR REPLACE FUNCTION create_progress_log_partitions(range_start TIMESTAMP, range_end TIMESTAMP)
+RETURNS INTEGER AS $$
+DECLARE
+    month TIMESTAMP := date_trunc('month', range_start);
+    created INTEGER := 0;
+BEGIN
+    WHILE month <= range_end LOOP
+        IF create_progress_log_partition(month) THEN
+            created := created + 1;
+        END IF;
+        month := month + INTERVAL '1 month';
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_progress_log_partitions(LOCALTIMESTAMP, LOCALTIMESTAMP + INTERVAL '3 months');
 
--- Create indexes on progress_logs
-CREATE INDEX IF NOT EXISTS idx_progress_logs_user_id ON progress_logs(user_id);
+-- Create indexes on progress_logs (built per partition; user_id and
+-- user_id + topic_id lookups use the (user_id, timestamp, id) prefix)
 CREATE INDEX IF NOT EXISTS idx_progress_logs_topic_id ON progress_logs(topic_id);
 CREATE INDEX IF NOT EXISTS idx_progress_logs_timestamp ON progress_logs(timestamp);
-CREATE INDEX IF NOT EXISTS idx_progress_logs_status ON progress_logs(status);
-CREATE INDEX IF NOT EXISTS idx_progress_logs_user_topic ON progress_logs(user_id, topic_id);
+CREATE INDEX IF NOT EXISTS idx_progress_logs_user_timestamp_id ON progress_logs(user_id, timestamp, id);
+
+-- Raw logs of compacted partitions, summarized per user, topic, day and status
+CREATE TABLE IF NOT EXISTS progress_log_daily_summaries (
+    user_id VARCHAR(255) NOT NULL,
+    topic_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    events INTEGER NOT NULL,
+    first_at TIMESTAMP NOT NULL,
+    last_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, topic_id, day, status),
+    CONSTRAINT fk_progress_log_daily_summaries_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_progress_log_daily_summaries_topic_id ON progress_log_daily_summaries(topic_id);
+
+-- One row per compaction: progress_logs holds no rows before max(range_end)
+-- other than late arrivals in the default partition
+CREATE TABLE IF NOT EXISTS progress_log_compactions (
+    id SERIAL PRIMARY KEY,
+    partition_name VARCHAR(63) NOT NULL,
+    range_start TIMESTAMP,
+    range_end TIMESTAMP NOT NULL,
+    rows_compacted BIGINT NOT NULL,
+    dropped BOOLEAN NOT NULL,
+    compacted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create user_topic_state table (latest status per user/topic for the dashboard)
+CREATE TABLE IF NOT EXISTS user_topic_state (
+    user_id VARCHAR(255) NOT NULL,
+    topic_id INTEGER NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    last_seen TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, topic_id),
+    CONSTRAINT fk_user_topic_state_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_topic_state_user_last_seen ON user_topic_state(user_id, last_seen);
+
+-- Create cohort analytics rollup tables (maintained alongside progress_logs inserts)
+-- First time each user reached each status on a topic (makes learner counts additive)
+CREATE TABLE IF NOT EXISTS user_topic_milestones (
+    user_id VARCHAR(255) NOT NULL,
+    topic_id INTEGER NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    first_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, topic_id, status),
+    CONSTRAINT fk_user_topic_milestones_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+-- Events and first-time learners per topic, status and hour/day
+CREATE TABLE IF NOT EXISTS progress_rollups_hourly (
+    topic_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    events BIGINT NOT NULL DEFAULT 0,
+    learners BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (topic_id, bucket, status),
+    CONSTRAINT fk_progress_rollups_hourly_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS progress_rollups_daily (
+    topic_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    events BIGINT NOT NULL DEFAULT 0,
+    learners BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (topic_id, bucket, status),
+    CONSTRAINT fk_progress_rollups_daily_topic
+        FOREIGN KEY (topic_id)
+        REFERENCES topics(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+-- Cross-topic window queries ("mastered this week")
+CREATE INDEX IF NOT EXISTS idx_progress_rollups_hourly_bucket ON progress_rollups_hourly(bucket);
+CREATE INDEX IF NOT EXISTS idx_progress_rollups_daily_bucket ON progress_rollups_daily(bucket);
 
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -76,3 +228,59 @@ CREATE TRIGGER update_practice_templates_updated_at
     BEFORE UPDATE ON practice_templates
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
+
+-- Delta sync of the catalog (GET /api/catalog/sync): changed rows by updated_at, deletes by tombstone
+CREATE INDEX IF NOT EXISTS idx_topics_updated_at ON topics(updated_at);
+CREATE INDEX IF NOT EXISTS idx_practice_templates_updated_at ON practice_templates(updated_at);
+
+-- One row per deleted topic or template (entity is the table name)
+CREATE TABLE IF NOT EXISTS catalog_tombstones (
+    entity VARCHAR(63) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_catalog_tombstones_deleted_at ON catalog_tombstones(deleted_at);
+
+CREATE OR REPLACE FUNCTION record_catalog_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO catalog_tombstones (entity, entity_id) VALUES (TG_TABLE_NAME, OLD.id)
+    ON CONFLICT (entity, entity_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row-level, so templates removed by a topic's ON DELETE CASCADE are recorded too
+DROP TRIGGER IF EXISTS record_topics_tombstone ON topics;
+CREATE TRIGGER record_topics_tombstone
+    AFTER DELETE ON topics
+    FOR EACH ROW
+    EXECUTE FUNCTION record_catalog_tombstone();
+
+DROP TRIGGER IF EXISTS record_practice_templates_tombstone ON practice_templates;
+CREATE TRIGGER record_practice_templates_tombstone
+    AFTER DELETE ON practice_templates
+    FOR EACH ROW
+    EXECUTE FUNCTION record_catalog_tombstone();
+
+-- Migrations already reflected above (see backend/core/migrations.py)
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO schema_version (version, name) VALUES
+    (0, 'adopt_create_all_schema'),
+    (1, 'initial_schema'),
+    (2, 'add_fasb_and_expected_entries'),
+    (3, 'add_topic_search_indexes'),
+    (4, 'add_user_topic_state'),
+    (5, 'add_progress_logs_keyset_index'),
+    (6, 'add_progress_rollups'),
+    (7, 'drop_create_all_indexes'),
+    (8, 'add_practice_template_fingerprint'),
+    (9, 'partition_progress_logs'),
+    (10, 'add_catalog_sync')
+ON CONFLICT (version) DO NOTHING;